@@ -10,12 +10,25 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    DB_MAX_CONNECTIONS: int = 0  # orcamento global de conexoes (0 = usa DB_POOL_SIZE/DB_MAX_OVERFLOW)
+    WEB_CONCURRENCY: int = 1  # workers do gunicorn/uvicorn (divide DB_MAX_CONNECTIONS)
+    DATABASE_REPLICA_URLS: str = ""  # replicas de leitura separadas por virgula (vazio = desativado)
+    REPLICA_READ_AFTER_WRITE_SECONDS: int = 5  # leituras no primario apos escrita do usuario
+    REPLICA_HEALTH_CHECK_INTERVAL: int = 10  # segundos entre health checks das replicas
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480  # 8 horas
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096  # tokens verificados mantidos em memoria
+
+    # Bcrypt (pool de processos + limite de concorrencia)
+    BCRYPT_POOL_WORKERS: int = 2  # 0 = executa no proprio processo (sem pool)
+    BCRYPT_MAX_CONCURRENT: int = 8  # operacoes executando ou na fila do pool
+    BCRYPT_QUEUE_TIMEOUT: float = 2.0  # segundos aguardando vaga antes do 503
+    BCRYPT_MAX_QUEUE: int = 16  # requisicoes aguardando vaga; acima disso, 503 imediato
+    BCRYPT_RETRY_AFTER: int = 5  # segundos (header Retry-After do 503)
 
     # API
     API_V1_PREFIX: str = "/api/v1"
@@ -23,6 +36,49 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     DEBUG: bool = False
 
+    # Último acesso dos usuários (gravação em lote)
+    ULTIMO_ACESSO_FLUSH_INTERVAL: int = 30  # segundos
+
+    # Cache de usuários autenticados (get_current_user)
+    AUTH_USER_CACHE_TTL: int = 60  # segundos (atraso máximo de desativação entre workers)
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 1024
+
+    # Cache do dashboard
+    DASHBOARD_CACHE_TTL: int = 30  # segundos
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 256
+
+    # Paginação
+    PAGINATION_COUNT_STRATEGY: str = "exata"  # exata, janela, estimada, limitada
+    PAGINATION_COUNT_CAP: int = 1000
+
+    # Busca por texto (filtros "contém" das listagens)
+    SEARCH_TRIGRAM_RANKING: bool = True  # ordena por relevância quando o PostgreSQL tem pg_trgm
+    AUTOCOMPLETE_REFRESH_INTERVAL: int = 300  # segundos entre recargas completas (0 = só no startup)
+
+    # Relatórios em Excel (limite de gerações simultâneas por processo)
+    REPORTS_MAX_CONCURRENT: int = 2
+    REPORTS_QUEUE_TIMEOUT: float = 1.0  # segundos aguardando vaga antes do 503
+    REPORTS_RETRY_AFTER: int = 30  # segundos (header Retry-After do 503)
+
+    # Diagnóstico de consultas por requisição (N+1)
+    N_PLUS_ONE_THRESHOLD: int = 10  # execuções do mesmo comando numa requisição
+    N_PLUS_ONE_SAMPLE_RATE: float = 0.0  # fração das requisições verificadas (DEBUG verifica todas)
+
+    # Log de consultas lentas
+    SLOW_QUERY_MS: int = 500  # 0 = desativado
+    SLOW_QUERY_LOG_FILE: str = "./logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10485760  # 10MB por arquivo
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    SLOW_QUERY_EXPLAIN: bool = True  # EXPLAIN em segundo plano (PostgreSQL)
+    SLOW_QUERY_EXPLAIN_INTERVAL: int = 300  # segundos entre EXPLAINs do mesmo formato
+
+    # Profiler de requisições (X-Profile / ?profile= para admins)
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_SAMPLE_RATE: int = 0  # perfila 1 em cada N requisições (0 = desativado)
+    PROFILE_SAMPLE_MODE: str = "amostragem"  # cprofile ou amostragem
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0  # intervalo do modo amostragem
+    PROFILE_MAX_FILES: int = 200  # perfis mantidos em PROFILE_DIR
+
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
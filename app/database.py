@@ -1,40 +1,209 @@
 """
 Configuracao do banco de dados
 """
+import logging
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional, Tuple
 
 from app.config import settings
+from app.replicas import RoutingAsyncSession, RoutingSession, roteador, vincular_requisicao
+from app.utils.metricas import (
+    AsyncAdaptedQueuePoolInstrumentado,
+    QueuePoolInstrumentado,
+    instrumentar_pool
+)
+
+logger = logging.getLogger(__name__)
+
+# Engines com pool por processo: sync (engine) e async (get_async_engine)
+ENGINES_POR_PROCESSO = 2
+
+
+def dimensionar_pool(
+    orcamento: int = settings.DB_MAX_CONNECTIONS,
+    workers: int = settings.WEB_CONCURRENCY
+) -> Tuple[int, int]:
+    """
+    Calcula pool_size e max_overflow de cada engine
+
+    O pool é por processo: com N workers do gunicorn cada engine abre até
+    N * (pool_size + max_overflow) conexões. Com DB_MAX_CONNECTIONS (orçamento
+    global de conexões da aplicação) o limite é dividido entre os workers e os
+    engines de cada processo; metade fica fixa no pool e metade como overflow.
+    Sem orçamento (0) usa DB_POOL_SIZE/DB_MAX_OVERFLOW.
+
+    Returns:
+        (pool_size, max_overflow)
+    """
+    if orcamento <= 0:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+
+    por_engine = orcamento // (max(workers, 1) * ENGINES_POR_PROCESSO)
+    if por_engine < 1:
+        logger.warning(
+            f"DB_MAX_CONNECTIONS={orcamento} insuficiente para {workers} worker(s); "
+            f"usando 1 conexão por engine"
+        )
+        return 1, 0
+
+    pool_size = max(1, (por_engine + 1) // 2)
+    return pool_size, por_engine - pool_size
+
+
+POOL_SIZE, MAX_OVERFLOW = dimensionar_pool()
 
 # Engine do SQLAlchemy
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
+    poolclass=QueuePoolInstrumentado,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
     pool_pre_ping=True,  # Verifica conexao antes de usar
     echo=settings.DEBUG,  # Log de queries em modo debug
 )
+instrumentar_pool("sync", engine.pool)
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session factory (com réplicas configuradas, RoutingSession: ver app/replicas.py)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession if roteador.ativo else Session
+)
 
 # Base para os models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
     Dependency para obter sessao do banco de dados
 
+    Com réplicas configuradas, os SELECTs de requisições de leitura (GET) vão
+    para uma réplica, salvo leitura após escrita do próprio usuário.
+
     Uso:
         @app.get("/items")
         def read_items(db: Session = Depends(get_db)):
             ...
     """
     db = SessionLocal()
+    if roteador.ativo:
+        vincular_requisicao(db, request)
     try:
         yield db
     finally:
         db.close()
+
+
+# ========== ASYNC ==========
+# Engine async (asyncpg no PostgreSQL, aiosqlite no SQLite) usado pelas rotas de
+# leitura mais acessadas. Criado na primeira utilização: scripts que só usam o
+# engine sync não precisam dos drivers async.
+
+_DRIVERS_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def converter_url_async(database_url: str) -> str:
+    """
+    Converte a DATABASE_URL (sync) para o driver async equivalente
+
+    Ex.: postgresql://... ou postgresql+psycopg2://... -> postgresql+asyncpg://...
+    O parâmetro sslmode (libpq) vira ssl, que é o nome aceito pelo asyncpg.
+    """
+    url = make_url(database_url)
+    driver = _DRIVERS_ASYNC.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Banco sem driver async configurado: {url.get_backend_name()}")
+
+    url = url.set(drivername=driver)
+    if driver == "postgresql+asyncpg" and "sslmode" in url.query:
+        sslmode = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url.render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Retorna o engine async (criado na primeira chamada)"""
+    global _async_engine
+    if _async_engine is None:
+        url = converter_url_async(settings.DATABASE_URL)
+        opcoes = {"pool_pre_ping": True, "echo": settings.DEBUG}
+        if not url.startswith("sqlite"):
+            # aiosqlite usa NullPool (uma conexao por sessao), sem pool_size
+            opcoes.update(
+                poolclass=AsyncAdaptedQueuePoolInstrumentado,
+                pool_size=POOL_SIZE,
+                max_overflow=MAX_OVERFLOW,
+            )
+        _async_engine = create_async_engine(url, **opcoes)
+        instrumentar_pool("async", _async_engine.pool)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """
+    Cria uma AsyncSession (mesmas opções da SessionLocal)
+
+    Com DATABASE_REPLICA_URLS configurada a sessão roteia SELECTs para as
+    réplicas (ver app/replicas.py).
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        if roteador.ativo:
+            _async_session_factory = async_sessionmaker(
+                sync_session_class=RoutingAsyncSession,
+                autoflush=False,
+                expire_on_commit=False
+            )
+        else:
+            _async_session_factory = async_sessionmaker(
+                bind=get_async_engine(),
+                autoflush=False,
+                expire_on_commit=False
+            )
+    return _async_session_factory()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency para obter sessao async do banco de dados
+
+    Código escrito para a Session sync (Query API, services) pode ser reaproveitado
+    com run_sync, sem ocupar uma thread do threadpool:
+
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            return await db.run_sync(lambda session: session.query(Item).all())
+    """
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def dispose_async_engine():
+    """Fecha as conexões do engine async (shutdown da aplicação)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
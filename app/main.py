@@ -9,6 +9,9 @@ from datetime import datetime
 from app.config import settings
 from app.middleware.cors import setup_cors
 from app.middleware.error_handler import setup_error_handlers
+from app.middleware.metricas import setup_metricas
+from app.middleware.profiler import setup_profiler
+from app.utils.respostas import RespostaJSON
 
 # Importar routers
 from app.routers import auth
@@ -19,6 +22,10 @@ from app.routers import ordens_servico
 from app.routers import dashboard
 from app.routers import categorias
 from app.routers import marcas
+from app.routers import admin
+from app.routers import busca
+from app.routers import autocomplete
+from app.routers import relatorios
 
 # Configurar logging
 logging.basicConfig(
@@ -39,7 +46,8 @@ app = FastAPI(
     debug=settings.DEBUG,
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
-    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=RespostaJSON
 )
 
 # Configurar middlewares
@@ -57,6 +65,10 @@ app.include_router(equipamentos.router, prefix=settings.API_V1_PREFIX)
 app.include_router(equipamentos.router_empresa, prefix=settings.API_V1_PREFIX)
 app.include_router(ordens_servico.router, prefix=settings.API_V1_PREFIX)
 app.include_router(dashboard.router, prefix=settings.API_V1_PREFIX)
+app.include_router(admin.router, prefix=settings.API_V1_PREFIX)
+app.include_router(busca.router, prefix=settings.API_V1_PREFIX)
+app.include_router(autocomplete.router, prefix=settings.API_V1_PREFIX)
+app.include_router(relatorios.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -70,6 +82,16 @@ def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas no formato do Prometheus"""
+    from fastapi import Response
+    from app.utils.metricas import gerar_metricas
+
+    conteudo, content_type = gerar_metricas()
+    return Response(content=conteudo, media_type=content_type)
+
+
 @app.get("/health")
 def health_check():
     """Health check basico"""
@@ -94,6 +116,30 @@ def health_check_detailed():
         "debug": settings.DEBUG
     }
 
+    # Limitador do bcrypt (login)
+    from app.utils.security import estatisticas_bcrypt
+    health["bcrypt"] = estatisticas_bcrypt()
+
+    # Cache de tokens JWT verificados (acertos/falhas do decode_token)
+    from app.utils.security import tokens_cache
+    health["tokens_cache"] = tokens_cache.estatisticas()
+
+    # Limitador dos relatórios em Excel
+    from app.services.relatorios_service import relatorios_limitador
+    health["relatorios"] = relatorios_limitador.estatisticas()
+
+    # Roteamento de leituras para réplicas
+    from app.replicas import roteador
+    health["replicas"] = roteador.estatisticas()
+
+    # Pools de conexões
+    from app.utils.metricas import estatisticas_pools
+    health["pools"] = estatisticas_pools()
+
+    # Índices de autocomplete (registros por entidade)
+    from app.services.autocomplete_service import autocomplete as indices_autocomplete
+    health["autocomplete"] = indices_autocomplete.estatisticas()
+
     # Testar conexao com banco
     try:
         db = SessionLocal()
@@ -307,6 +353,14 @@ def init_database_endpoint(secret: str = None):
 @app.on_event("startup")
 async def startup_event():
     """Evento de inicializacao"""
+    from app.utils.security import iniciar_bcrypt_pool
+    from app.services.acesso_service import ultimo_acesso_buffer
+    from app.replicas import roteador
+    from app.services.autocomplete_service import autocomplete
+    iniciar_bcrypt_pool()
+    ultimo_acesso_buffer.iniciar()
+    roteador.iniciar()
+    autocomplete.iniciar()
     logger.info(f"🚀 {settings.PROJECT_NAME} v{settings.VERSION} iniciado")
     logger.info(f"📚 Documentacao: {settings.API_V1_PREFIX}/docs")
 
@@ -314,9 +368,24 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento de encerramento"""
+    from app.utils.security import shutdown_bcrypt_pool
+    from app.services.acesso_service import ultimo_acesso_buffer
+    from app.database import dispose_async_engine
+    from app.replicas import roteador
+    from app.services.autocomplete_service import autocomplete
+    ultimo_acesso_buffer.parar()
+    autocomplete.parar()
+    shutdown_bcrypt_pool()
+    await roteador.parar()
+    await dispose_async_engine()
     logger.info("🛑 Aplicacao encerrada")
 
 
+# Profiler e métricas HTTP (depois de todas as rotas: ambos envolvem cada rota)
+setup_profiler(app)
+setup_metricas(app)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,130 @@
+"""
+Middleware de métricas (Prometheus)
+
+Registra por rota (template, ex.: /api/v1/ordens-servico/{os_id}) e método:
+- total de requisições por classe de status (2xx, 4xx, 5xx...)
+- duração das requisições
+- requisições em andamento
+- tempo de banco e quantidade de comandos SQL por requisição
+
+As respostas levam os headers Server-Timing (tempo de banco e total até o início
+da resposta) e X-DB-Queries. Em DEBUG, ou numa amostra das requisições
+(N_PLUS_ONE_SAMPLE_RATE), comandos repetidos mais de N_PLUS_ONE_THRESHOLD vezes
+são logados como possível N+1, com a rota e a pilha de uma das execuções.
+"""
+import logging
+import time
+
+from starlette.routing import Route
+
+from app.utils.metricas import (
+    HTTP_DB_CONSULTAS,
+    HTTP_DB_SEGUNDOS,
+    HTTP_DURACAO_SEGUNDOS,
+    HTTP_EM_ANDAMENTO,
+    HTTP_REQUISICOES,
+    ConsumoBanco,
+    consumo_banco,
+    iniciar_consumo_banco
+)
+
+logger = logging.getLogger(__name__)
+
+# Label das requisições que não casaram com nenhuma rota (404, scanners...), para
+# não criar uma série por path
+ROTA_DESCONHECIDA = "<sem_rota>"
+
+
+class MetricasMiddleware:
+    """Middleware ASGI (não usa BaseHTTPMiddleware para não bufferizar respostas)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        consumo = iniciar_consumo_banco(scope)
+        token = consumo_banco.set(consumo)
+        inicio = time.perf_counter()
+
+        async def send_com_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + _headers_banco(
+                    consumo, time.perf_counter() - inicio
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            duracao = time.perf_counter() - inicio
+            consumo_banco.reset(token)
+
+            # O roteamento grava a rota encontrada no próprio scope
+            rota = scope.get("route")
+            template = rota.path if rota is not None else ROTA_DESCONHECIDA
+            metodo = scope["method"]
+
+            HTTP_REQUISICOES.labels(metodo, template, f"{status_code // 100}xx").inc()
+            HTTP_DURACAO_SEGUNDOS.labels(metodo, template).observe(duracao)
+            HTTP_DB_SEGUNDOS.labels(metodo, template).observe(consumo.segundos)
+            HTTP_DB_CONSULTAS.labels(metodo, template).observe(consumo.consultas)
+
+            repetidos = consumo.repetidos()
+            if repetidos:
+                _logar_n_mais_1(metodo, template, scope, consumo, repetidos)
+
+
+def _headers_banco(consumo: ConsumoBanco, decorrido: float) -> list:
+    """Server-Timing e X-DB-Queries (consumo até o início da resposta)"""
+    server_timing = (
+        f'db;dur={consumo.segundos * 1000:.1f};desc="{consumo.consultas} queries", '
+        f"total;dur={decorrido * 1000:.1f}"
+    )
+    return [
+        (b"server-timing", server_timing.encode("latin-1")),
+        (b"x-db-queries", str(consumo.consultas).encode("latin-1")),
+    ]
+
+
+def _logar_n_mais_1(metodo: str, template: str, scope, consumo: ConsumoBanco, repetidos: dict):
+    for formato, vezes in sorted(repetidos.items(), key=lambda item: -item[1]):
+        pilha = "\n    ".join(consumo.pilhas[formato]) or "(sem frames da aplicação)"
+        logger.warning(
+            f"Possível N+1 em {metodo} {template} ({scope['path']}): "
+            f"{vezes}x de {consumo.consultas} comandos: {formato[:500]}\n    {pilha}"
+        )
+
+
+def _contar_em_andamento(rota: Route):
+    """Envolve o app ASGI da rota com o gauge de requisições em andamento"""
+    app_rota = rota.app
+
+    async def app_com_contagem(scope, receive, send):
+        em_andamento = HTTP_EM_ANDAMENTO.labels(scope["method"], rota.path)
+        em_andamento.inc()
+        try:
+            await app_rota(scope, receive, send)
+        finally:
+            em_andamento.dec()
+
+    rota.app = app_com_contagem
+
+
+def setup_metricas(app):
+    """
+    Configura as métricas HTTP
+
+    Deve ser chamado depois de registrar os routers: o gauge de requisições em
+    andamento é aplicado em cada rota (só ali o template já é conhecido).
+    """
+    app.add_middleware(MetricasMiddleware)
+    for rota in app.routes:
+        if isinstance(rota, Route):
+            _contar_em_andamento(rota)
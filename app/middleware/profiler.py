@@ -0,0 +1,143 @@
+"""
+Middleware do profiler de requisições
+
+Um admin pede o profile de qualquer requisição com o header
+`X-Profile: cprofile|amostragem` (ou `?profile=cprofile|amostragem`; "1" = cprofile).
+Com PROFILE_SAMPLE_RATE = N, 1 em cada N requisições é perfilada automaticamente
+(modo PROFILE_SAMPLE_MODE). A resposta traz o header X-Profile-Id com o id do
+perfil, baixado em /api/v1/admin/profiles/{id}.
+
+O profiler envolve a função do endpoint (route.dependant.call) para rodar na
+mesma thread que ela: handlers sync executam no threadpool, fora da thread do
+middleware. Em endpoints async o profile mede a thread do event loop, com as
+limitações descritas em app.utils.profiler (cprofile serializado).
+"""
+import functools
+import inspect
+import itertools
+import logging
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import Request
+
+from app.config import settings
+from app.utils.profiler import MODOS, Perfilador, PerfilSolicitado, perfil_solicitado
+
+logger = logging.getLogger(__name__)
+
+_contador_amostragem = itertools.count(1)
+
+
+async def _usuario_admin(request: Request) -> bool:
+    """Valida o token da requisição com get_current_user + require_admin"""
+    from app.database import AsyncSessionLocal
+    from app.utils.dependencies import get_current_user, require_admin
+
+    esquema, _, token = request.headers.get("authorization", "").partition(" ")
+    if esquema.lower() != "bearer" or not token:
+        return False
+
+    db = AsyncSessionLocal()
+    try:
+        credenciais = HTTPAuthorizationCredentials(scheme=esquema, credentials=token)
+        await require_admin(await get_current_user(request, credenciais, db))
+    except HTTPException:
+        return False
+    finally:
+        await db.close()
+    return True
+
+
+def _modo_pedido(request: Request):
+    pedido = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not pedido:
+        return None
+    pedido = pedido.lower()
+    if pedido in ("1", "true"):
+        return "cprofile"
+    return pedido if pedido in MODOS else None
+
+
+class ProfilerMiddleware:
+    """Decide se a requisição será perfilada e devolve o id no header X-Profile-Id"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        modo = _modo_pedido(request)
+        if modo is not None and not await _usuario_admin(request):
+            logger.warning(f"Profile ignorado (usuário não é admin): {scope['method']} {scope['path']}")
+            modo = None
+        if modo is None and settings.PROFILE_SAMPLE_RATE > 0:
+            if next(_contador_amostragem) % settings.PROFILE_SAMPLE_RATE == 0:
+                modo = settings.PROFILE_SAMPLE_MODE
+
+        if modo is None:
+            await self.app(scope, receive, send)
+            return
+
+        perfil = PerfilSolicitado(modo, scope["method"], scope["path"])
+        token = perfil_solicitado.set(perfil)
+
+        async def send_com_id(message):
+            if message["type"] == "http.response.start" and perfil.salvo:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", perfil.id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_id)
+        finally:
+            perfil_solicitado.reset(token)
+
+
+def _perfilar_endpoint(rota: APIRoute):
+    """
+    Envolve a função do endpoint com o profiler
+
+    O wrapper mantém o tipo da função (async ou sync), que o FastAPI usa para
+    decidir entre await e threadpool.
+    """
+    chamada = rota.dependant.call
+
+    def _perfil():
+        perfil = perfil_solicitado.get()
+        if perfil is not None:
+            perfil.rota = rota.path
+        return perfil
+
+    if inspect.iscoroutinefunction(chamada):
+        @functools.wraps(chamada)
+        async def chamada_perfilada(*args, **kwargs):
+            perfil = _perfil()
+            if perfil is None:
+                return await chamada(*args, **kwargs)
+            with Perfilador(perfil):
+                return await chamada(*args, **kwargs)
+    else:
+        @functools.wraps(chamada)
+        def chamada_perfilada(*args, **kwargs):
+            perfil = _perfil()
+            if perfil is None:
+                return chamada(*args, **kwargs)
+            with Perfilador(perfil):
+                return chamada(*args, **kwargs)
+
+    rota.dependant.call = chamada_perfilada
+
+
+def setup_profiler(app):
+    """Configura o profiler (depois de registrar todas as rotas)"""
+    app.add_middleware(ProfilerMiddleware)
+    for rota in app.routes:
+        if isinstance(rota, APIRoute):
+            _perfilar_endpoint(rota)
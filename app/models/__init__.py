@@ -8,6 +8,7 @@ from app.models.ordem_servico import OrdemServico, Caixa
 from app.models.auxiliares import Categoria, Marca, Setor, FaseOS, TipoCalibracao
 from app.models.anexos import Documento, Foto, LogoEmpresa
 from app.models.logs import LogSistema, LogOrdemServico
+from app.models.dashboard import DashboardContador
 
 __all__ = [
     "Usuario",
@@ -27,4 +28,5 @@ __all__ = [
     "LogoEmpresa",
     "LogSistema",
     "LogOrdemServico",
+    "DashboardContador",
 ]
@@ -0,0 +1,24 @@
+"""
+Model de Contadores do Dashboard
+"""
+from sqlalchemy import Column, Integer, String, DATE, TIMESTAMP
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DashboardContador(Base):
+    """
+    Resumo incremental dos cards do dashboard
+
+    Contadores simples usam data_referencia = SEM_DATA (ver contadores_service);
+    contadores por data guardam uma linha por dia (vencimentos, finalizações).
+    """
+    __tablename__ = "dashboard_counters"
+
+    chave = Column(String(50), primary_key=True)
+    data_referencia = Column(DATE, primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+    data_atualizacao = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DashboardContador {self.chave} {self.data_referencia}={self.valor}>"
@@ -0,0 +1,312 @@
+"""
+Roteamento de leituras para réplicas do banco (opcional)
+
+Com DATABASE_REPLICA_URLS configurada, as sessões das requisições (get_async_db
+e, nas requisições de leitura, get_db) enviam SELECTs para uma réplica saudável
+(round-robin) e todo o resto para o primário:
+
+- INSERT/UPDATE/DELETE, flush e SQL textual vão sempre para o primário
+- requisições de escrita (POST/PUT/PATCH/DELETE) usam apenas o primário
+- um usuário que escreveu nos últimos REPLICA_READ_AFTER_WRITE_SECONDS lê do
+  primário (lê o que acabou de gravar, mesmo com atraso de replicação)
+- réplicas que falham no health check saem do rodízio até responderem de novo
+- sessões sync fora de requisições (scripts, threads de background) ficam no primário
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.config import settings
+from app.utils.metricas import (
+    AsyncAdaptedQueuePoolInstrumentado,
+    QueuePoolInstrumentado,
+    instrumentar_pool
+)
+
+# app.database importa este módulo (SessionLocal usa a RoutingSession): os nomes de
+# app.database são importados dentro das funções
+
+# Métodos HTTP que não alteram dados (podem ler das réplicas)
+METODOS_LEITURA = {"GET", "HEAD", "OPTIONS"}
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    """Réplica de leitura e seu estado de saúde"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.nome = make_url(url).render_as_string(hide_password=True)
+        self._engine: Optional[AsyncEngine] = None
+        self._engine_sync: Optional[Engine] = None
+        self.saudavel = True
+        self.ultima_verificacao: Optional[datetime] = None
+        self.latencia_ms: Optional[float] = None
+        self.erro: Optional[str] = None
+        self.leituras = 0
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Engine async (sessões de get_async_db e health check)"""
+        from app.database import MAX_OVERFLOW, POOL_SIZE, converter_url_async
+
+        if self._engine is None:
+            url = converter_url_async(self.url)
+            opcoes = {"pool_pre_ping": True, "echo": settings.DEBUG}
+            if not url.startswith("sqlite"):
+                opcoes.update(
+                    poolclass=AsyncAdaptedQueuePoolInstrumentado,
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                )
+            self._engine = create_async_engine(url, **opcoes)
+            instrumentar_pool(f"replica:{self.nome}", self._engine.pool)
+        return self._engine
+
+    @property
+    def engine_sync(self) -> Engine:
+        """Engine sync (sessões de get_db nas rotas sync)"""
+        from app.database import MAX_OVERFLOW, POOL_SIZE
+
+        if self._engine_sync is None:
+            self._engine_sync = create_engine(
+                self.url,
+                poolclass=QueuePoolInstrumentado,
+                pool_size=POOL_SIZE,
+                max_overflow=MAX_OVERFLOW,
+                pool_pre_ping=True,
+                echo=settings.DEBUG
+            )
+            instrumentar_pool(f"replica-sync:{self.nome}", self._engine_sync.pool)
+        return self._engine_sync
+
+    async def verificar(self, timeout: float):
+        """Health check (SELECT 1 com timeout)"""
+        inicio = time.perf_counter()
+        try:
+            async with self.engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout)
+        except Exception as e:
+            if self.saudavel:
+                logger.warning(f"Réplica {self.nome} fora do rodízio: {e}")
+            self.saudavel = False
+            self.erro = str(e) or type(e).__name__
+        else:
+            if not self.saudavel:
+                logger.info(f"Réplica {self.nome} de volta ao rodízio")
+            self.saudavel = True
+            self.erro = None
+            self.latencia_ms = round((time.perf_counter() - inicio) * 1000, 2)
+        finally:
+            self.ultima_verificacao = datetime.utcnow()
+
+    async def dispose(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+        if self._engine_sync is not None:
+            self._engine_sync.dispose()
+            self._engine_sync = None
+
+
+class RoteadorReplicas:
+    """Escolha de réplica, janela de leitura após escrita e estatísticas"""
+
+    def __init__(self, urls: List[str], janela_escrita: float, intervalo_verificacao: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.janela_escrita = janela_escrita
+        self.intervalo_verificacao = intervalo_verificacao
+        self.decisoes: Counter = Counter()
+        self._rodizio = itertools.count()
+        self._escritas: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._tarefa: Optional[asyncio.Task] = None
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self.replicas)
+
+    def escolher(self) -> Optional[Replica]:
+        """Próxima réplica saudável (round-robin) ou None"""
+        saudaveis = [r for r in self.replicas if r.saudavel]
+        if not saudaveis:
+            return None
+        replica = saudaveis[next(self._rodizio) % len(saudaveis)]
+        replica.leituras += 1
+        return replica
+
+    def registrar_decisao(self, motivo: str):
+        self.decisoes[motivo] += 1
+
+    # ========== LEITURA APÓS ESCRITA ==========
+
+    def registrar_escrita(self, user_id: int):
+        """Marca que o usuário fez uma escrita agora"""
+        agora = time.monotonic()
+        with self._lock:
+            self._escritas[user_id] = agora
+            if len(self._escritas) > 10000:
+                limite = agora - self.janela_escrita
+                self._escritas = {u: t for u, t in self._escritas.items() if t >= limite}
+
+    def escreveu_recentemente(self, user_id: int) -> bool:
+        """True se o usuário escreveu dentro da janela de leitura no primário"""
+        with self._lock:
+            momento = self._escritas.get(user_id)
+        return momento is not None and time.monotonic() - momento < self.janela_escrita
+
+    # ========== HEALTH CHECK ==========
+
+    async def verificar(self):
+        timeout = max(self.intervalo_verificacao / 2, 1)
+        await asyncio.gather(*(r.verificar(timeout) for r in self.replicas))
+
+    async def _executar(self):
+        while True:
+            await self.verificar()
+            await asyncio.sleep(self.intervalo_verificacao)
+
+    def iniciar(self):
+        """Inicia o health check periódico (startup da aplicação)"""
+        if self.ativo and self._tarefa is None:
+            self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def parar(self):
+        """Para o health check e fecha as conexões (shutdown da aplicação)"""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def estatisticas(self) -> dict:
+        return {
+            "ativo": self.ativo,
+            "janela_leitura_apos_escrita_s": self.janela_escrita,
+            "decisoes": dict(self.decisoes),
+            "replicas": [
+                {
+                    "url": r.nome,
+                    "saudavel": r.saudavel,
+                    "leituras": r.leituras,
+                    "latencia_ms": r.latencia_ms,
+                    "ultima_verificacao": r.ultima_verificacao.isoformat() if r.ultima_verificacao else None,
+                    "erro": r.erro
+                }
+                for r in self.replicas
+            ]
+        }
+
+
+roteador = RoteadorReplicas(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    janela_escrita=settings.REPLICA_READ_AFTER_WRITE_SECONDS,
+    intervalo_verificacao=settings.REPLICA_HEALTH_CHECK_INTERVAL
+)
+
+
+def usar_primario(session: Session):
+    """Fixa a sessão no primário (escritas e leitura após escrita)"""
+    session.info["usar_primario"] = True
+
+
+def vincular_requisicao(session: Session, request: Request):
+    """
+    Libera a leitura em réplica de uma sessão sync (get_db) conforme a requisição
+
+    Requisições de escrita ficam no primário. Nas de leitura, a decisão de leitura
+    após escrita é tomada por get_current_user (request.state.usar_primario), que
+    pode ser resolvido depois de get_db: por isso a sessão guarda o request.state
+    e o consulta apenas no primeiro SELECT.
+    """
+    if request.method in METODOS_LEITURA:
+        session.info["estado_requisicao"] = request.state
+
+
+class RoutingSession(Session):
+    """
+    Session que escolhe o banco por comando (SessionLocal / get_db)
+
+    SELECTs vão para a réplica escolhida na primeira leitura da sessão (todas as
+    leituras de uma requisição veem o mesmo banco); o resto vai para o primário.
+    Sessões sync só leem de réplica quando vinculadas a uma requisição de leitura
+    (vincular_requisicao); as demais ficam no primário.
+    """
+
+    def _engine_primario(self) -> Engine:
+        from app.database import engine
+
+        return engine
+
+    def _engine_replica(self, replica: Replica) -> Engine:
+        return replica.engine_sync
+
+    def _motivo_primario(self) -> Optional[str]:
+        """Motivo para ler do primário, ou None se a leitura pode ir à réplica"""
+        estado = self.info.get("estado_requisicao")
+        if estado is None:
+            return "primario_fora_de_requisicao"
+        if self.info.get("usar_primario") or getattr(estado, "usar_primario", False):
+            return "primario_leitura_apos_escrita"
+        return None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primario = self._engine_primario()
+
+        if self._flushing or not isinstance(clause, Select):
+            roteador.registrar_decisao("primario_escrita")
+            return primario
+        motivo = self._motivo_primario()
+        if motivo is not None:
+            roteador.registrar_decisao(motivo)
+            return primario
+
+        replica = self.info.get("replica")
+        if replica is None or not replica.saudavel:
+            replica = roteador.escolher()
+            if replica is None:
+                roteador.registrar_decisao("primario_sem_replica")
+                return primario
+            self.info["replica"] = replica
+
+        roteador.registrar_decisao("replica")
+        return self._engine_replica(replica)
+
+
+class RoutingAsyncSession(RoutingSession):
+    """
+    Session sync por trás das AsyncSession (get_async_db)
+
+    Usa os engines async; lê de réplica salvo quando fixada no primário por
+    usar_primario (get_current_user em escritas e leitura após escrita).
+    """
+
+    def _engine_primario(self) -> Engine:
+        from app.database import get_async_engine
+
+        return get_async_engine().sync_engine
+
+    def _engine_replica(self, replica: Replica) -> Engine:
+        return replica.engine.sync_engine
+
+    def _motivo_primario(self) -> Optional[str]:
+        if self.info.get("usar_primario"):
+            return "primario_leitura_apos_escrita"
+        return None
@@ -0,0 +1,90 @@
+"""
+Router de Administração (diagnóstico de desempenho)
+"""
+import io
+import os
+import pstats
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.models.usuario import Usuario
+from app.utils.consultas_lentas import consultas_lentas
+from app.utils.dependencies import require_admin
+from app.utils.profiler import arquivo_perfil, listar_perfis
+
+router = APIRouter(prefix="/admin", tags=["Administração"])
+
+
+@router.get("/consultas-lentas")
+def list_consultas_lentas(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    Consultas acima de SLOW_QUERY_MS agrupadas por formato, ordenadas pelo tempo
+    total (apenas admin)
+
+    Dados do processo que atendeu a requisição, desde o início ou a última limpeza.
+    """
+    return {
+        "success": True,
+        "data": consultas_lentas.top(limit)
+    }
+
+
+@router.delete("/consultas-lentas")
+def limpar_consultas_lentas(current_user: Usuario = Depends(require_admin)):
+    """Zera o agregado de consultas lentas (apenas admin)"""
+    consultas_lentas.limpar()
+
+    return {
+        "success": True,
+        "message": "Consultas lentas zeradas"
+    }
+
+
+@router.get("/profiles")
+def list_profiles(current_user: Usuario = Depends(require_admin)):
+    """Perfis de requisições salvos, mais recentes primeiro (apenas admin)"""
+    return {
+        "success": True,
+        "data": listar_perfis()
+    }
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    formato: str = Query("arquivo", pattern="^(arquivo|texto)$"),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    Baixa um perfil (apenas admin)
+
+    - **formato=arquivo**: .pstats (cprofile) ou .collapsed (amostragem, para flamegraph)
+    - **formato=texto**: resumo legível (funções por tempo acumulado, apenas cprofile)
+    """
+    encontrado = arquivo_perfil(profile_id)
+    if not encontrado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil não encontrado"
+        )
+    caminho, modo = encontrado
+
+    if formato == "texto":
+        if modo != "cprofile":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Resumo em texto disponível apenas para perfis cprofile"
+            )
+        saida = io.StringIO()
+        pstats.Stats(caminho, stream=saida).sort_stats("cumulative").print_stats(60)
+        return PlainTextResponse(saida.getvalue())
+
+    return FileResponse(
+        caminho,
+        media_type="application/octet-stream",
+        filename=os.path.basename(caminho)
+    )
@@ -3,8 +3,9 @@ Router de Autenticação
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.schemas.auth import LoginRequest, TokenResponse, TokenRefreshRequest
 from app.schemas.usuario import UsuarioResponse
 from app.services.auth_service import AuthService
@@ -15,18 +16,21 @@ router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Realiza login e retorna tokens de acesso
 
     - **login**: Login do usuário
     - **senha**: Senha do usuário
+
+    Em picos de login as verificações de senha excedentes aguardam no event loop
+    (sem ocupar o threadpool); com a fila cheia a resposta é 503 com Retry-After.
     """
     # Autenticar usuário
-    user = AuthService.authenticate_user(db, credentials.login, credentials.senha)
+    user = await AuthService.authenticate_user(db, credentials.login, credentials.senha)
 
     # Criar tokens
     tokens = AuthService.create_tokens(user)
@@ -60,8 +64,8 @@ def logout(current_user: Usuario = Depends(get_current_active_user)):
 
 
 @router.get("/me", response_model=UsuarioResponse)
-def get_current_user_info(current_user: Usuario = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: Usuario = Depends(get_current_active_user)):
     """
     Retorna informações do usuário autenticado
     """
-    return current_user
+    return await current_user.carregar_usuario()
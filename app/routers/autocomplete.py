@@ -0,0 +1,38 @@
+"""
+Router de Autocomplete (campos de seleção com busca por prefixo)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.models.usuario import Usuario
+from app.services.autocomplete_service import autocomplete
+from app.utils.dependencies import get_current_active_user
+
+router = APIRouter(prefix="/autocomplete", tags=["Autocomplete"])
+
+
+@router.get("/{entidade}")
+async def autocomplete_prefixo(
+    entidade: str,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Sugestões por prefixo, sem acentos e sem diferenciar maiúsculas
+
+    - **empresas**: razão social ou nome fantasia
+    - **equipamentos**: descrição ou código
+
+    Responde de um índice em memória (sem consulta ao banco).
+    """
+    indice = autocomplete.indices.get(entidade)
+    if indice is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Autocomplete disponível para: {', '.join(autocomplete.indices)}"
+        )
+
+    return {
+        "success": True,
+        "data": indice.buscar(prefix, limit)
+    }
@@ -0,0 +1,51 @@
+"""
+Router da Busca unificada
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_async_db
+from app.models.usuario import Usuario
+from app.services.busca_service import BuscaService, TIPOS_BUSCA
+from app.utils.dependencies import get_current_active_user
+
+router = APIRouter(prefix="/search", tags=["Busca"])
+
+
+@router.get("", response_model=dict)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    tipos: Optional[str] = Query(None, description="empresa,equipamento,ordem_servico (padrão: todos)"),
+    limit: int = Query(5, ge=1, le=50, description="Resultados por tipo"),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Busca em empresas, equipamentos e ordens de serviço
+
+    Resultados tipados e ordenados por relevância, até `limit` por tipo. Para
+    mais resultados repita a busca com o `next_cursor` da resposta (continua só
+    os tipos que ainda têm resultados).
+    """
+    if tipos:
+        pedidos = [tipo.strip() for tipo in tipos.split(",") if tipo.strip()]
+        invalidos = [tipo for tipo in pedidos if tipo not in TIPOS_BUSCA]
+        if invalidos or not pedidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tipos inválidos: {', '.join(invalidos) or '(vazio)'}. "
+                       f"Disponíveis: {', '.join(TIPOS_BUSCA)}"
+            )
+    else:
+        pedidos = list(TIPOS_BUSCA)
+
+    def _buscar(session: Session):
+        return BuscaService.buscar(session, q, pedidos, limit, cursor)
+
+    return {
+        "success": True,
+        "data": await db.run_sync(_buscar)
+    }
@@ -3,10 +3,11 @@ Router de Categorias
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.auxiliares import Categoria
 from app.models.usuario import Usuario
 from app.schemas.auxiliares import (
@@ -15,47 +16,43 @@ from app.schemas.auxiliares import (
     CategoriaResponse
 )
 from app.utils.dependencies import get_current_active_user
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate, ChaveOrdenacao, PADRAO_CONTAGEM
+from app.utils.respostas import resposta_pagina
 
 router = APIRouter(prefix="/equipamentos/categorias", tags=["Categorias"])
 
 
 @router.get("", response_model=dict)
-def list_categorias(
+async def list_categorias(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = Query(None, pattern=PADRAO_CONTAGEM),
     search: Optional[str] = None,
     ativo: Optional[str] = Query(None, pattern="^[SN]$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Lista categorias com filtros e paginação"""
-    query = db.query(Categoria)
+    def _listar(session: Session):
+        query = session.query(Categoria)
 
-    # Aplicar filtros
-    if search:
-        query = query.filter(Categoria.nome.ilike(f"%{search}%"))
-    if ativo:
-        query = query.filter(Categoria.ativo == ativo)
+        # Aplicar filtros
+        if search:
+            query = query.filter(Categoria.nome.ilike(f"%{search}%"))
+        if ativo:
+            query = query.filter(Categoria.ativo == ativo)
 
-    # Ordenar por nome
-    query = query.order_by(Categoria.nome)
+        # Ordenar por nome
+        ordenacao = [ChaveOrdenacao(Categoria.nome), ChaveOrdenacao(Categoria.id)]
 
-    # Paginar
-    result = paginate(query, page, size)
+        # Paginar
+        result = paginate(query, page, size, ordenacao, cursor, incluir_total, contagem)
 
-    return {
-        "success": True,
-        "data": {
-            "items": [CategoriaResponse.model_validate(c) for c in result.items],
-            "pagination": {
-                "total": result.total,
-                "page": result.page,
-                "size": result.size,
-                "pages": result.pages
-            }
-        }
-    }
+        return resposta_pagina(CategoriaResponse, result)
+
+    return await db.run_sync(_listar)
 
 
 @router.get("/{categoria_id}", response_model=CategoriaResponse)
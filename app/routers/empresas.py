@@ -3,10 +3,11 @@ Router de Empresas
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, date
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.empresa import Empresa, EmpresaHistorico
 from app.models.usuario import Usuario
 from app.schemas.empresa import (
@@ -16,8 +17,13 @@ from app.schemas.empresa import (
     EmpresaListResponse,
     EmpresaHistoricoResponse
 )
+from app.services.autocomplete_service import autocomplete
+from app.services.contadores_service import ContadoresDashboardService
 from app.utils.dependencies import get_current_active_user
-from app.utils.pagination import paginate
+from app.utils.busca import filtro_contem, ordenacao_busca
+from app.utils.pagination import paginate, ChaveOrdenacao, PADRAO_CONTAGEM
+from app.utils.projecao import consulta_projetada, schema_com_campos, DESCRICAO_FIELDS
+from app.utils.respostas import resposta_pagina, resposta_item
 
 router = APIRouter(prefix="/empresas", tags=["Empresas"])
 
@@ -63,9 +69,12 @@ def criar_historico(db: Session, empresa: Empresa, usuario_id: int, tipo_operaca
 
 
 @router.get("", response_model=dict)
-def list_empresas(
+async def list_empresas(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = Query(None, pattern=PADRAO_CONTAGEM),
     razao_social: Optional[str] = None,
     cnpj: Optional[str] = None,
     cpf: Optional[str] = None,
@@ -74,64 +83,65 @@ def list_empresas(
     status_contato: Optional[str] = None,
     cidade: Optional[str] = None,
     estado: Optional[str] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Lista empresas com filtros e paginação"""
-    query = db.query(Empresa)
-
-    # Aplicar filtros
-    if razao_social:
-        query = query.filter(Empresa.razao_social.ilike(f"%{razao_social}%"))
-    if cnpj:
-        query = query.filter(Empresa.cnpj == cnpj)
-    if cpf:
-        query = query.filter(Empresa.cpf == cpf)
-    if tipo_pessoa:
-        query = query.filter(Empresa.tipo_pessoa == tipo_pessoa)
-    if ativo:
-        query = query.filter(Empresa.ativo == ativo)
-    if status_contato:
-        query = query.filter(Empresa.status_contato == status_contato)
-    if cidade:
-        query = query.filter(Empresa.cidade.ilike(f"%{cidade}%"))
-    if estado:
-        query = query.filter(Empresa.estado == estado)
-
-    # Ordenar por razão social
-    query = query.order_by(Empresa.razao_social)
-
-    # Paginar
-    result = paginate(query, page, size)
-
-    return {
-        "success": True,
-        "data": {
-            "items": [EmpresaListResponse.model_validate(e) for e in result.items],
-            "pagination": {
-                "total": result.total,
-                "page": result.page,
-                "size": result.size,
-                "pages": result.pages
-            }
-        }
-    }
+    schema = schema_com_campos(EmpresaListResponse, fields)
+
+    def _listar(session: Session):
+        # Ordenar por razão social (ou por relevância nas buscas por texto)
+        ordenacao = ordenacao_busca(
+            session,
+            [(Empresa.razao_social, razao_social), (Empresa.cidade, cidade)],
+            [ChaveOrdenacao(Empresa.razao_social), ChaveOrdenacao(Empresa.id)],
+            Empresa.id
+        )
+        query = consulta_projetada(session, Empresa, schema, *(chave.coluna for chave in ordenacao))
+
+        # Aplicar filtros
+        if razao_social:
+            query = query.filter(filtro_contem(Empresa.razao_social, razao_social))
+        if cnpj:
+            query = query.filter(Empresa.cnpj == cnpj)
+        if cpf:
+            query = query.filter(Empresa.cpf == cpf)
+        if tipo_pessoa:
+            query = query.filter(Empresa.tipo_pessoa == tipo_pessoa)
+        if ativo:
+            query = query.filter(Empresa.ativo == ativo)
+        if status_contato:
+            query = query.filter(Empresa.status_contato == status_contato)
+        if cidade:
+            query = query.filter(filtro_contem(Empresa.cidade, cidade))
+        if estado:
+            query = query.filter(Empresa.estado == estado)
+
+        # Paginar
+        result = paginate(query, page, size, ordenacao, cursor, incluir_total, contagem)
+
+        return resposta_pagina(schema, result)
+
+    return await db.run_sync(_listar)
 
 
 @router.get("/{empresa_id}", response_model=EmpresaResponse)
 def get_empresa(
     empresa_id: int,
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Busca empresa por ID"""
-    empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+    schema = schema_com_campos(EmpresaResponse, fields)
+    empresa = consulta_projetada(db, Empresa, schema).filter(Empresa.id == empresa_id).first()
     if not empresa:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Empresa não encontrada"
         )
-    return empresa
+    return resposta_item(schema, empresa)
 
 
 @router.post("", response_model=EmpresaResponse, status_code=status.HTTP_201_CREATED)
@@ -161,6 +171,7 @@ def create_empresa(
         data_cadastro=date.today()
     )
     db.add(db_empresa)
+    ContadoresDashboardService.registrar_empresa(db, db_empresa, None)
     db.commit()
     db.refresh(db_empresa)
 
@@ -168,6 +179,8 @@ def create_empresa(
     criar_historico(db, db_empresa, current_user.id, "INSERT")
     db.commit()
 
+    autocomplete.empresas.atualizar(db_empresa)
+
     return db_empresa
 
 
@@ -201,10 +214,12 @@ def update_empresa(
             )
 
     # Atualizar campos
+    estado_anterior = ContadoresDashboardService.snapshot_empresa(db_empresa)
     update_data = empresa.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_empresa, field, value)
 
+    ContadoresDashboardService.registrar_empresa(db, db_empresa, estado_anterior)
     db.commit()
     db.refresh(db_empresa)
 
@@ -212,6 +227,8 @@ def update_empresa(
     criar_historico(db, db_empresa, current_user.id, "UPDATE")
     db.commit()
 
+    autocomplete.empresas.atualizar(db_empresa)
+
     return db_empresa
 
 
@@ -234,9 +251,13 @@ def delete_empresa(
     db.commit()
 
     # Hard delete - deleta permanentemente do banco
+    estado_anterior = ContadoresDashboardService.snapshot_empresa(db_empresa)
     db.delete(db_empresa)
+    ContadoresDashboardService.registrar_empresa(db, None, estado_anterior)
     db.commit()
 
+    autocomplete.empresas.remover(empresa_id)
+
     return {
         "success": True,
         "message": "Empresa deletada com sucesso"
@@ -257,12 +278,17 @@ def toggle_ativo(
             detail="Empresa não encontrada"
         )
 
+    estado_anterior = ContadoresDashboardService.snapshot_empresa(db_empresa)
     db_empresa.ativo = "S" if db_empresa.ativo == "N" else "N"
+    ContadoresDashboardService.registrar_empresa(db, db_empresa, estado_anterior)
     db.commit()
 
     criar_historico(db, db_empresa, current_user.id, "UPDATE")
     db.commit()
 
+    # Desativada sai do autocomplete; reativada volta
+    autocomplete.empresas.atualizar(db_empresa)
+
     return {
         "success": True,
         "message": f"Empresa {'ativada' if db_empresa.ativo == 'S' else 'desativada'} com sucesso"
@@ -322,7 +348,9 @@ def update_status_contato(
             detail="Empresa não encontrada"
         )
 
+    estado_anterior = ContadoresDashboardService.snapshot_empresa(db_empresa)
     db_empresa.status_contato = status_contato
+    ContadoresDashboardService.registrar_empresa(db, db_empresa, estado_anterior)
     db.commit()
 
     return {
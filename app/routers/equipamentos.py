@@ -3,10 +3,11 @@ Router de Equipamentos e Equipamentos Empresa
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.equipamento import Equipamento, EquipamentoEmpresa
 from app.models.usuario import Usuario
 from app.schemas.equipamento import (
@@ -18,8 +19,14 @@ from app.schemas.equipamento import (
     EquipamentoEmpresaUpdate,
     EquipamentoEmpresaResponse
 )
+from app.services.autocomplete_service import autocomplete
+from app.services.contadores_service import ContadoresDashboardService
 from app.utils.dependencies import get_current_active_user
-from app.utils.pagination import paginate
+from app.utils.busca import filtro_contem, ordenacao_busca
+from app.utils.pagination import paginate, ChaveOrdenacao, PADRAO_CONTAGEM
+from app.utils.projecao import consulta_projetada, schema_com_campos, DESCRICAO_FIELDS
+from app.utils.exportacao import resposta_csv
+from app.utils.respostas import resposta_pagina, resposta_item
 
 router = APIRouter(prefix="/equipamentos", tags=["Equipamentos"])
 router_empresa = APIRouter(prefix="/equipamentos-empresa", tags=["Equipamentos Empresa"])
@@ -28,65 +35,70 @@ router_empresa = APIRouter(prefix="/equipamentos-empresa", tags=["Equipamentos E
 # ========== EQUIPAMENTOS (Catálogo) ==========
 
 @router.get("", response_model=dict)
-def list_equipamentos(
+async def list_equipamentos(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = Query(None, pattern=PADRAO_CONTAGEM),
     descricao: Optional[str] = None,
     codigo: Optional[str] = None,
     categoria_id: Optional[int] = None,
     marca_id: Optional[int] = None,
     ativo: Optional[str] = Query(None, pattern="^[SN]$"),
     destaque: Optional[str] = Query(None, pattern="^[SN]$"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Lista equipamentos do catálogo"""
-    query = db.query(Equipamento)
-
-    if descricao:
-        query = query.filter(Equipamento.descricao.ilike(f"%{descricao}%"))
-    if codigo:
-        query = query.filter(Equipamento.codigo.ilike(f"%{codigo}%"))
-    if categoria_id:
-        query = query.filter(Equipamento.categoria_id == categoria_id)
-    if marca_id:
-        query = query.filter(Equipamento.marca_id == marca_id)
-    if ativo:
-        query = query.filter(Equipamento.ativo == ativo)
-    if destaque:
-        query = query.filter(Equipamento.destaque == destaque)
-
-    query = query.order_by(Equipamento.descricao)
-    result = paginate(query, page, size)
+    schema = schema_com_campos(EquipamentoListResponse, fields)
+
+    def _listar(session: Session):
+        ordenacao = ordenacao_busca(
+            session,
+            [(Equipamento.descricao, descricao), (Equipamento.codigo, codigo)],
+            [ChaveOrdenacao(Equipamento.descricao), ChaveOrdenacao(Equipamento.id)],
+            Equipamento.id
+        )
+        query = consulta_projetada(session, Equipamento, schema, *(chave.coluna for chave in ordenacao))
 
-    return {
-        "success": True,
-        "data": {
-            "items": [EquipamentoListResponse.model_validate(e) for e in result.items],
-            "pagination": {
-                "total": result.total,
-                "page": result.page,
-                "size": result.size,
-                "pages": result.pages
-            }
-        }
-    }
+        if descricao:
+            query = query.filter(filtro_contem(Equipamento.descricao, descricao))
+        if codigo:
+            query = query.filter(filtro_contem(Equipamento.codigo, codigo))
+        if categoria_id:
+            query = query.filter(Equipamento.categoria_id == categoria_id)
+        if marca_id:
+            query = query.filter(Equipamento.marca_id == marca_id)
+        if ativo:
+            query = query.filter(Equipamento.ativo == ativo)
+        if destaque:
+            query = query.filter(Equipamento.destaque == destaque)
+
+        result = paginate(query, page, size, ordenacao, cursor, incluir_total, contagem)
+
+        return resposta_pagina(schema, result)
+
+    return await db.run_sync(_listar)
 
 
 @router.get("/{equipamento_id}", response_model=EquipamentoResponse)
 def get_equipamento(
     equipamento_id: int,
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Busca equipamento por ID"""
-    equipamento = db.query(Equipamento).filter(Equipamento.id == equipamento_id).first()
+    schema = schema_com_campos(EquipamentoResponse, fields)
+    equipamento = consulta_projetada(db, Equipamento, schema).filter(Equipamento.id == equipamento_id).first()
     if not equipamento:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Equipamento não encontrado"
         )
-    return equipamento
+    return resposta_item(schema, equipamento)
 
 
 @router.post("", response_model=EquipamentoResponse, status_code=status.HTTP_201_CREATED)
@@ -111,6 +123,8 @@ def create_equipamento(
     db.commit()
     db.refresh(db_equipamento)
 
+    autocomplete.equipamentos.atualizar(db_equipamento)
+
     return db_equipamento
 
 
@@ -144,6 +158,8 @@ def update_equipamento(
     db.commit()
     db.refresh(db_equipamento)
 
+    autocomplete.equipamentos.atualizar(db_equipamento)
+
     return db_equipamento
 
 
@@ -164,6 +180,8 @@ def delete_equipamento(
     db_equipamento.ativo = "N"
     db.commit()
 
+    autocomplete.equipamentos.remover(equipamento_id)
+
     return {
         "success": True,
         "message": "Equipamento deletado com sucesso"
@@ -172,63 +190,111 @@ def delete_equipamento(
 
 # ========== EQUIPAMENTOS EMPRESA ==========
 
+class FiltrosEquipamentoEmpresa:
+    """Filtros da listagem de equipamentos empresa (os mesmos na exportação CSV)"""
+
+    def __init__(
+        self,
+        empresa_id: Optional[int] = None,
+        equipamento_id: Optional[int] = None,
+        numero_serie: Optional[str] = None,
+        status: Optional[str] = Query(None, pattern="^[AIMB]$"),
+        vencimento_ate: Optional[date] = None
+    ):
+        self.empresa_id = empresa_id
+        self.equipamento_id = equipamento_id
+        self.numero_serie = numero_serie
+        self.status = status
+        self.vencimento_ate = vencimento_ate
+
+    def aplicar(self, query):
+        if self.empresa_id:
+            query = query.filter(EquipamentoEmpresa.empresa_id == self.empresa_id)
+        if self.equipamento_id:
+            query = query.filter(EquipamentoEmpresa.equipamento_id == self.equipamento_id)
+        if self.numero_serie:
+            query = query.filter(filtro_contem(EquipamentoEmpresa.numero_serie, self.numero_serie))
+        if self.status:
+            query = query.filter(EquipamentoEmpresa.status == self.status)
+        if self.vencimento_ate:
+            query = query.filter(EquipamentoEmpresa.data_proxima_calibracao <= self.vencimento_ate)
+        return query
+
+
 @router_empresa.get("", response_model=dict)
-def list_equipamentos_empresa(
+async def list_equipamentos_empresa(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    empresa_id: Optional[int] = None,
-    equipamento_id: Optional[int] = None,
-    numero_serie: Optional[str] = None,
-    status: Optional[str] = Query(None, pattern="^[AIMB]$"),
-    vencimento_ate: Optional[date] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = Query(None, pattern=PADRAO_CONTAGEM),
+    filtros: FiltrosEquipamentoEmpresa = Depends(),
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Lista equipamentos vinculados a empresas"""
-    query = db.query(EquipamentoEmpresa)
-
-    if empresa_id:
-        query = query.filter(EquipamentoEmpresa.empresa_id == empresa_id)
-    if equipamento_id:
-        query = query.filter(EquipamentoEmpresa.equipamento_id == equipamento_id)
-    if numero_serie:
-        query = query.filter(EquipamentoEmpresa.numero_serie.ilike(f"%{numero_serie}%"))
-    if status:
-        query = query.filter(EquipamentoEmpresa.status == status)
-    if vencimento_ate:
-        query = query.filter(EquipamentoEmpresa.data_proxima_calibracao <= vencimento_ate)
-
-    query = query.order_by(EquipamentoEmpresa.data_proxima_calibracao.nullslast())
-    result = paginate(query, page, size)
+    schema = schema_com_campos(EquipamentoEmpresaResponse, fields)
+
+    def _listar(session: Session):
+        ordenacao = ordenacao_busca(
+            session,
+            [(EquipamentoEmpresa.numero_serie, filtros.numero_serie)],
+            [
+                ChaveOrdenacao(EquipamentoEmpresa.data_proxima_calibracao),
+                ChaveOrdenacao(EquipamentoEmpresa.id)
+            ],
+            EquipamentoEmpresa.id
+        )
+        query = filtros.aplicar(consulta_projetada(
+            session, EquipamentoEmpresa, schema, *(chave.coluna for chave in ordenacao)
+        ))
 
-    return {
-        "success": True,
-        "data": {
-            "items": [EquipamentoEmpresaResponse.model_validate(e) for e in result.items],
-            "pagination": {
-                "total": result.total,
-                "page": result.page,
-                "size": result.size,
-                "pages": result.pages
-            }
-        }
-    }
+        result = paginate(query, page, size, ordenacao, cursor, incluir_total, contagem)
+
+        return resposta_pagina(schema, result)
+
+    return await db.run_sync(_listar)
+
+
+@router_empresa.get("/export.csv")
+def export_equipamentos_empresa(
+    filtros: FiltrosEquipamentoEmpresa = Depends(),
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Exporta os equipamentos empresa filtrados em CSV (mesmos filtros e colunas da listagem)
+
+    Todas as linhas numa única consulta, enviadas em streaming (sem paginação).
+    """
+    schema = schema_com_campos(EquipamentoEmpresaResponse, fields)
+
+    def _consulta(session: Session):
+        return filtros.aplicar(consulta_projetada(session, EquipamentoEmpresa, schema)).order_by(
+            EquipamentoEmpresa.data_proxima_calibracao.asc().nulls_last(),
+            EquipamentoEmpresa.id
+        )
+
+    return resposta_csv(_consulta, "equipamentos_empresa.csv")
 
 
 @router_empresa.get("/{item_id}", response_model=EquipamentoEmpresaResponse)
 def get_equipamento_empresa(
     item_id: int,
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Busca equipamento empresa por ID"""
-    item = db.query(EquipamentoEmpresa).filter(EquipamentoEmpresa.id == item_id).first()
+    schema = schema_com_campos(EquipamentoEmpresaResponse, fields)
+    item = consulta_projetada(db, EquipamentoEmpresa, schema).filter(EquipamentoEmpresa.id == item_id).first()
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Equipamento não encontrado"
         )
-    return item
+    return resposta_item(schema, item)
 
 
 @router_empresa.post("", response_model=EquipamentoEmpresaResponse, status_code=status.HTTP_201_CREATED)
@@ -252,6 +318,8 @@ def create_equipamento_empresa(
 
     db_item = EquipamentoEmpresa(**item.model_dump())
     db.add(db_item)
+    db.flush()
+    ContadoresDashboardService.registrar_equipamento(db, db_item, None)
     db.commit()
     db.refresh(db_item)
 
@@ -273,10 +341,12 @@ def update_equipamento_empresa(
             detail="Equipamento não encontrado"
         )
 
+    estado_anterior = ContadoresDashboardService.snapshot_equipamento(db_item)
     update_data = item.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_item, field, value)
 
+    ContadoresDashboardService.registrar_equipamento(db, db_item, estado_anterior)
     db.commit()
     db.refresh(db_item)
 
@@ -297,7 +367,9 @@ def recusar_calibracao(
             detail="Equipamento não encontrado"
         )
 
+    estado_anterior = ContadoresDashboardService.snapshot_equipamento(db_item)
     db_item.calibracao_recusada = "S" if db_item.calibracao_recusada == "N" else "N"
+    ContadoresDashboardService.registrar_equipamento(db, db_item, estado_anterior)
     db.commit()
 
     return {
@@ -2,11 +2,13 @@
 Router de Ordens de Serviço
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.ordem_servico import OrdemServico
 from app.models.logs import LogOrdemServico
 from app.models.usuario import Usuario
@@ -18,84 +20,136 @@ from app.schemas.ordem_servico import (
     OrdemServicoListResponse
 )
 from app.services.os_service import OSService
+from app.services.contadores_service import ContadoresDashboardService
 from app.utils.dependencies import get_current_active_user
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate, ChaveOrdenacao, PADRAO_CONTAGEM
+from app.utils.projecao import consulta_projetada, schema_com_campos, DESCRICAO_FIELDS
+from app.utils.exportacao import resposta_csv
+from app.utils.respostas import resposta_pagina, resposta_item
 
 router = APIRouter(prefix="/ordens-servico", tags=["Ordens de Serviço"])
 
 
+class FiltrosOrdemServico:
+    """Filtros da listagem de OS (os mesmos na exportação CSV)"""
+
+    def __init__(
+        self,
+        empresa_id: Optional[int] = None,
+        equipamento_empresa_id: Optional[int] = None,
+        fase_id: Optional[int] = None,
+        situacao_servico: Optional[str] = Query(None, pattern="^[EAFC]$"),
+        pago: Optional[str] = Query(None, pattern="^[SN]$"),
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ):
+        self.empresa_id = empresa_id
+        self.equipamento_empresa_id = equipamento_empresa_id
+        self.fase_id = fase_id
+        self.situacao_servico = situacao_servico
+        self.pago = pago
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+
+    def aplicar(self, query):
+        if self.empresa_id:
+            query = query.filter(OrdemServico.empresa_id == self.empresa_id)
+        if self.equipamento_empresa_id:
+            query = query.filter(OrdemServico.equipamento_empresa_id == self.equipamento_empresa_id)
+        if self.fase_id:
+            query = query.filter(OrdemServico.fase_id == self.fase_id)
+        if self.situacao_servico:
+            query = query.filter(OrdemServico.situacao_servico == self.situacao_servico)
+        if self.pago:
+            query = query.filter(OrdemServico.pago == self.pago)
+        if self.data_inicio:
+            query = query.filter(OrdemServico.data_solicitacao >= self.data_inicio)
+        if self.data_fim:
+            query = query.filter(OrdemServico.data_solicitacao <= self.data_fim)
+        return query
+
+
 @router.get("", response_model=dict)
-def list_ordens_servico(
+async def list_ordens_servico(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    empresa_id: Optional[int] = None,
-    equipamento_empresa_id: Optional[int] = None,
-    fase_id: Optional[int] = None,
-    situacao_servico: Optional[str] = Query(None, pattern="^[EAFC]$"),
-    pago: Optional[str] = Query(None, pattern="^[SN]$"),
-    data_inicio: Optional[date] = None,
-    data_fim: Optional[date] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = Query(None, pattern=PADRAO_CONTAGEM),
+    filtros: FiltrosOrdemServico = Depends(),
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Lista ordens de serviço com filtros"""
-    query = db.query(OrdemServico)
-
-    if empresa_id:
-        query = query.filter(OrdemServico.empresa_id == empresa_id)
-    if equipamento_empresa_id:
-        query = query.filter(OrdemServico.equipamento_empresa_id == equipamento_empresa_id)
-    if fase_id:
-        query = query.filter(OrdemServico.fase_id == fase_id)
-    if situacao_servico:
-        query = query.filter(OrdemServico.situacao_servico == situacao_servico)
-    if pago:
-        query = query.filter(OrdemServico.pago == pago)
-    if data_inicio:
-        query = query.filter(OrdemServico.data_solicitacao >= data_inicio)
-    if data_fim:
-        query = query.filter(OrdemServico.data_solicitacao <= data_fim)
-
-    query = query.order_by(OrdemServico.data_solicitacao.desc())
-    result = paginate(query, page, size)
+    schema = schema_com_campos(OrdemServicoListResponse, fields)
+
+    def _listar(session: Session):
+        ordenacao = [
+            ChaveOrdenacao(OrdemServico.data_solicitacao, descendente=True),
+            ChaveOrdenacao(OrdemServico.id, descendente=True)
+        ]
+        query = filtros.aplicar(consulta_projetada(
+            session, OrdemServico, schema, *(chave.coluna for chave in ordenacao)
+        ))
+
+        result = paginate(query, page, size, ordenacao, cursor, incluir_total, contagem)
+
+        return resposta_pagina(schema, result)
+
+    return await db.run_sync(_listar)
 
-    return {
-        "success": True,
-        "data": {
-            "items": [OrdemServicoListResponse.model_validate(os) for os in result.items],
-            "pagination": {
-                "total": result.total,
-                "page": result.page,
-                "size": result.size,
-                "pages": result.pages
-            }
-        }
-    }
+
+@router.get("/export.csv")
+def export_ordens_servico(
+    filtros: FiltrosOrdemServico = Depends(),
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Exporta as ordens de serviço filtradas em CSV (mesmos filtros e colunas da listagem)
+
+    Todas as linhas numa única consulta, enviadas em streaming (sem paginação).
+    """
+    schema = schema_com_campos(OrdemServicoListResponse, fields)
+
+    def _consulta(session: Session):
+        return filtros.aplicar(consulta_projetada(session, OrdemServico, schema)).order_by(
+            OrdemServico.data_solicitacao.desc().nulls_last(),
+            OrdemServico.id.desc()
+        )
+
+    return resposta_csv(_consulta, "ordens_servico.csv")
 
 
 @router.get("/{os_id}", response_model=OrdemServicoResponse)
 def get_ordem_servico(
     os_id: int,
+    fields: Optional[str] = Query(None, description=DESCRICAO_FIELDS),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Busca ordem de serviço por ID"""
-    os = db.query(OrdemServico).filter(OrdemServico.id == os_id).first()
+    schema = schema_com_campos(OrdemServicoResponse, fields)
+    os = consulta_projetada(db, OrdemServico, schema).filter(OrdemServico.id == os_id).first()
     if not os:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ordem de serviço não encontrada"
         )
-    return os
+    return resposta_item(schema, os)
 
 
 @router.get("/chave/{chave_acesso}", response_model=OrdemServicoResponse)
-def get_ordem_servico_by_chave(
+async def get_ordem_servico_by_chave(
     chave_acesso: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Busca ordem de serviço por chave de acesso (público para cliente)"""
-    os = db.query(OrdemServico).filter(OrdemServico.chave_acesso == chave_acesso).first()
+    result = await db.execute(
+        select(OrdemServico).where(OrdemServico.chave_acesso == chave_acesso)
+    )
+    os = result.scalars().first()
     if not os:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -174,8 +228,10 @@ def cancel_ordem_servico(
             detail="Não é possível cancelar ordem de serviço finalizada"
         )
 
+    estado_anterior = ContadoresDashboardService.snapshot_ordem(os)
     os.situacao_servico = "C"
     os.fase_id = 8  # Cancelado
+    ContadoresDashboardService.registrar_ordem(db, os, estado_anterior)
 
     # Registrar log
     log = LogOrdemServico(
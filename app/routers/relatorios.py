@@ -0,0 +1,83 @@
+"""
+Router de Relatórios (planilhas Excel)
+"""
+import os
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from app.database import get_db
+from app.models.empresa import Empresa
+from app.models.usuario import Usuario
+from app.services.relatorios_service import RelatoriosService, relatorios_limitador
+from app.utils.dependencies import get_current_active_user
+
+router = APIRouter(prefix="/relatorios", tags=["Relatórios"])
+
+TIPO_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _resposta_xlsx(caminho: str, nome_arquivo: str) -> FileResponse:
+    """Envia a planilha e remove o arquivo temporário depois do envio"""
+    return FileResponse(
+        caminho,
+        media_type=TIPO_XLSX,
+        filename=nome_arquivo,
+        background=BackgroundTask(os.remove, caminho)
+    )
+
+
+@router.get("/inventario/{empresa_id}.xlsx")
+def relatorio_inventario(
+    empresa_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Inventário de equipamentos da empresa com as datas de calibração"""
+    # Toda consulta fica dentro do limitador: a primeira ocupa uma conexão do pool
+    # (até o fim da requisição), que não deve ficar presa enquanto ela espera na fila
+    with relatorios_limitador.adquirir():
+        if not db.query(Empresa.id).filter(Empresa.id == empresa_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Empresa não encontrada"
+            )
+
+        caminho = RelatoriosService.inventario_empresa(db, empresa_id)
+    return _resposta_xlsx(caminho, f"inventario_empresa_{empresa_id}.xlsx")
+
+
+@router.get("/calibracoes-atrasadas.xlsx")
+def relatorio_calibracoes_atrasadas(
+    empresa_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Calibrações vencidas (todas as empresas ou uma), com dias em atraso"""
+    with relatorios_limitador.adquirir():
+        caminho = RelatoriosService.calibracoes_atrasadas(db, empresa_id)
+    return _resposta_xlsx(caminho, f"calibracoes_atrasadas_{date.today():%Y%m%d}.xlsx")
+
+
+@router.get("/faturamento/{ano}/{mes}.xlsx")
+def relatorio_faturamento_mensal(
+    ano: int,
+    mes: int,
+    empresa_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Faturamento do mês: ordens finalizadas com valores de serviço e frete, e totais"""
+    if not 1 <= mes <= 12 or not 2000 <= ano <= 2100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Mês ou ano inválido"
+        )
+
+    with relatorios_limitador.adquirir():
+        caminho = RelatoriosService.faturamento_mensal(db, ano, mes, empresa_id)
+    return _resposta_xlsx(caminho, f"faturamento_{ano}_{mes:02d}.xlsx")
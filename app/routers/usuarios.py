@@ -3,9 +3,10 @@ Router de Usuários
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.usuario import Usuario
 from app.schemas.usuario import (
     UsuarioCreate,
@@ -14,57 +15,53 @@ from app.schemas.usuario import (
     UsuarioResponse,
     UsuarioListResponse
 )
-from app.utils.dependencies import get_current_active_user, require_admin
+from app.utils.dependencies import get_current_active_user, require_admin, invalidar_usuario_cache
 from app.utils.security import hash_password, verify_password
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate, ChaveOrdenacao, PADRAO_CONTAGEM
+from app.utils.respostas import resposta_pagina
 
 router = APIRouter(prefix="/usuarios", tags=["Usuários"])
 
 
 @router.get("", response_model=dict)
-def list_usuarios(
+async def list_usuarios(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = Query(None, pattern=PADRAO_CONTAGEM),
     nome: Optional[str] = None,
     email: Optional[str] = None,
     perfil: Optional[str] = None,
     ativo: Optional[str] = Query(None, pattern="^[SN]$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
     Lista usuários com filtros e paginação
     """
-    query = db.query(Usuario)
+    def _listar(session: Session):
+        query = session.query(Usuario)
 
-    # Aplicar filtros
-    if nome:
-        query = query.filter(Usuario.nome.ilike(f"%{nome}%"))
-    if email:
-        query = query.filter(Usuario.email.ilike(f"%{email}%"))
-    if perfil:
-        query = query.filter(Usuario.perfil == perfil)
-    if ativo:
-        query = query.filter(Usuario.ativo == ativo)
+        # Aplicar filtros
+        if nome:
+            query = query.filter(Usuario.nome.ilike(f"%{nome}%"))
+        if email:
+            query = query.filter(Usuario.email.ilike(f"%{email}%"))
+        if perfil:
+            query = query.filter(Usuario.perfil == perfil)
+        if ativo:
+            query = query.filter(Usuario.ativo == ativo)
 
-    # Ordenar por nome
-    query = query.order_by(Usuario.nome)
+        # Ordenar por nome
+        ordenacao = [ChaveOrdenacao(Usuario.nome), ChaveOrdenacao(Usuario.id)]
 
-    # Paginar
-    result = paginate(query, page, size)
+        # Paginar
+        result = paginate(query, page, size, ordenacao, cursor, incluir_total, contagem)
 
-    return {
-        "success": True,
-        "data": {
-            "items": [UsuarioListResponse.model_validate(u) for u in result.items],
-            "pagination": {
-                "total": result.total,
-                "page": result.page,
-                "size": result.size,
-                "pages": result.pages
-            }
-        }
-    }
+        return resposta_pagina(UsuarioListResponse, result)
+
+    return await db.run_sync(_listar)
 
 
 @router.get("/{user_id}", response_model=UsuarioResponse)
@@ -152,6 +149,7 @@ def update_usuario(
 
     db.commit()
     db.refresh(db_usuario)
+    invalidar_usuario_cache(user_id)
 
     return db_usuario
 
@@ -182,6 +180,7 @@ def delete_usuario(
     # Soft delete
     db_usuario.ativo = "N"
     db.commit()
+    invalidar_usuario_cache(user_id)
 
     return {
         "success": True,
@@ -208,6 +207,7 @@ def toggle_ativo(
     # Toggle ativo
     db_usuario.ativo = "S" if db_usuario.ativo == "N" else "N"
     db.commit()
+    invalidar_usuario_cache(user_id)
 
     return {
         "success": True,
@@ -250,6 +250,7 @@ def update_senha(
     # Atualizar senha
     db_usuario.senha = hash_password(senha_data.senha_nova)
     db.commit()
+    invalidar_usuario_cache(user_id)
 
     return {
         "success": True,
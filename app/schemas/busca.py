@@ -0,0 +1,21 @@
+"""
+Schemas da Busca unificada
+"""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ItemBusca(BaseModel):
+    tipo: str  # empresa, equipamento, ordem_servico
+    id: int
+    titulo: Optional[str] = None
+    subtitulo: Optional[str] = None
+    relevancia: float
+
+    class Config:
+        from_attributes = True
+
+
+class ResumoTipoBusca(BaseModel):
+    itens: int
+    tem_mais: bool
@@ -1,7 +1,7 @@
 """
 Schemas do Dashboard
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 from typing import Optional
 from datetime import datetime, date
 from decimal import Decimal
@@ -64,6 +64,11 @@ class CardFinalizada(BaseModel):
     data_calibracao: datetime
     valor_total: Decimal
 
+    @field_serializer('valor_total')
+    def serialize_valor_total(self, v: Decimal) -> float:
+        """Mantém valor_total como número no JSON (formato já usado pelo frontend)"""
+        return float(v)
+
     class Config:
         from_attributes = True
 
@@ -0,0 +1,113 @@
+"""
+Service de registro de último acesso dos usuários (write-behind)
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import update, case
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.usuario import Usuario
+
+logger = logging.getLogger(__name__)
+
+
+class UltimoAcessoBuffer:
+    """
+    Buffer em memória para Usuario.ultimo_acesso
+
+    Login e refresh de token apenas registram o instante aqui (sem transação na
+    requisição). Uma thread grava o buffer periodicamente com um único UPDATE
+    para todos os usuários pendentes, e o restante é gravado no shutdown.
+
+    Em caso de falha na gravação os registros voltam ao buffer e são gravados
+    no próximo ciclo.
+    """
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._pendentes: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def registrar(self, user_id: int, quando: Optional[datetime] = None):
+        """Registra acesso do usuário (mantém o mais recente)"""
+        quando = quando or datetime.utcnow()
+        with self._lock:
+            atual = self._pendentes.get(user_id)
+            if atual is None or quando > atual:
+                self._pendentes[user_id] = quando
+
+    def _devolver(self, pendentes: Dict[int, datetime]):
+        """Devolve registros não gravados ao buffer (sem sobrescrever mais recentes)"""
+        with self._lock:
+            for user_id, quando in pendentes.items():
+                atual = self._pendentes.get(user_id)
+                if atual is None or quando > atual:
+                    self._pendentes[user_id] = quando
+
+    def flush(self) -> int:
+        """
+        Grava os acessos pendentes em um único UPDATE
+
+        UPDATE usuarios SET ultimo_acesso = CASE id WHEN ... END WHERE id IN (...)
+
+        Returns:
+            Quantidade de usuários gravados
+        """
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, {}
+
+        if not pendentes:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(Usuario)
+                .where(Usuario.id.in_(list(pendentes)))
+                .values(ultimo_acesso=case(pendentes, value=Usuario.id))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self._devolver(pendentes)
+            logger.error(f"Erro ao gravar último acesso de {len(pendentes)} usuário(s): {e}")
+            return 0
+        finally:
+            db.close()
+
+        return len(pendentes)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self.flush()
+
+    def iniciar(self):
+        """Inicia a thread de gravação periódica"""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar, name="ultimo-acesso-flush", daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        """Para a thread e grava o que estiver pendente"""
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join(timeout=self.intervalo + 5)
+            self._thread = None
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pendentes)
+
+
+ultimo_acesso_buffer = UltimoAcessoBuffer(intervalo=settings.ULTIMO_ACESSO_FLUSH_INTERVAL)
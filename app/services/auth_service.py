@@ -2,12 +2,16 @@
 Service de Autenticação
 """
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.usuario import Usuario
+from app.replicas import usar_primario
+from app.services.acesso_service import ultimo_acesso_buffer
 from app.utils.security import (
-    verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -19,22 +23,35 @@ class AuthService:
     """Service para operações de autenticação"""
 
     @staticmethod
-    def authenticate_user(db: Session, login: str, password: str) -> Usuario:
+    async def authenticate_user(db: AsyncSession, login: str, password: str):
         """
         Autentica usuário com login e senha
 
+        A conexão é devolvida ao pool antes da verificação bcrypt: a espera na
+        fila do bcrypt (e o 503 quando ela está cheia) não retém conexão do banco
+        nem thread do threadpool.
+
         Args:
-            db: Sessão do banco
+            db: Sessão async do banco
             login: Login do usuário
             password: Senha em texto plano
 
         Returns:
-            Usuário autenticado
+            Campos do usuário autenticado (id, login, perfil, ativo)
 
         Raises:
-            HTTPException: Se credenciais inválidas
+            HTTPException: Se credenciais inválidas (401/403) ou bcrypt ocupado (503)
         """
-        user = db.query(Usuario).filter(Usuario.login == login).first()
+        # Senha recém-alterada vale no login seguinte: lê do primário, não da réplica
+        usar_primario(db.sync_session)
+        result = await db.execute(
+            select(
+                Usuario.id, Usuario.login, Usuario.perfil, Usuario.ativo, Usuario.senha
+            ).where(Usuario.login == login).limit(1)
+        )
+        user = result.first()
+        # Encerra a transação de leitura: devolve a conexão ao pool
+        await db.rollback()
 
         if not user:
             raise HTTPException(
@@ -42,7 +59,7 @@ class AuthService:
                 detail="Login ou senha incorretos"
             )
 
-        if not verify_password(password, user.senha):
+        if not await verify_password_async(password, user.senha):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Login ou senha incorretos"
@@ -54,9 +71,8 @@ class AuthService:
                 detail="Usuário inativo"
             )
 
-        # Atualizar último acesso
-        user.ultimo_acesso = datetime.utcnow()
-        db.commit()
+        # Registrar último acesso (gravado em lote pelo ultimo_acesso_buffer)
+        ultimo_acesso_buffer.registrar(user.id)
 
         return user
 
@@ -66,7 +82,7 @@ class AuthService:
         Cria access token e refresh token para o usuário
 
         Args:
-            user: Usuário autenticado
+            user: Usuário autenticado (model ou linha com id, login e perfil)
 
         Returns:
             Dict com access_token, refresh_token, token_type, expires_in
@@ -125,6 +141,9 @@ class AuthService:
                 detail="Usuário não encontrado ou inativo"
             )
 
+        # Renovação de token também conta como atividade do usuário
+        ultimo_acesso_buffer.registrar(user.id)
+
         # Criar novo access token
         token_data = {
             "user_id": user.id,
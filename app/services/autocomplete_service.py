@@ -0,0 +1,229 @@
+"""
+Service de autocomplete (índices de prefixo em memória)
+
+Os campos de seleção de empresa e equipamento (criação de OS) consultam a cada
+tecla digitada. Em vez de um ILIKE por tecla, cada processo mantém um índice
+ordenado com os nomes normalizados (sem acentos, casefold); a busca por prefixo
+é um bisect seguido de leitura sequencial, sem acesso ao banco.
+
+- Só registros ativos (ativo = "S"): inativos não são sugeridos
+- Carregado no startup e recarregado por completo a cada
+  AUTOCOMPLETE_REFRESH_INTERVAL segundos (alterações feitas por outros workers)
+- Atualizado na hora pelos handlers de criação/alteração/ativação/exclusão do
+  próprio processo (atualizar/remover)
+- As alterações feitas durante uma recarga (entre o SELECT e a troca do índice)
+  ficam registradas e são reaplicadas sobre o índice novo, para não serem
+  desfeitas pela leitura anterior a elas
+
+Formato compacto: uma única string por nome indexado ("nome normalizado\\0id"),
+numa lista ordenada, mais os textos originais por id para a resposta.
+"""
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.empresa import Empresa
+from app.models.equipamento import Equipamento
+
+logger = logging.getLogger(__name__)
+
+SEPARADOR = "\x00"
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Texto sem acentos, em casefold e com espaços simples ("Ácme  Ltda" -> "acme ltda")"""
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.replace(SEPARADOR, " ").casefold().split())
+
+
+class IndiceAutocomplete:
+    """
+    Índice de prefixos de uma entidade
+
+    Indexa os dois campos da entidade (ex.: razão social e nome fantasia); a
+    resposta traz o id e os dois textos originais.
+    """
+
+    def __init__(self, nome: str, model, titulo, subtitulo):
+        self.nome = nome
+        self.model = model
+        self.titulo = titulo
+        self.subtitulo = subtitulo
+        self._chaves: List[str] = []
+        self._textos: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        # Uma recarga por vez; alterações feitas durante ela (id -> textos, None = removido)
+        self._carga_lock = threading.Lock()
+        self._pendentes: Optional[List[Tuple[int, Optional[Tuple[str, Optional[str]]]]]] = None
+
+    @staticmethod
+    def _chaves_de(id_: int, textos: Tuple[str, Optional[str]]) -> set:
+        return {f"{normalizar(texto)}{SEPARADOR}{id_}" for texto in textos if normalizar(texto)}
+
+    def carregar(self) -> int:
+        """
+        Recarrega o índice inteiro do banco (registros ativos); retorna a quantidade
+
+        atualizar/remover chamados enquanto a carga roda são registrados e
+        reaplicados depois da troca (a leitura pode ser anterior a eles).
+        """
+        with self._carga_lock:
+            with self._lock:
+                self._pendentes = []
+            try:
+                db = SessionLocal()
+                try:
+                    linhas = db.execute(
+                        select(self.model.id, self.titulo, self.subtitulo)
+                        .where(self.model.ativo == "S")
+                    ).all()
+                finally:
+                    db.close()
+
+                textos = {id_: (titulo, subtitulo) for id_, titulo, subtitulo in linhas}
+                chaves = sorted(
+                    chave for id_, par in textos.items() for chave in self._chaves_de(id_, par)
+                )
+                with self._lock:
+                    self._chaves, self._textos = chaves, textos
+                    for id_, par in self._pendentes:
+                        self._remover(id_)
+                        if par is not None:
+                            self._inserir(id_, par)
+                    return len(self._textos)
+            finally:
+                with self._lock:
+                    self._pendentes = None
+
+    def _remover(self, id_: int):
+        """Remove as chaves do id (chamar com o lock)"""
+        textos = self._textos.pop(id_, None)
+        if textos is None:
+            return
+        for chave in self._chaves_de(id_, textos):
+            i = bisect_left(self._chaves, chave)
+            if i < len(self._chaves) and self._chaves[i] == chave:
+                del self._chaves[i]
+
+    def _inserir(self, id_: int, textos: Tuple[str, Optional[str]]):
+        """Indexa os textos do id (chamar com o lock, depois de _remover)"""
+        self._textos[id_] = textos
+        for chave in self._chaves_de(id_, textos):
+            insort(self._chaves, chave)
+
+    def atualizar(self, objeto):
+        """Indexa (ou reindexa) um objeto criado/alterado; inativo sai do índice"""
+        if objeto.ativo != "S":
+            self.remover(objeto.id)
+            return
+
+        textos = (getattr(objeto, self.titulo.key), getattr(objeto, self.subtitulo.key))
+        with self._lock:
+            self._remover(objeto.id)
+            self._inserir(objeto.id, textos)
+            if self._pendentes is not None:
+                self._pendentes.append((objeto.id, textos))
+
+    def remover(self, id_: int):
+        """Remove um objeto excluído ou desativado"""
+        with self._lock:
+            self._remover(id_)
+            if self._pendentes is not None:
+                self._pendentes.append((id_, None))
+
+    def buscar(self, prefixo: str, limite: int = 10) -> List[dict]:
+        """Registros com algum dos campos começando por prefixo (ordem alfabética)"""
+        procurado = normalizar(prefixo)
+        if not procurado:
+            return []
+
+        ids: List[int] = []
+        with self._lock:
+            i = bisect_left(self._chaves, procurado)
+            while i < len(self._chaves) and len(ids) < limite:
+                chave = self._chaves[i]
+                if not chave.startswith(procurado):
+                    break
+                id_ = int(chave[chave.rindex(SEPARADOR) + 1:])
+                if id_ not in ids:
+                    ids.append(id_)
+                i += 1
+            textos = [self._textos[id_] for id_ in ids]
+
+        return [
+            {"id": id_, "titulo": titulo, "subtitulo": subtitulo}
+            for id_, (titulo, subtitulo) in zip(ids, textos)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+
+class AutocompleteService:
+    """Índices de autocomplete do processo e a thread de recarga periódica"""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.indices: Dict[str, IndiceAutocomplete] = {
+            "empresas": IndiceAutocomplete(
+                "empresas", Empresa, Empresa.razao_social, Empresa.nome_fantasia
+            ),
+            "equipamentos": IndiceAutocomplete(
+                "equipamentos", Equipamento, Equipamento.descricao, Equipamento.codigo
+            ),
+        }
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def empresas(self) -> IndiceAutocomplete:
+        return self.indices["empresas"]
+
+    @property
+    def equipamentos(self) -> IndiceAutocomplete:
+        return self.indices["equipamentos"]
+
+    def recarregar(self):
+        """Recarrega todos os índices (falhas são registradas e o índice anterior mantido)"""
+        for indice in self.indices.values():
+            try:
+                indice.carregar()
+            except Exception as e:
+                logger.error(f"Erro ao carregar o autocomplete de {indice.nome}: {e}")
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self.recarregar()
+
+    def iniciar(self):
+        """Carrega os índices e inicia a thread de recarga periódica"""
+        self.recarregar()
+        if self._thread is not None or self.intervalo <= 0:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar, name="autocomplete-recarga", daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        """Para a thread de recarga"""
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def estatisticas(self) -> dict:
+        return {nome: len(indice) for nome, indice in self.indices.items()}
+
+
+autocomplete = AutocompleteService(intervalo=settings.AUTOCOMPLETE_REFRESH_INTERVAL)
@@ -0,0 +1,224 @@
+"""
+Service da Busca unificada (empresas, equipamentos e ordens de serviço)
+
+PostgreSQL: colunas busca_tsv (tsvector geradas pela migration add_fulltext_search.sql,
+configuração portuguese sem acentos) consultadas com to_tsquery e ordenadas por
+ts_rank_cd. Demais bancos (SQLite nos testes) ou PostgreSQL sem a migration:
+ILIKE nas mesmas colunas, com relevância = número de termos encontrados.
+
+Os termos são combinados com OR (prefixo), porque uma busca como
+"acme bafômetro 1234" mistura termos de entidades diferentes; a relevância
+favorece os resultados que encontram mais termos.
+"""
+import base64
+import json
+import logging
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, case, cast, func, literal_column, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.models.empresa import Empresa
+from app.models.equipamento import Equipamento
+from app.models.ordem_servico import OrdemServico
+from app.schemas.busca import ItemBusca
+from app.utils.busca import filtro_contem
+
+logger = logging.getLogger(__name__)
+
+# Termos considerados por busca (os demais são ignorados)
+MAX_TERMOS = 8
+
+# Configuração textual da migration (literal: parâmetros do asyncpg chegam como
+# VARCHAR, que não converte implicitamente para regconfig)
+CONFIGURACAO_TS = literal_column("'portuguese'::regconfig")
+
+
+class TipoBusca(NamedTuple):
+    """Entidade pesquisável: colunas exibidas e colunas pesquisadas (fallback ILIKE)"""
+    model: type
+    titulo: object
+    subtitulo: object
+    colunas: tuple
+
+
+TIPOS_BUSCA: Dict[str, TipoBusca] = {
+    "empresa": TipoBusca(
+        Empresa, Empresa.razao_social, Empresa.nome_fantasia,
+        (Empresa.razao_social, Empresa.nome_fantasia, Empresa.cnpj, Empresa.cpf, Empresa.palavras_chave)
+    ),
+    "equipamento": TipoBusca(
+        Equipamento, Equipamento.descricao, Equipamento.codigo,
+        (Equipamento.descricao, Equipamento.codigo, Equipamento.modelo, Equipamento.tags)
+    ),
+    "ordem_servico": TipoBusca(
+        OrdemServico, OrdemServico.chave_acesso, OrdemServico.certificado_numero,
+        (OrdemServico.chave_acesso, OrdemServico.certificado_numero, OrdemServico.observacoes)
+    ),
+}
+
+# Colunas busca_tsv presentes por banco (url do engine -> bool), verificado uma vez
+_tsvector: Dict[str, bool] = {}
+
+
+def _tsvector_disponivel(db: Session) -> bool:
+    """True se o banco é PostgreSQL com as colunas busca_tsv da migration"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+
+    chave = str(bind.url)
+    if chave not in _tsvector:
+        try:
+            encontradas = db.execute(text(
+                "SELECT count(*) FROM information_schema.columns "
+                "WHERE column_name = 'busca_tsv' "
+                "AND table_name IN ('empresas', 'equipamentos', 'ordens_servico')"
+            )).scalar()
+        except Exception as e:
+            logger.warning(f"Falha ao verificar as colunas busca_tsv: {e}")
+            return False
+        _tsvector[chave] = encontradas == len(TIPOS_BUSCA)
+        if not _tsvector[chave]:
+            logger.info("Colunas busca_tsv ausentes: busca unificada via ILIKE")
+    return _tsvector[chave]
+
+
+def termos_da_busca(q: str) -> List[str]:
+    """Palavras da busca (letras e dígitos), sem repetições, no máximo MAX_TERMOS"""
+    termos = []
+    for termo in re.findall(r"[^\W_]+", q.lower()):
+        if termo not in termos:
+            termos.append(termo)
+    return termos[:MAX_TERMOS]
+
+
+# ========== CURSOR ==========
+
+def codificar_cursor_busca(posicoes: Dict[str, list]) -> str:
+    """Cursor opaco com a última posição (relevancia, id) de cada tipo com mais resultados"""
+    bruto = json.dumps(posicoes, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor_busca(cursor: str) -> Dict[str, list]:
+    """
+    Inverso de codificar_cursor_busca
+
+    Raises:
+        HTTPException: Se o cursor for inválido
+    """
+    try:
+        posicoes = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        for tipo, (relevancia, id_) in posicoes.items():
+            if tipo not in TIPOS_BUSCA or not isinstance(id_, int):
+                raise ValueError("cursor incompatível")
+            float(relevancia)
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de busca inválido"
+        )
+    return posicoes
+
+
+class BuscaService:
+    """Service da busca unificada"""
+
+    @staticmethod
+    def _relevancia_e_filtro(tipo: TipoBusca, termos: List[str], tsvector: bool) -> tuple:
+        """(expressão de relevância, condição de correspondência) de um tipo"""
+        if tsvector:
+            documento = literal_column(f"{tipo.model.__tablename__}.busca_tsv")
+            consulta = func.to_tsquery(
+                CONFIGURACAO_TS, func.f_unaccent(" | ".join(f"{termo}:*" for termo in termos))
+            )
+            relevancia = func.ts_rank_cd(documento, consulta, type_=Float)
+            return relevancia, documento.op("@@")(consulta)
+
+        encontrados = [
+            case((or_(*[filtro_contem(coluna, termo) for coluna in tipo.colunas]), 1), else_=0)
+            for termo in termos
+        ]
+        relevancia = cast(sum(encontrados[1:], encontrados[0]), Float)
+        return relevancia, or_(*[
+            filtro_contem(coluna, termo) for termo in termos for coluna in tipo.colunas
+        ])
+
+    @staticmethod
+    def buscar(
+        db: Session,
+        q: str,
+        tipos: List[str],
+        limite: int,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Busca em todos os tipos pedidos numa única consulta (UNION ALL)
+
+        Cada tipo traz até `limite` resultados por relevância (e id para desempate);
+        next_cursor continua apenas os tipos que ainda têm resultados, a partir da
+        última posição de cada um (keyset).
+
+        Returns:
+            {"items": [...], "tipos": {tipo: {"itens", "tem_mais"}}, "next_cursor": str|None}
+        """
+        termos = termos_da_busca(q)
+        posicoes = decodificar_cursor_busca(cursor) if cursor else None
+        if posicoes is not None:
+            tipos = [tipo for tipo in tipos if tipo in posicoes]
+        if not termos or not tipos:
+            return {"items": [], "tipos": {}, "next_cursor": None}
+
+        tsvector = _tsvector_disponivel(db)
+        consultas = []
+        for nome in tipos:
+            tipo = TIPOS_BUSCA[nome]
+            relevancia, filtro = BuscaService._relevancia_e_filtro(tipo, termos, tsvector)
+            consulta = select(
+                literal_column(f"'{nome}'").label("tipo"),
+                tipo.model.id.label("id"),
+                tipo.titulo.label("titulo"),
+                tipo.subtitulo.label("subtitulo"),
+                relevancia.label("relevancia")
+            ).where(filtro)
+            if posicoes is not None:
+                ultima_relevancia, ultimo_id = posicoes[nome]
+                consulta = consulta.where(or_(
+                    relevancia < ultima_relevancia,
+                    and_(relevancia == ultima_relevancia, tipo.model.id > ultimo_id)
+                ))
+            # Um item a mais indica se o tipo tem próxima página
+            consulta = consulta.order_by(relevancia.desc(), tipo.model.id).limit(limite + 1)
+            # Subquery: SQLite não aceita LIMIT direto nos membros do UNION
+            subconsulta = consulta.subquery()
+            consultas.append(select(*subconsulta.c))
+
+        linhas = db.execute(union_all(*consultas)).all()
+
+        por_tipo: Dict[str, list] = {nome: [] for nome in tipos}
+        for linha in linhas:
+            por_tipo[linha.tipo].append(linha)
+
+        items = []
+        resumo = {}
+        proximas = {}
+        for nome in tipos:
+            encontrados = sorted(por_tipo[nome], key=lambda l: (-l.relevancia, l.id))
+            tem_mais = len(encontrados) > limite
+            encontrados = encontrados[:limite]
+            if tem_mais:
+                proximas[nome] = [encontrados[-1].relevancia, encontrados[-1].id]
+            resumo[nome] = {"itens": len(encontrados), "tem_mais": tem_mais}
+            items.extend(encontrados)
+
+        ordem_tipos = {nome: i for i, nome in enumerate(TIPOS_BUSCA)}
+        items.sort(key=lambda l: (-l.relevancia, ordem_tipos[l.tipo], l.id))
+
+        return {
+            "items": [ItemBusca.model_validate(item) for item in items],
+            "tipos": resumo,
+            "next_cursor": codificar_cursor_busca(proximas) if proximas else None
+        }
@@ -0,0 +1,403 @@
+"""
+Service de Contadores do Dashboard (resumo incremental)
+
+As rotinas de escrita capturam o estado relevante da entidade antes da alteração
+(snapshot_*) e, depois de alterá-la, chamam registrar_* na mesma transação. A
+diferença entre as contribuições antes/depois é aplicada em dashboard_counters.
+
+Contadores mantidos:
+- ordens_andamento: OS com situacao_servico = 'A'
+- ordens_finalizadas: OS finalizadas, por dia de data_calibracao
+- calibracoes_vencimento: equipamentos ativos não recusados, por dia de data_proxima_calibracao
+- clientes_vencimento: empresas, pelo dia do vencimento mais antigo de seus equipamentos
+- calibracoes_recusadas: equipamentos ativos com calibracao_recusada = 'S'
+- clientes_perdidos: empresas ativas com status_contato = 'perdido'
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, and_, delete, text
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Optional
+import logging
+
+from app.models.dashboard import DashboardContador
+from app.models.ordem_servico import OrdemServico
+from app.models.equipamento import EquipamentoEmpresa
+from app.models.empresa import Empresa
+
+logger = logging.getLogger(__name__)
+
+# Data usada pelos contadores sem bucket diário
+SEM_DATA = date(1900, 1, 1)
+
+ORDENS_ANDAMENTO = "ordens_andamento"
+ORDENS_FINALIZADAS = "ordens_finalizadas"
+CALIBRACOES_VENCIMENTO = "calibracoes_vencimento"
+CLIENTES_VENCIMENTO = "clientes_vencimento"
+CALIBRACOES_RECUSADAS = "calibracoes_recusadas"
+CLIENTES_PERDIDOS = "clientes_perdidos"
+
+# Linha gravada apenas pela reconciliação: indica que a tabela está populada
+INICIALIZADO = "inicializado"
+
+
+def _como_data(valor) -> Optional[date]:
+    """Normaliza datetime/date para date"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    return valor
+
+
+# ========== CONTRIBUIÇÕES ==========
+
+def _contribuicoes_ordem(estado: Optional[tuple]) -> list:
+    if estado is None:
+        return []
+    situacao, data_calibracao = estado
+    if situacao == "A":
+        return [(ORDENS_ANDAMENTO, SEM_DATA)]
+    if situacao == "F" and data_calibracao is not None:
+        return [(ORDENS_FINALIZADAS, data_calibracao)]
+    return []
+
+
+def _vencimento_elegivel(estado: Optional[tuple]) -> Optional[date]:
+    """Data de vencimento que conta para os cards, ou None"""
+    if estado is None:
+        return None
+    _, ativo, recusada, data_proxima = estado
+    if ativo == "S" and recusada == "N":
+        return data_proxima
+    return None
+
+
+def _contribuicoes_equipamento(estado: Optional[tuple]) -> list:
+    if estado is None:
+        return []
+    _, ativo, recusada, _ = estado
+    if ativo == "S" and recusada == "S":
+        return [(CALIBRACOES_RECUSADAS, SEM_DATA)]
+    data_proxima = _vencimento_elegivel(estado)
+    if data_proxima is not None:
+        return [(CALIBRACOES_VENCIMENTO, data_proxima)]
+    return []
+
+
+def _contribuicoes_empresa(estado: Optional[tuple]) -> list:
+    if estado is None:
+        return []
+    ativo, status_contato = estado
+    if ativo == "S" and status_contato == "perdido":
+        return [(CLIENTES_PERDIDOS, SEM_DATA)]
+    return []
+
+
+class ContadoresDashboardService:
+    """Manutenção incremental e reconciliação de dashboard_counters"""
+
+    # ========== SNAPSHOTS ==========
+
+    @staticmethod
+    def snapshot_ordem(os: Optional[OrdemServico]) -> Optional[tuple]:
+        if os is None:
+            return None
+        return (os.situacao_servico, _como_data(os.data_calibracao))
+
+    @staticmethod
+    def snapshot_equipamento(item: Optional[EquipamentoEmpresa]) -> Optional[tuple]:
+        if item is None:
+            return None
+        return (
+            item.empresa_id,
+            item.ativo,
+            item.calibracao_recusada,
+            _como_data(item.data_proxima_calibracao)
+        )
+
+    @staticmethod
+    def snapshot_empresa(empresa: Optional[Empresa]) -> Optional[tuple]:
+        if empresa is None:
+            return None
+        return (empresa.ativo, empresa.status_contato)
+
+    # ========== REGISTRO ==========
+
+    @staticmethod
+    def registrar_ordem(db: Session, os: Optional[OrdemServico], antes: Optional[tuple]):
+        """Aplica a variação da OS (antes -> estado atual)"""
+        depois = ContadoresDashboardService.snapshot_ordem(os)
+        _aplicar(db, _contribuicoes_ordem(antes), _contribuicoes_ordem(depois))
+
+    @staticmethod
+    def registrar_equipamento(
+        db: Session,
+        item: Optional[EquipamentoEmpresa],
+        antes: Optional[tuple]
+    ):
+        """Aplica a variação do equipamento empresa (antes -> estado atual)"""
+        depois = ContadoresDashboardService.snapshot_equipamento(item)
+        _aplicar(db, _contribuicoes_equipamento(antes), _contribuicoes_equipamento(depois))
+
+        # Vencimento mais antigo das empresas envolvidas (card clientes atrasados)
+        empresas = {estado[0] for estado in (antes, depois) if estado is not None}
+        item_id = item.id if item is not None else None
+        for empresa_id in empresas:
+            outros = _menor_vencimento(db, empresa_id, excluir_id=item_id)
+            menor_antes = _menor(outros, _vencimento_da_empresa(antes, empresa_id))
+            menor_depois = _menor(outros, _vencimento_da_empresa(depois, empresa_id))
+            if menor_antes != menor_depois:
+                _aplicar(
+                    db,
+                    [(CLIENTES_VENCIMENTO, menor_antes)] if menor_antes else [],
+                    [(CLIENTES_VENCIMENTO, menor_depois)] if menor_depois else []
+                )
+
+    @staticmethod
+    def registrar_empresa(db: Session, empresa: Optional[Empresa], antes: Optional[tuple]):
+        """Aplica a variação da empresa (antes -> estado atual)"""
+        depois = ContadoresDashboardService.snapshot_empresa(empresa)
+        _aplicar(db, _contribuicoes_empresa(antes), _contribuicoes_empresa(depois))
+
+    # ========== LEITURA ==========
+
+    @staticmethod
+    def get_principal(db: Session) -> Optional[dict]:
+        """
+        Lê os 7 cards a partir dos contadores
+
+        Returns:
+            Dict com os cards ou None se a tabela ainda não foi reconciliada
+        """
+        hoje = date.today()
+        trinta_dias_atras = hoje - timedelta(days=30)
+        trinta_dias_frente = hoje + timedelta(days=30)
+        chave = DashboardContador.chave
+        data = DashboardContador.data_referencia
+
+        def soma(condicao):
+            return func.coalesce(func.sum(case((condicao, DashboardContador.valor), else_=0)), 0)
+
+        row = db.execute(select(
+            soma(chave == INICIALIZADO).label("inicializado"),
+            soma(chave == ORDENS_ANDAMENTO).label("ordens_andamento"),
+            soma(and_(chave == CLIENTES_VENCIMENTO, data < hoje)).label("clientes_atrasados"),
+            soma(and_(chave == CALIBRACOES_VENCIMENTO, data < hoje)).label("calibracoes_atrasadas"),
+            soma(and_(
+                chave == CALIBRACOES_VENCIMENTO,
+                data >= hoje,
+                data <= trinta_dias_frente
+            )).label("calibracoes_proximas"),
+            soma(and_(
+                chave == ORDENS_FINALIZADAS,
+                data >= trinta_dias_atras
+            )).label("ordens_finalizadas_30dias"),
+            soma(chave == CALIBRACOES_RECUSADAS).label("calibracoes_nao_fazer"),
+            soma(chave == CLIENTES_PERDIDOS).label("clientes_perdidos"),
+        )).one()
+
+        cards = {campo: int(valor or 0) for campo, valor in row._mapping.items()}
+        if not cards.pop("inicializado"):
+            return None
+        return cards
+
+    # ========== RECONCILIAÇÃO ==========
+
+    @staticmethod
+    def reconciliar(db: Session) -> dict:
+        """
+        Reconstrói dashboard_counters a partir das tabelas de origem
+
+        Executa na transação da sessão recebida (o chamador faz o commit). No
+        PostgreSQL a tabela é bloqueada em modo EXCLUSIVE durante a reconstrução para
+        que incrementos concorrentes não se percam.
+
+        Na primeira execução (sem a linha "inicializado") a tabela só tem os
+        incrementos parciais gravados desde a migration: não há o que comparar, então
+        nada é reportado como divergência.
+
+        Returns:
+            Relatório de divergência por contador (valor atual x esperado) e
+            "inicializacao" = True se esta execução populou a tabela pela primeira vez
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE dashboard_counters IN EXCLUSIVE MODE"))
+
+        esperado = _calcular_contadores(db)
+
+        atual = Counter()
+        inicializacao = True
+        for row in db.execute(select(
+            DashboardContador.chave,
+            DashboardContador.data_referencia,
+            DashboardContador.valor
+        )):
+            if row.chave == INICIALIZADO:
+                inicializacao = False
+            elif row.valor:
+                atual[(row.chave, row.data_referencia)] = row.valor
+
+        divergencias = {}
+        chaves = set() if inicializacao else {c for c, _ in esperado} | {c for c, _ in atual}
+        for chave in sorted(chaves):
+            buckets = {k for k in set(esperado) | set(atual) if k[0] == chave}
+            diferentes = [k for k in buckets if esperado[k] != atual[k]]
+            if diferentes:
+                divergencias[chave] = {
+                    "atual": sum(atual[k] for k in buckets),
+                    "esperado": sum(esperado[k] for k in buckets),
+                    "buckets_divergentes": len(diferentes)
+                }
+
+        db.execute(delete(DashboardContador))
+        db.add_all([
+            DashboardContador(chave=chave, data_referencia=data_referencia, valor=valor)
+            for (chave, data_referencia), valor in esperado.items() if valor
+        ])
+        db.add(DashboardContador(chave=INICIALIZADO, data_referencia=SEM_DATA, valor=1))
+        db.flush()
+
+        if inicializacao:
+            logger.info("Contadores do dashboard inicializados")
+        elif divergencias:
+            logger.warning(f"Divergência nos contadores do dashboard: {divergencias}")
+        else:
+            logger.info("Contadores do dashboard reconciliados sem divergência")
+
+        return {
+            "inicializacao": inicializacao,
+            "divergente": bool(divergencias),
+            "divergencias": divergencias,
+            "linhas": len(esperado) + 1
+        }
+
+
+# ========== FUNÇÕES AUXILIARES ==========
+
+def _menor(a: Optional[date], b: Optional[date]) -> Optional[date]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+def _vencimento_da_empresa(estado: Optional[tuple], empresa_id: int) -> Optional[date]:
+    if estado is None or estado[0] != empresa_id:
+        return None
+    return _vencimento_elegivel(estado)
+
+
+def _menor_vencimento(db: Session, empresa_id: int, excluir_id: Optional[int] = None) -> Optional[date]:
+    """Menor data_proxima_calibracao elegível da empresa, ignorando um equipamento"""
+    query = select(func.min(EquipamentoEmpresa.data_proxima_calibracao)).where(
+        EquipamentoEmpresa.empresa_id == empresa_id,
+        EquipamentoEmpresa.ativo == "S",
+        EquipamentoEmpresa.calibracao_recusada == "N"
+    )
+    if excluir_id is not None:
+        query = query.where(EquipamentoEmpresa.id != excluir_id)
+    return _como_data(db.execute(query).scalar())
+
+
+def _aplicar(db: Session, antes: list, depois: list):
+    """Aplica a diferença entre duas listas de contribuições"""
+    delta = Counter(depois)
+    delta.subtract(antes)
+    for (chave, data_referencia), valor in sorted(delta.items()):
+        if valor:
+            _incrementar(db, chave, data_referencia, valor)
+
+
+def _incrementar(db: Session, chave: str, data_referencia: date, valor: int):
+    """UPSERT atômico: valor = valor + delta"""
+    dialeto = db.get_bind().dialect.name
+    if dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialeto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        contador = db.get(DashboardContador, (chave, data_referencia))
+        if contador is None:
+            db.add(DashboardContador(chave=chave, data_referencia=data_referencia, valor=valor))
+        else:
+            contador.valor += valor
+        db.flush()
+        return
+
+    stmt = insert(DashboardContador).values(
+        chave=chave,
+        data_referencia=data_referencia,
+        valor=valor
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DashboardContador.chave, DashboardContador.data_referencia],
+        set_={
+            "valor": DashboardContador.valor + stmt.excluded.valor,
+            "data_atualizacao": func.now()
+        }
+    )
+    db.execute(stmt)
+
+
+def _calcular_contadores(db: Session) -> Counter:
+    """Calcula todos os contadores do zero"""
+    esperado = Counter()
+
+    esperado[(ORDENS_ANDAMENTO, SEM_DATA)] = db.execute(
+        select(func.count()).where(OrdemServico.situacao_servico == "A")
+    ).scalar() or 0
+
+    dia_calibracao = func.date(OrdemServico.data_calibracao)
+    for dia, total in db.execute(
+        select(dia_calibracao, func.count()).where(
+            OrdemServico.situacao_servico == "F",
+            OrdemServico.data_calibracao.isnot(None)
+        ).group_by(dia_calibracao)
+    ):
+        esperado[(ORDENS_FINALIZADAS, _para_data(dia))] += total
+
+    elegivel = and_(
+        EquipamentoEmpresa.ativo == "S",
+        EquipamentoEmpresa.calibracao_recusada == "N",
+        EquipamentoEmpresa.data_proxima_calibracao.isnot(None)
+    )
+    for dia, total in db.execute(
+        select(EquipamentoEmpresa.data_proxima_calibracao, func.count())
+        .where(elegivel)
+        .group_by(EquipamentoEmpresa.data_proxima_calibracao)
+    ):
+        esperado[(CALIBRACOES_VENCIMENTO, _para_data(dia))] = total
+
+    menor_por_empresa = (
+        select(func.min(EquipamentoEmpresa.data_proxima_calibracao).label("menor"))
+        .where(elegivel)
+        .group_by(EquipamentoEmpresa.empresa_id)
+        .subquery()
+    )
+    for dia, total in db.execute(
+        select(menor_por_empresa.c.menor, func.count()).group_by(menor_por_empresa.c.menor)
+    ):
+        esperado[(CLIENTES_VENCIMENTO, _para_data(dia))] = total
+
+    esperado[(CALIBRACOES_RECUSADAS, SEM_DATA)] = db.execute(
+        select(func.count()).where(
+            EquipamentoEmpresa.ativo == "S",
+            EquipamentoEmpresa.calibracao_recusada == "S"
+        )
+    ).scalar() or 0
+
+    esperado[(CLIENTES_PERDIDOS, SEM_DATA)] = db.execute(
+        select(func.count()).where(
+            Empresa.status_contato == "perdido",
+            Empresa.ativo == "S"
+        )
+    ).scalar() or 0
+
+    return esperado
+
+
+def _para_data(valor) -> date:
+    """Converte o resultado de date()/min() (str no SQLite) para date"""
+    if isinstance(valor, str):
+        return date.fromisoformat(valor[:10])
+    return _como_data(valor)
@@ -0,0 +1,248 @@
+"""
+Service do Dashboard (consultas agregadas)
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, and_, true, literal, cast, Integer, TIMESTAMP, DATE
+from datetime import date, datetime, timedelta
+from typing import List
+
+from app.models.ordem_servico import OrdemServico
+from app.models.equipamento import Equipamento, EquipamentoEmpresa
+from app.models.empresa import Empresa
+from app.models.auxiliares import FaseOS
+from app.schemas.dashboard import CardAndamento, CardAtrasado, CardProximas, CardFinalizada
+from app.services.contadores_service import ContadoresDashboardService
+
+
+def _contar_se(condicao, dialeto: str):
+    """
+    COUNT condicional
+
+    PostgreSQL usa COUNT(*) FILTER (WHERE ...); demais bancos (SQLite nos testes)
+    usam SUM(CASE WHEN ... THEN 1 ELSE 0 END).
+    """
+    if dialeto == "postgresql":
+        return func.count().filter(condicao)
+    return func.coalesce(func.sum(case((condicao, 1), else_=0)), 0)
+
+
+def _contar_distintos_se(coluna, condicao, dialeto: str):
+    """COUNT(DISTINCT coluna) condicional"""
+    if dialeto == "postgresql":
+        return func.count(func.distinct(coluna)).filter(condicao)
+    return func.count(func.distinct(case((condicao, coluna))))
+
+
+def _dias_entre(inicio, fim, dialeto: str):
+    """
+    Dias inteiros entre duas datas/timestamps, calculado no banco
+
+    PostgreSQL: a diferença entre timestamps é um interval, do qual se extrai
+    o número de dias (mesma semântica de timedelta.days). Demais bancos (SQLite
+    nos testes) usam a diferença de julianday truncada.
+    """
+    if dialeto == "postgresql":
+        return cast(
+            func.extract("day", cast(fim, TIMESTAMP) - cast(inicio, TIMESTAMP)),
+            Integer
+        )
+    return cast(func.julianday(fim) - func.julianday(inicio), Integer)
+
+
+class DashboardService:
+    """Service com as consultas do Dashboard"""
+
+    @staticmethod
+    def get_principal(db: Session) -> dict:
+        """
+        Retorna os 7 cards do dashboard
+
+        Usa a tabela dashboard_counters (leitura O(1) em relação ao tamanho das
+        tabelas) e, se ela ainda não foi reconciliada, a consulta agregada.
+        """
+        cards = ContadoresDashboardService.get_principal(db)
+        if cards is not None:
+            return cards
+        return DashboardService.calcular_principal(db)
+
+    @staticmethod
+    def calcular_principal(db: Session) -> dict:
+        """
+        Calcula os 7 cards do dashboard em uma única consulta
+
+        Cada tabela é agregada uma única vez (COUNT condicional por card) e os três
+        agregados de uma linha são combinados no mesmo SELECT, resultando em um único
+        round trip ao banco.
+        """
+        dialeto = db.get_bind().dialect.name
+        hoje = date.today()
+        trinta_dias_atras = hoje - timedelta(days=30)
+        trinta_dias_frente = hoje + timedelta(days=30)
+
+        # Ordens de serviço: cards 1 e 5
+        ordens = select(
+            _contar_se(
+                OrdemServico.situacao_servico == "A", dialeto
+            ).label("ordens_andamento"),
+            _contar_se(
+                and_(
+                    OrdemServico.situacao_servico == "F",
+                    OrdemServico.data_calibracao >= trinta_dias_atras
+                ),
+                dialeto
+            ).label("ordens_finalizadas_30dias"),
+        ).where(
+            OrdemServico.situacao_servico.in_(["A", "F"])
+        ).subquery("totais_ordens")
+
+        # Equipamentos empresa: cards 2, 3, 4 e 6
+        vencida = and_(
+            EquipamentoEmpresa.data_proxima_calibracao < hoje,
+            EquipamentoEmpresa.calibracao_recusada == "N"
+        )
+        equipamentos = select(
+            _contar_distintos_se(
+                EquipamentoEmpresa.empresa_id, vencida, dialeto
+            ).label("clientes_atrasados"),
+            _contar_se(vencida, dialeto).label("calibracoes_atrasadas"),
+            _contar_se(
+                and_(
+                    EquipamentoEmpresa.data_proxima_calibracao >= hoje,
+                    EquipamentoEmpresa.data_proxima_calibracao <= trinta_dias_frente,
+                    EquipamentoEmpresa.calibracao_recusada == "N"
+                ),
+                dialeto
+            ).label("calibracoes_proximas"),
+            _contar_se(
+                EquipamentoEmpresa.calibracao_recusada == "S", dialeto
+            ).label("calibracoes_nao_fazer"),
+        ).where(
+            EquipamentoEmpresa.ativo == "S"
+        ).subquery("totais_equipamentos")
+
+        # Empresas: card 7
+        empresas = select(
+            func.count().label("clientes_perdidos")
+        ).where(
+            Empresa.status_contato == "perdido",
+            Empresa.ativo == "S"
+        ).subquery("totais_empresas")
+
+        # Cada subquery retorna exatamente uma linha: junção incondicional
+        stmt = select(ordens, equipamentos, empresas).select_from(
+            ordens.join(equipamentos, true()).join(empresas, true())
+        )
+        row = db.execute(stmt).one()
+
+        return {campo: int(valor or 0) for campo, valor in row._mapping.items()}
+
+    @staticmethod
+    def listar_andamento(db: Session, limit: int) -> List[CardAndamento]:
+        """
+        Ordens em andamento (mais antigas primeiro)
+
+        Uma única consulta com as colunas dos cards (empresa, equipamento e fase
+        via JOIN) e dias_em_aberto calculado no banco.
+        """
+        dialeto = db.get_bind().dialect.name
+        agora = literal(datetime.utcnow(), TIMESTAMP)
+
+        stmt = select(
+            OrdemServico.id,
+            OrdemServico.chave_acesso,
+            func.coalesce(Empresa.razao_social, "").label("empresa"),
+            func.coalesce(Equipamento.descricao, "").label("equipamento"),
+            FaseOS.nome.label("fase"),
+            OrdemServico.data_solicitacao,
+            _dias_entre(OrdemServico.data_solicitacao, agora, dialeto).label("dias_em_aberto"),
+        ).outerjoin(
+            Empresa, Empresa.id == OrdemServico.empresa_id
+        ).outerjoin(
+            EquipamentoEmpresa, EquipamentoEmpresa.id == OrdemServico.equipamento_empresa_id
+        ).outerjoin(
+            Equipamento, Equipamento.id == EquipamentoEmpresa.equipamento_id
+        ).outerjoin(
+            FaseOS, FaseOS.id == OrdemServico.fase_id
+        ).where(
+            OrdemServico.situacao_servico == "A"
+        ).order_by(OrdemServico.data_solicitacao).limit(limit)
+
+        return [CardAndamento.model_validate(row) for row in db.execute(stmt)]
+
+    @staticmethod
+    def _select_calibracoes(dias, *filtros):
+        """SELECT comum dos cards de calibração (empresa e equipamento via JOIN)"""
+        return select(
+            EquipamentoEmpresa.empresa_id,
+            func.coalesce(Empresa.razao_social, "").label("empresa"),
+            EquipamentoEmpresa.equipamento_id,
+            func.coalesce(Equipamento.descricao, "").label("equipamento"),
+            EquipamentoEmpresa.numero_serie,
+            EquipamentoEmpresa.data_proxima_calibracao,
+            dias,
+        ).outerjoin(
+            Empresa, Empresa.id == EquipamentoEmpresa.empresa_id
+        ).outerjoin(
+            Equipamento, Equipamento.id == EquipamentoEmpresa.equipamento_id
+        ).where(
+            EquipamentoEmpresa.ativo == "S",
+            EquipamentoEmpresa.calibracao_recusada == "N",
+            *filtros
+        ).order_by(EquipamentoEmpresa.data_proxima_calibracao)
+
+    @staticmethod
+    def listar_calibracoes_atrasadas(db: Session, limit: int) -> List[CardAtrasado]:
+        """Calibrações vencidas, com dias_atrasado calculado no banco"""
+        dialeto = db.get_bind().dialect.name
+        hoje = date.today()
+
+        stmt = DashboardService._select_calibracoes(
+            _dias_entre(
+                EquipamentoEmpresa.data_proxima_calibracao, literal(hoje, DATE), dialeto
+            ).label("dias_atrasado"),
+            EquipamentoEmpresa.data_proxima_calibracao < hoje
+        ).limit(limit)
+
+        return [CardAtrasado.model_validate(row) for row in db.execute(stmt)]
+
+    @staticmethod
+    def listar_calibracoes_proximas(db: Session, dias: int, limit: int) -> List[CardProximas]:
+        """Calibrações que vencem nos próximos `dias`, com dias_para_vencer calculado no banco"""
+        dialeto = db.get_bind().dialect.name
+        hoje = date.today()
+        data_limite = hoje + timedelta(days=dias)
+
+        stmt = DashboardService._select_calibracoes(
+            _dias_entre(
+                literal(hoje, DATE), EquipamentoEmpresa.data_proxima_calibracao, dialeto
+            ).label("dias_para_vencer"),
+            EquipamentoEmpresa.data_proxima_calibracao >= hoje,
+            EquipamentoEmpresa.data_proxima_calibracao <= data_limite
+        ).limit(limit)
+
+        return [CardProximas.model_validate(row) for row in db.execute(stmt)]
+
+    @staticmethod
+    def listar_finalizadas(db: Session, dias: int, limit: int) -> List[CardFinalizada]:
+        """Ordens finalizadas nos últimos `dias` (mais recentes primeiro)"""
+        data_inicio = date.today() - timedelta(days=dias)
+
+        stmt = select(
+            OrdemServico.id,
+            OrdemServico.chave_acesso,
+            func.coalesce(Empresa.razao_social, "").label("empresa"),
+            func.coalesce(Equipamento.descricao, "").label("equipamento"),
+            OrdemServico.data_calibracao,
+            func.coalesce(OrdemServico.valor_total, 0).label("valor_total"),
+        ).outerjoin(
+            Empresa, Empresa.id == OrdemServico.empresa_id
+        ).outerjoin(
+            EquipamentoEmpresa, EquipamentoEmpresa.id == OrdemServico.equipamento_empresa_id
+        ).outerjoin(
+            Equipamento, Equipamento.id == EquipamentoEmpresa.equipamento_id
+        ).where(
+            OrdemServico.situacao_servico == "F",
+            OrdemServico.data_calibracao >= data_inicio
+        ).order_by(OrdemServico.data_calibracao.desc()).limit(limit)
+
+        return [CardFinalizada.model_validate(row) for row in db.execute(stmt)]
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from app.models.ordem_servico import OrdemServico
 from app.models.equipamento import EquipamentoEmpresa, Equipamento
 from app.models.logs import LogOrdemServico
+from app.services.contadores_service import ContadoresDashboardService
 from app.utils.security import generate_chave_acesso
 
 
@@ -23,6 +24,7 @@ class OSService:
         - Define fase inicial como "Solicitado" (id=1)
         - Define situação como "E" (Espera)
         - Registra log de criação
+        - Atualiza contadores do dashboard
         """
         # Gerar chave de acesso única
         while True:
@@ -41,6 +43,8 @@ class OSService:
         db.add(os)
         db.flush()  # Para obter o ID
 
+        ContadoresDashboardService.registrar_ordem(db, os, None)
+
         # Registrar log
         log = LogOrdemServico(
             ordem_servico_id=os.id,
@@ -69,6 +73,7 @@ class OSService:
         8. Cancelado → situacao_servico = 'C'
         """
         fase_antiga = os.fase_id
+        estado_anterior = ContadoresDashboardService.snapshot_ordem(os)
         os.fase_id = nova_fase_id
 
         # Atualizar timestamp correspondente
@@ -91,6 +96,8 @@ class OSService:
         elif nova_fase_id == 8:  # Cancelado
             os.situacao_servico = "C"  # Cancelado
 
+        ContadoresDashboardService.registrar_ordem(db, os, estado_anterior)
+
         # Registrar log
         log = LogOrdemServico(
             ordem_servico_id=os.id,
@@ -119,7 +126,10 @@ class OSService:
            - Copia dados de certificação
         3. Define situacao_servico = 'F'
         4. Registra log
+        5. Atualiza contadores do dashboard
         """
+        estado_anterior = ContadoresDashboardService.snapshot_ordem(os)
+
         # Atualizar OS
         for field, value in dados_calibracao.items():
             setattr(os, field, value)
@@ -127,12 +137,17 @@ class OSService:
         os.situacao_servico = "F"  # Finalizado
         os.fase_id = 5  # Calibrado
 
+        ContadoresDashboardService.registrar_ordem(db, os, estado_anterior)
+
         # Atualizar equipamento empresa
         equipamento_empresa = db.query(EquipamentoEmpresa).filter(
             EquipamentoEmpresa.id == os.equipamento_empresa_id
         ).first()
 
         if equipamento_empresa:
+            estado_equipamento = ContadoresDashboardService.snapshot_equipamento(
+                equipamento_empresa
+            )
             equipamento_empresa.data_ultima_calibracao = dados_calibracao["data_calibracao"].date()
 
             # Calcular próxima calibração
@@ -157,6 +172,10 @@ class OSService:
             equipamento_empresa.situacao_calibracao = dados_calibracao.get("situacao_calibracao")
             equipamento_empresa.os_atual_id = os.id
 
+            ContadoresDashboardService.registrar_equipamento(
+                db, equipamento_empresa, estado_equipamento
+            )
+
         # Registrar log
         log = LogOrdemServico(
             ordem_servico_id=os.id,
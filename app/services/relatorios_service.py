@@ -0,0 +1,264 @@
+"""
+Service de Relatórios em Excel (XLSX)
+
+As planilhas são geradas com o openpyxl em modo write_only: cada linha é escrita
+direto no XML temporário da aba, sem manter as células em memória, enquanto a
+consulta é lida em lotes (yield_per). O arquivo final vai para um arquivo
+temporário, enviado na resposta e removido em seguida. A memória fica limitada
+mesmo em relatórios com centenas de milhares de linhas.
+
+Datas e valores (Decimal) são gravados como tipos nativos do Excel, com formato
+de exibição, para que o cliente possa ordenar, filtrar e somar.
+
+Textos vindos do banco são sempre gravados como texto: os que começam como
+fórmula (mesmo critério da exportação CSV, parece_formula) não viram fórmulas
+e os caracteres de controle que o XLSX não aceita são removidos (senão o
+openpyxl falha na célula).
+"""
+import os
+import tempfile
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.empresa import Empresa
+from app.models.equipamento import Equipamento, EquipamentoEmpresa
+from app.models.ordem_servico import OrdemServico
+from app.utils.concorrencia import LimitadorConcorrencia
+from app.utils.exportacao import parece_formula
+
+# Linhas lidas do banco por lote
+TAMANHO_LOTE = 1000
+
+FORMATO_DATA = "DD/MM/YYYY"
+FORMATO_DATA_HORA = "DD/MM/YYYY HH:MM"
+FORMATO_MOEDA = "#,##0.00"
+
+# Relatórios grandes ocupam uma thread e uma conexão por vários segundos: poucos
+# simultâneos, os demais recebem 503 (Retry-After) em vez de esgotar o threadpool.
+relatorios_limitador = LimitadorConcorrencia(
+    "relatorios",
+    limite=settings.REPORTS_MAX_CONCURRENT,
+    espera_maxima=settings.REPORTS_QUEUE_TIMEOUT,
+    retry_after=settings.REPORTS_RETRY_AFTER
+)
+
+
+class ColunaRelatorio(NamedTuple):
+    """Coluna da planilha: título, largura e formato de exibição (datas e valores)"""
+    titulo: str
+    largura: int = 15
+    formato: Optional[str] = None
+    totalizar: bool = False
+
+
+def gerar_xlsx(aba: str, colunas: List[ColunaRelatorio], linhas: Iterable) -> str:
+    """
+    Escreve a planilha (modo write_only) num arquivo temporário
+
+    Args:
+        aba: nome da aba
+        colunas: definição das colunas (na ordem dos valores de cada linha)
+        linhas: iterável de tuplas de valores (lido uma única vez, em streaming)
+
+    Returns:
+        Caminho do arquivo .xlsx (o chamador remove após o envio)
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(aba)
+    ws.freeze_panes = "A2"
+    for i, coluna in enumerate(colunas, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = coluna.largura
+
+    negrito = Font(bold=True)
+
+    def _celula(valor, formato=None, fonte=None):
+        celula = WriteOnlyCell(ws, value=valor)
+        if formato:
+            celula.number_format = formato
+        if fonte:
+            celula.font = fonte
+        return celula
+
+    def _texto(valor: str):
+        """Texto sem caracteres inválidos; os que parecem fórmula como célula de texto"""
+        valor = ILLEGAL_CHARACTERS_RE.sub("", valor)
+        if not parece_formula(valor):
+            return valor
+        celula = WriteOnlyCell(ws, value=valor)
+        celula.data_type = "s"
+        return celula
+
+    ws.append([_celula(coluna.titulo, fonte=negrito) for coluna in colunas])
+
+    formatadas = [i for i, coluna in enumerate(colunas) if coluna.formato]
+    sem_formato = [i for i, coluna in enumerate(colunas) if not coluna.formato]
+    quantidade = 0
+    for linha in linhas:
+        valores = list(linha)
+        for i in formatadas:
+            if valores[i] is not None:
+                valores[i] = _celula(valores[i], colunas[i].formato)
+        for i in sem_formato:
+            if isinstance(valores[i], str):
+                valores[i] = _texto(valores[i])
+        ws.append(valores)
+        quantidade += 1
+
+    if quantidade and any(coluna.totalizar for coluna in colunas):
+        total = []
+        for i, coluna in enumerate(colunas):
+            letra = get_column_letter(i + 1)
+            if i == 0:
+                total.append(_celula("Total", fonte=negrito))
+            elif coluna.totalizar:
+                total.append(_celula(
+                    f"=SUM({letra}2:{letra}{quantidade + 1})", coluna.formato, negrito
+                ))
+            else:
+                total.append(None)
+        ws.append(total)
+
+    descritor, caminho = tempfile.mkstemp(prefix="relatorio_", suffix=".xlsx")
+    os.close(descritor)
+    try:
+        wb.save(caminho)
+    except Exception:
+        os.remove(caminho)
+        raise
+    return caminho
+
+
+def _linhas(db: Session, stmt) -> Iterable:
+    """Linhas da consulta em lotes (cursor no servidor no PostgreSQL)"""
+    return db.execute(stmt.execution_options(yield_per=TAMANHO_LOTE))
+
+
+class RelatoriosService:
+    """Service com os relatórios em Excel"""
+
+    @staticmethod
+    def inventario_empresa(db: Session, empresa_id: int) -> str:
+        """Equipamentos da empresa com as datas de calibração"""
+        colunas = [
+            ColunaRelatorio("Código", 14),
+            ColunaRelatorio("Equipamento", 40),
+            ColunaRelatorio("Modelo", 20),
+            ColunaRelatorio("Nº de série", 18),
+            ColunaRelatorio("Patrimônio", 16),
+            ColunaRelatorio("Data da compra", 14, FORMATO_DATA),
+            ColunaRelatorio("Última calibração", 16, FORMATO_DATA),
+            ColunaRelatorio("Próxima calibração", 17, FORMATO_DATA),
+            ColunaRelatorio("Certificado", 16),
+            ColunaRelatorio("Status", 8),
+            ColunaRelatorio("Ativo", 7),
+        ]
+        stmt = select(
+            Equipamento.codigo,
+            Equipamento.descricao,
+            Equipamento.modelo,
+            EquipamentoEmpresa.numero_serie,
+            EquipamentoEmpresa.numero_patrimonio,
+            EquipamentoEmpresa.data_compra,
+            EquipamentoEmpresa.data_ultima_calibracao,
+            EquipamentoEmpresa.data_proxima_calibracao,
+            EquipamentoEmpresa.certificado_numero,
+            EquipamentoEmpresa.status,
+            EquipamentoEmpresa.ativo,
+        ).outerjoin(
+            Equipamento, Equipamento.id == EquipamentoEmpresa.equipamento_id
+        ).where(
+            EquipamentoEmpresa.empresa_id == empresa_id
+        ).order_by(Equipamento.descricao, EquipamentoEmpresa.numero_serie, EquipamentoEmpresa.id)
+
+        return gerar_xlsx("Inventário", colunas, _linhas(db, stmt))
+
+    @staticmethod
+    def calibracoes_atrasadas(db: Session, empresa_id: Optional[int] = None) -> str:
+        """Calibrações vencidas (equipamentos ativos, sem recusa), mais antigas primeiro"""
+        hoje = date.today()
+        colunas = [
+            ColunaRelatorio("Empresa", 40),
+            ColunaRelatorio("CNPJ/CPF", 18),
+            ColunaRelatorio("Equipamento", 40),
+            ColunaRelatorio("Nº de série", 18),
+            ColunaRelatorio("Vencimento", 13, FORMATO_DATA),
+            ColunaRelatorio("Dias em atraso", 14),
+        ]
+        stmt = select(
+            Empresa.razao_social,
+            func.coalesce(Empresa.cnpj, Empresa.cpf),
+            Equipamento.descricao,
+            EquipamentoEmpresa.numero_serie,
+            EquipamentoEmpresa.data_proxima_calibracao,
+        ).outerjoin(
+            Empresa, Empresa.id == EquipamentoEmpresa.empresa_id
+        ).outerjoin(
+            Equipamento, Equipamento.id == EquipamentoEmpresa.equipamento_id
+        ).where(
+            EquipamentoEmpresa.ativo == "S",
+            EquipamentoEmpresa.calibracao_recusada == "N",
+            EquipamentoEmpresa.data_proxima_calibracao < hoje
+        ).order_by(EquipamentoEmpresa.data_proxima_calibracao, EquipamentoEmpresa.id)
+        if empresa_id:
+            stmt = stmt.where(EquipamentoEmpresa.empresa_id == empresa_id)
+
+        linhas = (
+            (*linha, (hoje - linha.data_proxima_calibracao).days)
+            for linha in _linhas(db, stmt)
+        )
+        return gerar_xlsx("Calibrações atrasadas", colunas, linhas)
+
+    @staticmethod
+    def faturamento_mensal(db: Session, ano: int, mes: int, empresa_id: Optional[int] = None) -> str:
+        """Ordens finalizadas no mês (pela data de calibração), com valores e totais"""
+        inicio = date(ano, mes, 1)
+        fim = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+        colunas = [
+            ColunaRelatorio("Chave", 12),
+            ColunaRelatorio("Empresa", 40),
+            ColunaRelatorio("CNPJ/CPF", 18),
+            ColunaRelatorio("Equipamento", 40),
+            ColunaRelatorio("Nº de série", 18),
+            ColunaRelatorio("Calibração", 17, FORMATO_DATA_HORA),
+            ColunaRelatorio("Serviço", 13, FORMATO_MOEDA, totalizar=True),
+            ColunaRelatorio("Frete envio", 13, FORMATO_MOEDA, totalizar=True),
+            ColunaRelatorio("Frete retorno", 13, FORMATO_MOEDA, totalizar=True),
+            ColunaRelatorio("Total", 14, FORMATO_MOEDA, totalizar=True),
+            ColunaRelatorio("Pago", 6),
+        ]
+        stmt = select(
+            OrdemServico.chave_acesso,
+            Empresa.razao_social,
+            func.coalesce(Empresa.cnpj, Empresa.cpf),
+            Equipamento.descricao,
+            EquipamentoEmpresa.numero_serie,
+            OrdemServico.data_calibracao,
+            OrdemServico.valor_servico,
+            OrdemServico.valor_frete_envio,
+            OrdemServico.valor_frete_retorno,
+            OrdemServico.valor_total,
+            OrdemServico.pago,
+        ).outerjoin(
+            Empresa, Empresa.id == OrdemServico.empresa_id
+        ).outerjoin(
+            EquipamentoEmpresa, EquipamentoEmpresa.id == OrdemServico.equipamento_empresa_id
+        ).outerjoin(
+            Equipamento, Equipamento.id == EquipamentoEmpresa.equipamento_id
+        ).where(
+            OrdemServico.situacao_servico == "F",
+            OrdemServico.data_calibracao >= inicio,
+            OrdemServico.data_calibracao < fim
+        ).order_by(Empresa.razao_social, OrdemServico.data_calibracao, OrdemServico.id)
+        if empresa_id:
+            stmt = stmt.where(OrdemServico.empresa_id == empresa_id)
+
+        return gerar_xlsx(f"Faturamento {mes:02d}-{ano}", colunas, _linhas(db, stmt))
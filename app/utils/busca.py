@@ -0,0 +1,97 @@
+"""
+Busca por trecho de texto (filtros "contém" das listagens)
+
+ILIKE '%termo%' não usa índices btree, então cada busca lia a tabela inteira.
+No PostgreSQL com a extensão pg_trgm os índices GIN (gin_trgm_ops) da migration
+add_trigram_search_indexes.sql atendem o mesmo ILIKE, e os resultados podem ser
+ordenados por relevância (word_similarity: quanto o termo se parece com algum
+trecho do texto). Sem pg_trgm (ou no SQLite) a busca continua sendo ILIKE com a
+ordenação padrão da listagem.
+"""
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import Float, func, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.pagination import ChaveOrdenacao
+
+logger = logging.getLogger(__name__)
+
+# pg_trgm instalado por banco (url do engine -> bool), verificado uma vez
+_trigrama: Dict[str, bool] = {}
+
+
+def trigrama_disponivel(session: Session) -> bool:
+    """True se o banco da sessão é PostgreSQL com a extensão pg_trgm"""
+    if not settings.SEARCH_TRIGRAM_RANKING:
+        return False
+
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+
+    chave = str(bind.url)
+    if chave not in _trigrama:
+        try:
+            _trigrama[chave] = session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).scalar() is not None
+        except Exception as e:
+            logger.warning(f"Falha ao verificar a extensão pg_trgm: {e}")
+            return False
+        if not _trigrama[chave]:
+            logger.info("pg_trgm não instalado: buscas sem ordenação por relevância")
+    return _trigrama[chave]
+
+
+def padrao_contem(termo: str) -> str:
+    """Padrão LIKE para "contém termo" (%, _ e \\ do termo são literais)"""
+    escapado = termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapado}%"
+
+
+def filtro_contem(coluna, termo: str):
+    """Condição coluna ILIKE '%termo%' (atendida pelos índices trigrama no PostgreSQL)"""
+    return coluna.ilike(padrao_contem(termo), escape="\\")
+
+
+def relevancia(buscas: Sequence[Tuple]):
+    """
+    Expressão de relevância para as buscas (pares (coluna, termo))
+
+    Soma de word_similarity(termo, coluna), rotulada como "relevancia" para ser
+    lida das linhas (cursor da paginação).
+    """
+    expressao = None
+    for coluna, termo in buscas:
+        similaridade = func.word_similarity(termo, coluna, type_=Float)
+        expressao = similaridade if expressao is None else expressao + similaridade
+    return expressao.label("relevancia")
+
+
+def ordenacao_busca(
+    session: Session,
+    buscas: Sequence[Tuple],
+    padrao: List[ChaveOrdenacao],
+    desempate
+) -> List[ChaveOrdenacao]:
+    """
+    Ordenação da listagem quando há busca por texto
+
+    Com pg_trgm: relevância decrescente e desempate (id); caso contrário (sem
+    buscas, SQLite, pg_trgm ausente) a ordenação padrão da listagem.
+
+    Uso:
+        buscas = [(Empresa.razao_social, razao_social)] if razao_social else []
+        ordenacao = ordenacao_busca(session, buscas, padrao, Empresa.id)
+        query = consulta_projetada(session, Empresa, schema, *(c.coluna for c in ordenacao))
+    """
+    buscas = [(coluna, termo) for coluna, termo in buscas if termo]
+    if not buscas or not trigrama_disponivel(session):
+        return padrao
+    return [
+        ChaveOrdenacao(relevancia(buscas), descendente=True),
+        ChaveOrdenacao(desempate)
+    ]
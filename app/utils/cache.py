@@ -0,0 +1,221 @@
+"""
+Utilitarios de cache em memoria (TTL + LRU + single-flight)
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class _Chamada:
+    """Carga em andamento para uma chave (single-flight)"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    Cache em memoria com expiracao (TTL) e limite de tamanho (LRU)
+
+    - Cada entrada expira apos `ttl` segundos (ou o ttl informado no set)
+    - Acima de `maxsize` entradas, a menos usada recentemente e descartada
+    - invalidar() incrementa a versao do cache: entradas antigas deixam de ser
+      encontradas e saem pelo LRU, sem varrer o dicionario
+    - get_or_load() agrupa cargas concorrentes da mesma chave (single-flight):
+      apenas a primeira requisicao executa o loader, as demais aguardam o resultado
+
+    O cache e por processo: com varios workers do gunicorn cada um tem o seu, e a
+    consistencia entre processos depende do TTL.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.versao = 0
+        self.hits = 0
+        self.misses = 0
+        self._dados: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._em_andamento: dict = {}
+        self._em_andamento_async: dict = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, key: Hashable) -> tuple:
+        return (self.versao, key)
+
+    def _buscar(self, chave: tuple) -> tuple:
+        """Busca sem lock (chamador deve segurar self._lock)"""
+        entrada = self._dados.get(chave)
+        if entrada is None:
+            return False, None
+        valor, expira_em = entrada
+        if expira_em < time.monotonic():
+            del self._dados[chave]
+            return False, None
+        self._dados.move_to_end(chave)
+        return True, valor
+
+    def _gravar(self, chave: tuple, valor: Any, ttl: Optional[float]):
+        """Grava sem lock (chamador deve segurar self._lock)"""
+        self._dados[chave] = (valor, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._dados.move_to_end(chave)
+        while len(self._dados) > self.maxsize:
+            self._dados.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor em cache ou default"""
+        with self._lock:
+            encontrado, valor = self._buscar(self._chave(key))
+            if encontrado:
+                self.hits += 1
+                return valor
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Grava valor (ttl opcional sobrescreve o padrao)"""
+        with self._lock:
+            self._gravar(self._chave(key), value, ttl)
+
+    def delete(self, key: Hashable):
+        """Remove uma chave"""
+        with self._lock:
+            self._dados.pop(self._chave(key), None)
+
+    def invalidar(self):
+        """Invalida todas as entradas atuais"""
+        with self._lock:
+            self.versao += 1
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._dados.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou executa loader() uma unica vez por chave
+
+        Requisicoes concorrentes para a mesma chave aguardam a carga em andamento.
+        Se o loader falhar, a excecao e propagada para todas elas.
+        """
+        with self._lock:
+            chave = self._chave(key)
+            encontrado, valor = self._buscar(chave)
+            if encontrado:
+                self.hits += 1
+                return valor
+            self.misses += 1
+
+            chamada = self._em_andamento.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._em_andamento[chave] = chamada
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = loader()
+            with self._lock:
+                self._gravar(chave, chamada.resultado, None)
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            chamada.evento.set()
+
+    async def get_or_load_async(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Versão async do get_or_load (loader é uma função async)
+
+        Requisições concorrentes do mesmo event loop aguardam a mesma Future em
+        vez de executar o loader novamente.
+        """
+        with self._lock:
+            chave = self._chave(key)
+            encontrado, valor = self._buscar(chave)
+            if encontrado:
+                self.hits += 1
+                return valor
+            self.misses += 1
+
+        futuro = self._em_andamento_async.get(chave)
+        if futuro is not None:
+            # shield: o cancelamento de um seguidor não cancela a carga do líder
+            return await asyncio.shield(futuro)
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._em_andamento_async[chave] = futuro
+        try:
+            resultado = await loader()
+            with self._lock:
+                self._gravar(chave, resultado, None)
+            futuro.set_result(resultado)
+            return resultado
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except BaseException as e:
+            futuro.set_exception(e)
+            # Evita o aviso "exception was never retrieved" quando não há seguidores
+            futuro.exception()
+            raise
+        finally:
+            self._em_andamento_async.pop(chave, None)
+
+    def estatisticas(self) -> dict:
+        """Contadores de uso do cache"""
+        with self._lock:
+            return {
+                "entradas": len(self._dados),
+                "versao": self.versao,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+
+def invalidar_ao_alterar(cache: TTLCache, *models):
+    """
+    Invalida o cache quando uma transacao que altera algum dos models e commitada
+
+    Os objetos novos/alterados/removidos sao verificados a cada flush e a versao do
+    cache e incrementada apenas apos o commit (rollback descarta a marcacao).
+    """
+    chave_info = f"invalidar_cache_{id(cache)}"
+
+    @event.listens_for(Session, "after_flush")
+    def _marcar(session, flush_context):
+        if session.info.get(chave_info):
+            return
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, models):
+                session.info[chave_info] = True
+                return
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidar(session):
+        if session.info.pop(chave_info, False):
+            cache.invalidar()
+
+    @event.listens_for(Session, "after_rollback")
+    def _descartar(session):
+        session.info.pop(chave_info, None)
@@ -0,0 +1,206 @@
+"""
+Utilitarios de concorrencia (limitador de requisicoes simultaneas)
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+
+class _Espera:
+    """Requisicao na fila do limitador, aguardando uma vaga"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.concedida = False
+        if loop is None:
+            self.evento = threading.Event()
+        else:
+            self.futuro = loop.create_future()
+
+    def conceder(self):
+        """Entrega a vaga (chamar com o lock do limitador)"""
+        self.concedida = True
+        if self.loop is None:
+            self.evento.set()
+        else:
+            self.loop.call_soon_threadsafe(self._concluir)
+
+    def _concluir(self):
+        if not self.futuro.done():
+            self.futuro.set_result(None)
+
+
+class LimitadorConcorrencia:
+    """
+    Limita quantas operacoes de um tipo executam ao mesmo tempo
+
+    - Ate `limite` operacoes simultaneas; as demais entram numa fila (FIFO) e
+      esperam uma vaga por no maximo `espera_maxima` segundos
+    - Com `fila_maxima` requisicoes ja aguardando, as novas sao rejeitadas na
+      hora, sem esperar
+    - Sem vaga, a requisicao recebe 503 com Retry-After em vez de se acumular
+    - Registra o tempo de fila (espera pela vaga) e os totais de aceitas/rejeitadas
+
+    adquirir() espera bloqueando a thread (rotas sync); adquirir_async() espera
+    no event loop, sem ocupar thread do threadpool. Ambos disputam as mesmas vagas.
+
+    Uso:
+        limitador = LimitadorConcorrencia("bcrypt", limite=8, espera_maxima=2, fila_maxima=16)
+        with limitador.adquirir():
+            ...
+        async with limitador.adquirir_async():
+            ...
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        limite: int,
+        espera_maxima: float,
+        retry_after: int = 5,
+        fila_maxima: Optional[int] = None
+    ):
+        self.nome = nome
+        self.limite = limite
+        self.espera_maxima = espera_maxima
+        self.retry_after = retry_after
+        self.fila_maxima = fila_maxima
+        self._fila: "deque[_Espera]" = deque()
+        self._lock = threading.Lock()
+        self.em_uso = 0
+        self.aceitas = 0
+        self.rejeitadas = 0
+        self.tempo_fila_total = 0.0
+        self.tempo_fila_maximo = 0.0
+
+    @property
+    def aguardando(self) -> int:
+        return len(self._fila)
+
+    def _rejeitar(self) -> HTTPException:
+        """Conta a rejeicao (chamar com o lock) e retorna o 503"""
+        self.rejeitadas += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    def _entrar(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Optional[_Espera]:
+        """
+        Ocupa uma vaga livre (retorna None) ou entra na fila (retorna a espera)
+
+        Raises:
+            HTTPException: 503 se a fila ja esta cheia
+        """
+        with self._lock:
+            if self.em_uso < self.limite and not self._fila:
+                self.em_uso += 1
+                return None
+            if self.fila_maxima is not None and len(self._fila) >= self.fila_maxima:
+                raise self._rejeitar()
+            espera = _Espera(loop)
+            self._fila.append(espera)
+            return espera
+
+    def _desistir(self, espera: _Espera) -> bool:
+        """
+        Sai da fila apos o timeout; retorna True se a vaga chegou nesse meio tempo
+
+        Raises:
+            HTTPException: 503 se a vaga nao chegou
+        """
+        with self._lock:
+            if espera.concedida:
+                return True
+            self._fila.remove(espera)
+            raise self._rejeitar()
+
+    def _registrar_aceita(self, espera: float):
+        with self._lock:
+            self.aceitas += 1
+            self.tempo_fila_total += espera
+            self.tempo_fila_maximo = max(self.tempo_fila_maximo, espera)
+
+    def _liberar(self):
+        """Passa a vaga ao primeiro da fila, ou a devolve"""
+        with self._lock:
+            if self._fila:
+                self._fila.popleft().conceder()
+            else:
+                self.em_uso -= 1
+
+    @contextmanager
+    def adquirir(self):
+        """
+        Ocupa uma vaga durante o bloco with (espera bloqueando a thread)
+
+        Raises:
+            HTTPException: 503 se a fila estiver cheia ou nao houver vaga dentro
+                de espera_maxima
+        """
+        inicio = time.perf_counter()
+        espera = self._entrar()
+        if espera is not None and not espera.evento.wait(self.espera_maxima):
+            self._desistir(espera)
+        tempo_fila = time.perf_counter() - inicio
+        self._registrar_aceita(tempo_fila)
+
+        try:
+            yield tempo_fila
+        finally:
+            self._liberar()
+
+    @asynccontextmanager
+    async def adquirir_async(self):
+        """
+        Ocupa uma vaga durante o bloco async with (espera no event loop)
+
+        Raises:
+            HTTPException: 503 se a fila estiver cheia ou nao houver vaga dentro
+                de espera_maxima
+        """
+        inicio = time.perf_counter()
+        espera = self._entrar(asyncio.get_running_loop())
+        if espera is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(espera.futuro), self.espera_maxima)
+            except asyncio.TimeoutError:
+                self._desistir(espera)
+            except asyncio.CancelledError:
+                # Requisicao cancelada na fila: devolve a vaga se ela ja tinha chegado
+                with self._lock:
+                    concedida = espera.concedida
+                    if not concedida:
+                        self._fila.remove(espera)
+                if concedida:
+                    self._liberar()
+                raise
+        tempo_fila = time.perf_counter() - inicio
+        self._registrar_aceita(tempo_fila)
+
+        try:
+            yield tempo_fila
+        finally:
+            self._liberar()
+
+    def estatisticas(self) -> dict:
+        """Metricas do limitador (tempos em milissegundos)"""
+        with self._lock:
+            media = self.tempo_fila_total / self.aceitas if self.aceitas else 0.0
+            return {
+                "nome": self.nome,
+                "limite": self.limite,
+                "fila_maxima": self.fila_maxima,
+                "em_uso": self.em_uso,
+                "aguardando": len(self._fila),
+                "aceitas": self.aceitas,
+                "rejeitadas": self.rejeitadas,
+                "tempo_fila_medio_ms": round(media * 1000, 2),
+                "tempo_fila_maximo_ms": round(self.tempo_fila_maximo * 1000, 2)
+            }
@@ -0,0 +1,244 @@
+"""
+Log de consultas lentas (SLOW_QUERY_MS) com captura de EXPLAIN
+
+Comandos que passam de SLOW_QUERY_MS são:
+- agregados em memória por formato (SQL normalizado): execuções, tempo total e
+  máximo, rotas de origem e último plano; listados em /admin/consultas-lentas
+- gravados em SLOW_QUERY_LOG_FILE (rotativo, uma linha JSON por ocorrência) com
+  o SQL normalizado, o formato dos parâmetros (tipos, sem valores), duração e rota
+
+No PostgreSQL o plano (EXPLAIN sem ANALYZE, ou seja, sem executar a consulta de
+novo) é obtido numa thread separada, no máximo uma vez por formato a cada
+SLOW_QUERY_EXPLAIN_INTERVAL segundos. Gravação do log e EXPLAIN ficam fora da
+requisição.
+
+Os números são por processo (cada worker do gunicorn tem o seu agregado).
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.utils.metricas import consumo_banco, formato_sql
+
+logger = logging.getLogger(__name__)
+
+# Formatos mantidos em memória (os de menor tempo total saem primeiro)
+MAX_FORMATOS = 500
+
+# Apenas consultas de leitura recebem EXPLAIN
+_LEITURA = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_PLACEHOLDER_NUMERADO = re.compile(r"\$(\d+)")
+
+
+def _formato_parametros(parameters, executemany: bool):
+    """Tipos dos parâmetros (sem os valores)"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"lote": len(parameters), "item": _formato_parametros(parameters[0], False)}
+    if isinstance(parameters, dict):
+        return {chave: type(valor).__name__ for chave, valor in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(valor).__name__ for valor in parameters]
+    return type(parameters).__name__
+
+
+def _rota_atual() -> Optional[str]:
+    consumo = consumo_banco.get()
+    if consumo is None or consumo.scope is None:
+        return None
+    rota = consumo.scope.get("route")
+    metodo = consumo.scope.get("method", "")
+    return f"{metodo} {rota.path if rota is not None else consumo.scope.get('path')}"
+
+
+def _para_psycopg2(statement: str, parameters):
+    """Converte placeholders $1, $2 (asyncpg) para %s (psycopg2)"""
+    if isinstance(parameters, (list, tuple)) and _PLACEHOLDER_NUMERADO.search(statement):
+        ordem = [int(n) - 1 for n in _PLACEHOLDER_NUMERADO.findall(statement)]
+        sql = _PLACEHOLDER_NUMERADO.sub("%s", statement.replace("%", "%%"))
+        return sql, [parameters[i] for i in ordem]
+    return statement, parameters
+
+
+class RegistroConsultasLentas:
+    """Agregado por formato + log rotativo + EXPLAIN em segundo plano"""
+
+    def __init__(self):
+        self._formatos: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._log: Optional[logging.Logger] = None
+        self._pendentes = 0
+
+    def _garantir_iniciado(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._log = self._criar_log()
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="consultas-lentas"
+                    )
+
+    @staticmethod
+    def _criar_log() -> logging.Logger:
+        log = logging.getLogger("consultas_lentas")
+        log.propagate = False
+        if not log.handlers:
+            diretorio = os.path.dirname(settings.SLOW_QUERY_LOG_FILE)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            handler = RotatingFileHandler(
+                settings.SLOW_QUERY_LOG_FILE,
+                maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            log.addHandler(handler)
+            log.setLevel(logging.INFO)
+        return log
+
+    def registrar(self, conn, statement: str, parameters, executemany: bool, duracao_ms: float):
+        """Chamado no after_cursor_execute (barato: agrega e agenda o resto)"""
+        self._garantir_iniciado()
+        formato = formato_sql(statement)
+        rota = _rota_atual()
+        agora = time.time()
+
+        with self._lock:
+            item = self._formatos.get(formato)
+            if item is None:
+                if len(self._formatos) >= MAX_FORMATOS:
+                    menor = min(self._formatos, key=lambda f: self._formatos[f]["total_ms"])
+                    del self._formatos[menor]
+                item = self._formatos[formato] = {
+                    "sql": formato,
+                    "execucoes": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rotas": {},
+                    "parametros": None,
+                    "ultima_ocorrencia": None,
+                    "plano": None,
+                    "plano_em": 0.0
+                }
+            item["execucoes"] += 1
+            item["total_ms"] += duracao_ms
+            item["max_ms"] = max(item["max_ms"], duracao_ms)
+            if rota:
+                item["rotas"][rota] = item["rotas"].get(rota, 0) + 1
+            item["ultima_ocorrencia"] = agora
+
+            explicar = (
+                settings.SLOW_QUERY_EXPLAIN
+                and conn.dialect.name == "postgresql"
+                and _LEITURA.match(statement)
+                and agora - item["plano_em"] >= settings.SLOW_QUERY_EXPLAIN_INTERVAL
+                and self._pendentes < 20
+            )
+            if explicar:
+                item["plano_em"] = agora
+            self._pendentes += 1
+
+        # Parâmetros só viajam para a thread quando o EXPLAIN precisa deles
+        self._executor.submit(
+            self._processar, formato, _formato_parametros(parameters, executemany),
+            duracao_ms, rota, agora, statement if explicar else None,
+            parameters if explicar else None
+        )
+
+    def _processar(self, formato, formato_parametros, duracao_ms, rota, quando, statement, parameters):
+        try:
+            with self._lock:
+                if formato in self._formatos:
+                    self._formatos[formato]["parametros"] = formato_parametros
+
+            self._log.info(json.dumps({
+                "em": datetime.fromtimestamp(quando).isoformat(),
+                "duracao_ms": round(duracao_ms, 2),
+                "rota": rota,
+                "sql": formato,
+                "parametros": formato_parametros
+            }, ensure_ascii=False, default=str))
+
+            if statement is not None:
+                plano = self._explicar(statement, parameters)
+                with self._lock:
+                    if formato in self._formatos:
+                        self._formatos[formato]["plano"] = plano
+        except Exception as e:
+            logger.warning(f"Erro ao registrar consulta lenta: {e}")
+        finally:
+            with self._lock:
+                self._pendentes -= 1
+
+    @staticmethod
+    def _explicar(statement: str, parameters):
+        """EXPLAIN (sem ANALYZE) no primário, por uma conexão DBAPI sem eventos"""
+        from app.database import engine
+
+        sql, parametros = _para_psycopg2(statement, parameters)
+        conexao = engine.raw_connection()
+        try:
+            cursor = conexao.cursor()
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, parametros)
+            plano = cursor.fetchone()[0]
+            conexao.rollback()
+            return plano
+        finally:
+            conexao.close()
+
+    def top(self, limite: int = 20) -> list:
+        """Formatos com maior tempo total"""
+        with self._lock:
+            itens = sorted(self._formatos.values(), key=lambda i: i["total_ms"], reverse=True)[:limite]
+            return [
+                {
+                    "sql": item["sql"],
+                    "execucoes": item["execucoes"],
+                    "total_ms": round(item["total_ms"], 2),
+                    "medio_ms": round(item["total_ms"] / item["execucoes"], 2),
+                    "max_ms": round(item["max_ms"], 2),
+                    "rotas": dict(sorted(item["rotas"].items(), key=lambda r: -r[1])),
+                    "parametros": item["parametros"],
+                    "ultima_ocorrencia": datetime.fromtimestamp(item["ultima_ocorrencia"]).isoformat(),
+                    "plano": item["plano"]
+                }
+                for item in itens
+            ]
+
+    def limpar(self):
+        with self._lock:
+            self._formatos.clear()
+
+
+consultas_lentas = RegistroConsultasLentas()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta_lenta", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany):
+    duracao_ms = (time.perf_counter() - conn.info["inicio_consulta_lenta"].pop()) * 1000
+    if settings.SLOW_QUERY_MS > 0 and duracao_ms >= settings.SLOW_QUERY_MS:
+        consultas_lentas.registrar(conn, statement, parameters, executemany, duracao_ms)
+
+
+@event.listens_for(Engine, "handle_error")
+def _erro_ao_executar(contexto_erro):
+    pilha = contexto_erro.connection.info.get("inicio_consulta_lenta") if contexto_erro.connection else None
+    if pilha:
+        pilha.pop()
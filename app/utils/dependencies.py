@@ -1,27 +1,109 @@
 """
 Dependências do FastAPI (autenticação, permissões, etc)
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db
 from app.models.usuario import Usuario
+from app.replicas import METODOS_LEITURA, roteador, usar_primario
+from app.utils.cache import TTLCache
 from app.utils.security import decode_token
 from app.schemas.auth import TokenData
 
 # Security scheme para JWT
 security = HTTPBearer()
 
+# Campos de autenticação por id de usuário (evita o SELECT em usuarios a cada
+# requisição). Invalidado pelo router de usuários ao alterar/desativar/trocar senha,
+# apenas no processo que atendeu a alteração: nos demais workers um usuário
+# desativado ou excluído continua aceito até o TTL expirar.
+usuarios_cache = TTLCache(
+    ttl=settings.AUTH_USER_CACHE_TTL,
+    maxsize=settings.AUTH_USER_CACHE_MAX_ENTRIES
+)
 
-def get_current_user(
+
+def invalidar_usuario_cache(user_id: int):
+    """Remove o usuário do cache de autenticação"""
+    usuarios_cache.delete(user_id)
+
+
+class UsuarioAutenticado:
+    """
+    Usuário autenticado da requisição
+
+    Contém apenas os campos usados na autenticação/autorização (id, perfil, ativo,
+    permissoes). Handlers que precisam do Usuario completo (ex.: /auth/me) o
+    carregam com `await current_user.carregar_usuario()`; depois disso os demais
+    atributos ficam acessíveis diretamente.
+    """
+
+    def __init__(self, id: int, perfil: str, ativo: str, permissoes, db: AsyncSession):
+        self.id = id
+        self.perfil = perfil
+        self.ativo = ativo
+        self.permissoes = permissoes
+        self._db = db
+        self._usuario: Optional[Usuario] = None
+
+    async def carregar_usuario(self) -> Usuario:
+        """Retorna o model Usuario completo (consultado apenas na primeira chamada)"""
+        if self._usuario is None:
+            self._usuario = await self._db.get(Usuario, self.id)
+        return self._usuario
+
+    def __getattr__(self, nome: str):
+        # Chamado apenas para atributos que não são os campos acima
+        if nome.startswith("_") or self._usuario is None:
+            raise AttributeError(
+                f"{nome}: carregue o usuário com await carregar_usuario()"
+            )
+        return getattr(self._usuario, nome)
+
+    def __repr__(self):
+        return f"<UsuarioAutenticado {self.id} ({self.perfil})>"
+
+
+async def _carregar_dados_usuario(db: AsyncSession, user_id: int) -> Optional[tuple]:
+    """Busca no banco apenas os campos de autenticação"""
+    result = await db.execute(
+        select(
+            Usuario.id, Usuario.perfil, Usuario.ativo, Usuario.permissoes
+        ).where(Usuario.id == user_id)
+    )
+    row = result.first()
+    # Encerra a leitura: a conexão volta ao pool em vez de ficar com a requisição
+    # até o fim (ex.: relatórios esperando vaga em relatorios_limitador)
+    await db.rollback()
+    return tuple(row) if row else None
+
+
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Usuario:
+    db: AsyncSession = Depends(get_async_db)
+) -> UsuarioAutenticado:
     """
     Obtém o usuário atual a partir do token JWT
 
+    Retorna um UsuarioAutenticado (campos de autenticação em cache); no cache
+    miss a consulta usa a sessão async, sem ocupar thread do threadpool.
+
+    O cache (usuarios_cache) é por processo: alterar, desativar ou excluir um
+    usuário invalida apenas o cache do worker que atendeu a alteração. Com vários
+    workers (gunicorn), os demais continuam aceitando o usuário com os dados
+    antigos por até AUTH_USER_CACHE_TTL segundos.
+
+    Com réplicas configuradas, requisições de escrita marcam o usuário e fixam as
+    sessões da requisição (async e, via request.state, a sync de get_db) no
+    primário; leituras do mesmo usuário dentro da janela
+    REPLICA_READ_AFTER_WRITE_SECONDS também ficam no primário.
+
     Raises:
         HTTPException: Se token inválido ou usuário não encontrado
     """
@@ -45,10 +127,26 @@ def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    # Buscar usuário no banco
-    user = db.query(Usuario).filter(Usuario.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    # Buscar usuário (cache em memória, banco apenas no miss)
+    dados = usuarios_cache.get(user_id)
+    if dados is None:
+        dados = await _carregar_dados_usuario(db, user_id)
+        if dados is None:
+            raise credentials_exception
+        usuarios_cache.set(user_id, dados)
+
+    if roteador.ativo:
+        primario = request.method not in METODOS_LEITURA
+        if primario:
+            roteador.registrar_escrita(user_id)
+        else:
+            primario = roteador.escreveu_recentemente(user_id)
+        if primario:
+            usar_primario(db.sync_session)
+            # Sessão sync da rota (get_db), consultada no primeiro SELECT
+            request.state.usar_primario = True
+
+    user = UsuarioAutenticado(*dados, db=db)
 
     # Verificar se usuário está ativo
     if user.ativo != "S":
@@ -60,9 +158,9 @@ def get_current_user(
     return user
 
 
-def get_current_active_user(
-    current_user: Usuario = Depends(get_current_user)
-) -> Usuario:
+async def get_current_active_user(
+    current_user: UsuarioAutenticado = Depends(get_current_user)
+) -> UsuarioAutenticado:
     """Retorna usuário ativo"""
     return current_user
 
@@ -76,7 +174,7 @@ def require_perfil(*perfis_permitidos: str):
         def admin_route():
             ...
     """
-    def check_perfil(current_user: Usuario = Depends(get_current_user)):
+    async def check_perfil(current_user: UsuarioAutenticado = Depends(get_current_user)):
         if current_user.perfil not in perfis_permitidos:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -86,7 +184,9 @@ def require_perfil(*perfis_permitidos: str):
     return check_perfil
 
 
-def require_admin(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+async def require_admin(
+    current_user: UsuarioAutenticado = Depends(get_current_user)
+) -> UsuarioAutenticado:
     """Permite apenas usuários admin"""
     if current_user.perfil != "admin":
         raise HTTPException(
@@ -96,7 +196,7 @@ def require_admin(current_user: Usuario = Depends(get_current_user)) -> Usuario:
     return current_user
 
 
-def require_gerente_ou_superior(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+async def require_gerente_ou_superior(current_user: Usuario = Depends(get_current_user)) -> Usuario:
     """Permite gerentes e admins"""
     if current_user.perfil not in ["admin", "gerente"]:
         raise HTTPException(
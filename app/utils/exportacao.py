@@ -0,0 +1,96 @@
+"""
+Exportação CSV em streaming
+
+A consulta roda numa sessão própria (a da requisição não acompanha a resposta)
+com yield_per: no PostgreSQL o driver usa um cursor no servidor (stream_results)
+e as linhas chegam em lotes, então a memória não cresce com o tamanho da
+exportação. O CSV é gerado e enviado em blocos pelo StreamingResponse; o
+cabeçalho sai antes mesmo da consulta terminar.
+
+Textos do banco que começam como fórmula (=, +, -, @, tab, CR) saem com um
+apóstrofo na frente, para o Excel/LibreOffice não executá-los ao abrir o CSV
+(o XLSX dos relatórios usa a mesma verificação).
+"""
+import csv
+import io
+import logging
+from datetime import date, datetime
+from typing import Callable, Iterator
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas do banco por lote e escritas por bloco da resposta
+TAMANHO_LOTE = 1000
+
+# Inícios de texto que as planilhas interpretam como fórmula
+INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def parece_formula(valor) -> bool:
+    """True para textos que uma planilha interpretaria como fórmula"""
+    return isinstance(valor, str) and valor.startswith(INICIO_FORMULA)
+
+
+def _valor_csv(valor):
+    """
+    Datas em ISO 8601 (como no JSON da API); None vira campo vazio; textos que
+    parecem fórmula ganham um apóstrofo na frente
+    """
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if parece_formula(valor):
+        return f"'{valor}"
+    return valor
+
+
+def _gerar_csv(montar_consulta: Callable[[Session], Query]) -> Iterator[str]:
+    """Blocos do CSV: cabeçalho e depois as linhas em lotes de TAMANHO_LOTE"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def _descarregar() -> str:
+        bloco = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return bloco
+
+    db = SessionLocal()
+    try:
+        consulta = montar_consulta(db)
+        escritor.writerow([coluna["name"] for coluna in consulta.column_descriptions])
+        yield _descarregar()
+
+        linhas = 0
+        for linha in consulta.yield_per(TAMANHO_LOTE):
+            escritor.writerow([_valor_csv(valor) for valor in linha])
+            linhas += 1
+            if linhas % TAMANHO_LOTE == 0:
+                yield _descarregar()
+        yield _descarregar()
+    except Exception as e:
+        # Os headers já foram enviados: apenas registra e encerra a resposta
+        logger.error(f"Erro na exportação CSV: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def resposta_csv(montar_consulta: Callable[[Session], Query], nome_arquivo: str) -> StreamingResponse:
+    """
+    StreamingResponse com o CSV da consulta
+
+    Args:
+        montar_consulta: recebe a sessão da exportação e retorna a Query
+            (colunas projetadas, filtros e ordenação)
+        nome_arquivo: nome sugerido no Content-Disposition
+    """
+    return StreamingResponse(
+        _gerar_csv(montar_consulta),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}"'}
+    )
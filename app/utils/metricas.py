@@ -0,0 +1,295 @@
+"""
+Métricas Prometheus (requisições HTTP, banco e pool de conexões)
+
+Expostas em /metrics no formato texto do Prometheus.
+
+Com vários workers (gunicorn) defina PROMETHEUS_MULTIPROC_DIR com um diretório
+compartilhado e vazio antes de iniciar o servidor (ver gunicorn.conf.py): cada
+processo grava suas métricas lá e /metrics agrega todos os workers.
+"""
+import os
+import random
+import re
+import time
+import traceback
+from collections import Counter as ContadorFormatos
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.config import settings
+
+# ========== REQUISIÇÕES HTTP ==========
+
+HTTP_REQUISICOES = Counter(
+    "http_requests_total",
+    "Requisições HTTP atendidas",
+    ["method", "route", "status"]
+)
+HTTP_DURACAO_SEGUNDOS = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10)
+)
+HTTP_EM_ANDAMENTO = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+HTTP_DB_SEGUNDOS = Histogram(
+    "http_request_db_seconds",
+    "Tempo gasto no banco por requisição",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+HTTP_DB_CONSULTAS = Histogram(
+    "http_request_db_queries",
+    "Comandos SQL executados por requisição",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+
+
+# ========== BANCO POR REQUISIÇÃO ==========
+
+# Listas de placeholders (IN expandido, INSERT em lote) viram um único "?", para
+# que o mesmo comando com quantidades diferentes de itens tenha o mesmo formato
+_LISTA_PLACEHOLDERS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+))+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+def formato_sql(statement: str) -> str:
+    """Formato do comando (sem variação de espaços nem de tamanho de listas IN)"""
+    return _LISTA_PLACEHOLDERS.sub("(?)", _ESPACOS.sub(" ", statement).strip())
+
+
+def _pilha_da_aplicacao() -> List[str]:
+    """Frames do código da aplicação (sem SQLAlchemy/Starlette) na pilha atual"""
+    return [
+        f"{frame.filename}:{frame.lineno} em {frame.name}"
+        for frame in traceback.extract_stack()
+        if f"{os.sep}app{os.sep}" in frame.filename
+        and "site-packages" not in frame.filename
+        and not frame.filename.endswith("metricas.py")
+    ]
+
+
+class ConsumoBanco:
+    """
+    Comandos SQL e tempo de banco acumulados na requisição atual
+
+    Com detectar_n_mais_1 os comandos também são agrupados por formato; o formato
+    que passar de N_PLUS_ONE_THRESHOLD execuções guarda a pilha da execução que
+    cruzou o limite (para o log do middleware).
+    """
+
+    __slots__ = ("consultas", "segundos", "formatos", "pilhas", "scope")
+
+    def __init__(self, detectar_n_mais_1: bool = False, scope: Optional[dict] = None):
+        self.scope = scope  # scope ASGI (rota e método, para os logs)
+        self.consultas = 0
+        self.segundos = 0.0
+        self.formatos: Optional[ContadorFormatos] = ContadorFormatos() if detectar_n_mais_1 else None
+        self.pilhas: Dict[str, List[str]] = {}
+
+    def registrar(self, statement: str, segundos: float):
+        self.consultas += 1
+        self.segundos += segundos
+        if self.formatos is not None:
+            formato = formato_sql(statement)
+            self.formatos[formato] += 1
+            if self.formatos[formato] == settings.N_PLUS_ONE_THRESHOLD + 1:
+                self.pilhas[formato] = _pilha_da_aplicacao()
+
+    def repetidos(self) -> Dict[str, int]:
+        """Formatos executados mais de N_PLUS_ONE_THRESHOLD vezes"""
+        if not self.pilhas:
+            return {}
+        return {formato: self.formatos[formato] for formato in self.pilhas}
+
+
+def iniciar_consumo_banco(scope: Optional[dict] = None) -> ConsumoBanco:
+    """Consumo de banco de uma nova requisição (detector de N+1 em DEBUG ou por amostragem)"""
+    detectar = settings.DEBUG or (
+        settings.N_PLUS_ONE_SAMPLE_RATE > 0 and random.random() < settings.N_PLUS_ONE_SAMPLE_RATE
+    )
+    return ConsumoBanco(detectar_n_mais_1=detectar, scope=scope)
+
+
+# Definido pelo middleware de métricas no início de cada requisição. Handlers sync
+# (threadpool) e run_sync herdam o contexto, então o objeto é o mesmo.
+consumo_banco: ContextVar[Optional[ConsumoBanco]] = ContextVar("consumo_banco", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_execucao", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["inicio_execucao"].pop()
+    consumo = consumo_banco.get()
+    if consumo is not None:
+        consumo.registrar(statement, time.perf_counter() - inicio)
+
+
+@event.listens_for(Engine, "handle_error")
+def _erro_ao_executar(contexto_erro):
+    # after_cursor_execute não é chamado quando o comando falha
+    pilha = contexto_erro.connection.info.get("inicio_execucao") if contexto_erro.connection else None
+    if pilha:
+        pilha.pop()
+
+
+# ========== POOL DE CONEXÕES ==========
+
+POOL_CHECKOUT_SEGUNDOS = Histogram(
+    "db_pool_checkout_seconds",
+    "Tempo de espera por uma conexão do pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts que estouraram pool_timeout",
+    ["pool"]
+)
+POOL_IDADE_CONEXAO_SEGUNDOS = Histogram(
+    "db_pool_connection_age_seconds",
+    "Idade da conexão (desde a abertura) no momento do checkout",
+    ["pool"],
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 24 * 3600)
+)
+POOL_CONEXOES_ABERTAS = Counter(
+    "db_pool_connections_opened_total",
+    "Conexões abertas com o banco",
+    ["pool"]
+)
+POOL_EM_USO = Gauge(
+    "db_pool_connections_in_use", "Conexões emprestadas (checked out)",
+    ["pool"], multiprocess_mode="livesum"
+)
+POOL_OCIOSAS = Gauge(
+    "db_pool_connections_idle", "Conexões ociosas no pool",
+    ["pool"], multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Conexões além de pool_size (negativo = pool ainda não cheio)",
+    ["pool"], multiprocess_mode="livesum"
+)
+POOL_TAMANHO = Gauge("db_pool_size", "pool_size configurado", ["pool"], multiprocess_mode="livesum")
+POOL_MAX_OVERFLOW = Gauge("db_pool_max_overflow", "max_overflow configurado", ["pool"], multiprocess_mode="livesum")
+
+_pools = {}
+
+
+class _MedirCheckout:
+    """Mede o tempo de espera em _do_get (fila do pool quando está esgotado)"""
+
+    nome_metricas = "desconhecido"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(pool=self.nome_metricas).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SEGUNDOS.labels(pool=self.nome_metricas).observe(time.perf_counter() - inicio)
+
+
+class QueuePoolInstrumentado(_MedirCheckout, QueuePool):
+    """QueuePool com tempo de checkout (engine sync)"""
+
+
+class AsyncAdaptedQueuePoolInstrumentado(_MedirCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool com tempo de checkout (engine async)"""
+
+
+def instrumentar_pool(nome: str, pool: Pool):
+    """
+    Registra as métricas de um pool
+
+    - tempo de checkout: pools QueuePoolInstrumentado/AsyncAdaptedQueuePoolInstrumentado
+    - idade da conexão e conexões abertas: eventos connect/checkout
+    - em uso, ociosas e overflow: atualizados a cada checkout/checkin (valores
+      gravados, e não lidos na coleta, para funcionar também em multiprocess)
+    """
+    _pools[nome] = pool
+
+    if isinstance(pool, _MedirCheckout):
+        pool.nome_metricas = nome
+
+    def _atualizar_ocupacao():
+        if isinstance(pool, QueuePool):
+            POOL_EM_USO.labels(pool=nome).set(pool.checkedout())
+            POOL_OCIOSAS.labels(pool=nome).set(pool.checkedin())
+            POOL_OVERFLOW.labels(pool=nome).set(pool.overflow())
+
+    @event.listens_for(pool, "connect")
+    def _ao_conectar(dbapi_connection, connection_record):
+        connection_record.info["aberta_em"] = time.monotonic()
+        POOL_CONEXOES_ABERTAS.labels(pool=nome).inc()
+
+    @event.listens_for(pool, "checkout")
+    def _ao_emprestar(dbapi_connection, connection_record, connection_proxy):
+        aberta_em = connection_record.info.get("aberta_em")
+        if aberta_em is not None:
+            POOL_IDADE_CONEXAO_SEGUNDOS.labels(pool=nome).observe(time.monotonic() - aberta_em)
+        _atualizar_ocupacao()
+
+    @event.listens_for(pool, "checkin")
+    def _ao_devolver(dbapi_connection, connection_record):
+        _atualizar_ocupacao()
+
+    if isinstance(pool, QueuePool):
+        POOL_TAMANHO.labels(pool=nome).set(pool.size())
+        POOL_MAX_OVERFLOW.labels(pool=nome).set(pool._max_overflow)
+        _atualizar_ocupacao()
+
+
+def estatisticas_pools() -> dict:
+    """Situação atual dos pools (para /health/detailed)"""
+    estatisticas = {}
+    for nome, pool in _pools.items():
+        if isinstance(pool, QueuePool):
+            estatisticas[nome] = {
+                "tamanho": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "em_uso": pool.checkedout(),
+                "ociosas": pool.checkedin(),
+                "overflow": pool.overflow()
+            }
+        else:
+            estatisticas[nome] = {"status": pool.status()}
+    return estatisticas
+
+
+def gerar_metricas() -> tuple:
+    """
+    Corpo e content-type da resposta de /metrics
+
+    Em modo multiprocess agrega os arquivos de todos os workers.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,31 +1,295 @@
 """
 Utilitários de paginação
 """
-from typing import TypeVar, Generic, List
+import base64
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import TypeVar, Generic, List, NamedTuple, Optional, Any
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, false, func, select, text
 from sqlalchemy.orm import Query
 from pydantic import BaseModel
 from math import ceil
 
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
 T = TypeVar('T')
 
+# Estratégias de contagem do total
+# - exata: COUNT(*) em consulta separada (comportamento original)
+# - janela: COUNT(*) OVER () lido junto com as linhas da página (uma consulta)
+# - estimada: estimativa do planner (pg_class.reltuples sem filtros, EXPLAIN com filtros)
+# - limitada: conta no máximo PAGINATION_COUNT_CAP linhas e reporta "N+"
+ESTRATEGIAS_CONTAGEM = ("exata", "janela", "estimada", "limitada")
+PADRAO_CONTAGEM = "^(exata|janela|estimada|limitada)$"
+
 
 class Page(BaseModel, Generic[T]):
     """Resposta paginada"""
     items: List[T]
-    total: int
+    total: Optional[int] = None
+    total_exato: bool = True
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    def metadados(self) -> dict:
+        """Bloco "pagination" das respostas de listagem"""
+        return {
+            "total": self.total,
+            "total_exato": self.total_exato,
+            "page": self.page,
+            "size": self.size,
+            "pages": self.pages,
+            "next_cursor": self.next_cursor,
+            "prev_cursor": self.prev_cursor
+        }
+
+
+class ChaveOrdenacao(NamedTuple):
+    """
+    Coluna da ordenação usada na paginação por cursor
+
+    A última chave deve ser única (normalmente o id) para desempatar.
+    Valores nulos ficam sempre no final (NULLS LAST), nos dois sentidos.
+    """
+    coluna: Any
+    descendente: bool = False
+
+
+# ========== CURSOR ==========
+
+def _codificar_valor(valor):
+    """Converte o valor da chave para um formato serializável em JSON"""
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {"n": str(valor)}
+    return valor
+
+
+def _decodificar_valor(valor):
+    """Inverso de _codificar_valor"""
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        if "n" in valor:
+            return Decimal(valor["n"])
+        raise ValueError("valor de cursor desconhecido")
+    return valor
+
+
+def codificar_cursor(valores: list, direcao: str) -> str:
+    """Gera o cursor opaco (base64 url-safe) a partir dos valores das chaves"""
+    dados = {"v": [_codificar_valor(v) for v in valores], "d": direcao}
+    bruto = json.dumps(dados, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, quantidade_chaves: int) -> tuple:
+    """
+    Lê o cursor opaco
+
+    Returns:
+        (valores, direcao) onde direcao é "n" (próxima página) ou "p" (anterior)
+
+    Raises:
+        HTTPException: Se o cursor for inválido
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dados = json.loads(bruto)
+        valores = [_decodificar_valor(v) for v in dados["v"]]
+        direcao = dados["d"]
+        if direcao not in ("n", "p") or len(valores) != quantidade_chaves:
+            raise ValueError("cursor incompatível")
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+    return valores, direcao
+
+
+def _valores_chave(item, ordenacao: List[ChaveOrdenacao]) -> list:
+    """Valores das chaves de ordenação de um item da página"""
+    return [getattr(item, chave.coluna.key) for chave in ordenacao]
+
+
+# ========== KEYSET ==========
+
+def _depois(chave: ChaveOrdenacao, valor):
+    """Condição "coluna vem depois de valor" na ordenação (nulos no final)"""
+    coluna = chave.coluna
+    if valor is None:
+        return false()
+    maior = coluna < valor if chave.descendente else coluna > valor
+    return or_(maior, coluna.is_(None))
+
+
+def _antes(chave: ChaveOrdenacao, valor):
+    """Condição "coluna vem antes de valor" na ordenação (nulos no final)"""
+    coluna = chave.coluna
+    if valor is None:
+        return coluna.isnot(None)
+    return coluna > valor if chave.descendente else coluna < valor
+
+
+def _igual(chave: ChaveOrdenacao, valor):
+    if valor is None:
+        return chave.coluna.is_(None)
+    return chave.coluna == valor
+
+
+def _condicao_keyset(ordenacao: List[ChaveOrdenacao], valores: list, direcao: str):
+    """
+    Condição de busca (seek) a partir das chaves do cursor
+
+    Equivale à comparação de tupla (c1, c2, ...) > (v1, v2, ...), expandida em
+    OR/AND para suportar sentidos diferentes por coluna e valores nulos.
+    """
+    comparar = _depois if direcao == "n" else _antes
+    condicoes = []
+    for i, chave in enumerate(ordenacao):
+        anteriores = [_igual(ordenacao[j], valores[j]) for j in range(i)]
+        condicoes.append(and_(*anteriores, comparar(chave, valores[i])))
+    return or_(*condicoes)
+
+
+def _ordem(ordenacao: List[ChaveOrdenacao], invertida: bool = False) -> list:
+    """Cláusulas ORDER BY (invertida para buscar a página anterior)"""
+    clausulas = []
+    for chave in ordenacao:
+        descendente = chave.descendente != invertida
+        clausula = chave.coluna.desc() if descendente else chave.coluna.asc()
+        clausulas.append(clausula.nulls_first() if invertida else clausula.nulls_last())
+    return clausulas
+
+
+# ========== CONTAGEM ==========
+
+def _contar_exato(query: Query) -> int:
+    return query.order_by(None).count()
+
 
+def _contar_limitado(query: Query, limite: int) -> tuple:
+    """Conta até limite + 1 linhas; retorna (total, exato)"""
+    amostra = query.order_by(None).limit(limite + 1).subquery()
+    total = query.session.execute(
+        select(func.count()).select_from(amostra)
+    ).scalar()
+    if total > limite:
+        return limite, False
+    return total, True
 
-def paginate(query: Query, page: int = 1, size: int = 20) -> Page:
+
+def _estimar(query: Query) -> Optional[int]:
+    """
+    Estimativa do planner do PostgreSQL para o número de linhas da query
+
+    Sem filtros usa pg_class.reltuples (mantido pelo ANALYZE/autovacuum); com
+    filtros usa o "Plan Rows" do EXPLAIN. Retorna None quando não há estimativa
+    (outros bancos, tabela nunca analisada, erro).
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    consulta = query.order_by(None)
+    try:
+        if consulta.whereclause is None:
+            tabela = consulta.column_descriptions[0]["entity"].__table__.name
+            estimativa = query.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:tabela)"),
+                {"tabela": tabela}
+            ).scalar()
+        else:
+            compilado = consulta.statement.compile(dialect=bind.dialect)
+            plano = query.session.connection().exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + compilado.string, compilado.params
+            ).scalar()
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            estimativa = plano[0]["Plan"]["Plan Rows"]
+    except Exception as e:
+        logger.warning(f"Falha ao estimar total da paginação: {e}")
+        return None
+
+    if estimativa is None or estimativa < 0:
+        return None
+    return int(estimativa)
+
+
+def _contar(query: Query, estrategia: str) -> tuple:
+    """
+    Calcula o total da query conforme a estratégia; retorna (total, exato)
+
+    "janela" é tratada em paginate (vem junto com as linhas); aqui cai na exata.
+    """
+    limite = settings.PAGINATION_COUNT_CAP
+
+    if estrategia == "limitada":
+        return _contar_limitado(query, limite)
+
+    if estrategia == "estimada":
+        estimativa = _estimar(query)
+        if estimativa is None:
+            return _contar_exato(query), True
+        if estimativa > limite:
+            return estimativa, False
+        # Conjuntos pequenos: contar (até o limite) é barato e evita totais aproximados
+        return _contar_limitado(query, limite)
+
+    return _contar_exato(query), True
+
+
+def _consulta_de_entidade(query: Query) -> bool:
+    """True para session.query(Model); False para projeções de colunas"""
+    descricoes = query.column_descriptions
+    return len(descricoes) == 1 and descricoes[0]["expr"] is descricoes[0]["entity"]
+
+
+def paginate(
+    query: Query,
+    page: int = 1,
+    size: int = 20,
+    ordenacao: Optional[List[ChaveOrdenacao]] = None,
+    cursor: Optional[str] = None,
+    incluir_total: Optional[bool] = None,
+    contagem: Optional[str] = None
+) -> Page:
     """
     Pagina uma query do SQLAlchemy
 
+    Dois modos:
+    - page/size (OFFSET/LIMIT): modo original, com total e número de páginas
+    - cursor (keyset): busca a partir das chaves de `ordenacao` do último (ou
+      primeiro) item da página anterior; o custo não cresce com a profundidade
+      da página e o total só é calculado se `incluir_total` for True
+
+    Quando `ordenacao` é informada ela substitui o ORDER BY da query e as
+    respostas dos dois modos trazem next_cursor/prev_cursor, permitindo ao
+    cliente migrar de page para cursor a qualquer momento.
+
     Args:
         query: Query a ser paginada
-        page: Número da página (começa em 1)
+        page: Número da página (começa em 1; ignorado no modo cursor)
         size: Tamanho da página
+        ordenacao: Chaves de ordenação (a última deve ser única)
+        cursor: Cursor opaco retornado em uma resposta anterior
+        incluir_total: Calcula o total (padrão: sim no modo page, não no modo cursor)
+        contagem: Estratégia de contagem do total (ver ESTRATEGIAS_CONTAGEM;
+            padrão: settings.PAGINATION_COUNT_STRATEGY)
 
     Returns:
         Objeto Page com items e metadados
@@ -37,16 +301,125 @@ def paginate(query: Query, page: int = 1, size: int = 20) -> Page:
     if size > 100:
         size = 100
 
-    total = query.count()
-    pages = ceil(total / size) if total > 0 else 1
+    estrategia = contagem or settings.PAGINATION_COUNT_STRATEGY
+    if estrategia not in ESTRATEGIAS_CONTAGEM:
+        estrategia = "exata"
+
+    if cursor and ordenacao:
+        return _paginar_cursor(
+            query, size, ordenacao, cursor, bool(incluir_total), estrategia
+        )
+
+    if ordenacao:
+        query = query.order_by(None).order_by(*_ordem(ordenacao))
+
+    calcular_total = incluir_total is not False
+    total = None
+    total_exato = True
+    if calcular_total and estrategia != "janela":
+        total, total_exato = _contar(query, estrategia)
 
     offset = (page - 1) * size
-    items = query.offset(offset).limit(size).all()
+    # Com ordenação conhecida, um item a mais indica se há próxima página
+    limite = size + 1 if ordenacao else size
+
+    if calcular_total and estrategia == "janela":
+        linhas = query.add_columns(
+            func.count().over().label("total_janela")
+        ).offset(offset).limit(limite).all()
+        if _consulta_de_entidade(query):
+            items = [linha[0] for linha in linhas]
+        else:
+            # Projeção de colunas: a própria linha (total_janela fica como coluna extra)
+            items = linhas
+        if linhas:
+            total = linhas[0].total_janela
+        else:
+            # Página além do fim: a janela não retorna linhas para contar
+            total = _contar_exato(query) if offset else 0
+    else:
+        items = query.offset(offset).limit(limite).all()
+
+    tem_proxima = len(items) > size
+    items = items[:size]
+
+    pages = None
+    if total is not None:
+        pages = ceil(total / size) if total > 0 else 1
+
+    next_cursor = None
+    prev_cursor = None
+    if ordenacao and items:
+        if tem_proxima:
+            next_cursor = codificar_cursor(_valores_chave(items[-1], ordenacao), "n")
+        if page > 1:
+            prev_cursor = codificar_cursor(_valores_chave(items[0], ordenacao), "p")
 
     return Page(
         items=items,
         total=total,
+        total_exato=total_exato,
         page=page,
         size=size,
-        pages=pages
+        pages=pages,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor
+    )
+
+
+def _paginar_cursor(
+    query: Query,
+    size: int,
+    ordenacao: List[ChaveOrdenacao],
+    cursor: str,
+    incluir_total: bool,
+    estrategia: str
+) -> Page:
+    """
+    Modo cursor do paginate (keyset em (chaves de ordenação, id))
+
+    A estratégia "janela" não se aplica aqui (a janela contaria apenas as linhas
+    após o cursor) e cai na contagem exata.
+    """
+    valores, direcao = decodificar_cursor(cursor, len(ordenacao))
+
+    total = None
+    total_exato = True
+    pages = None
+    if incluir_total:
+        total, total_exato = _contar(query, estrategia)
+        pages = ceil(total / size) if total > 0 else 1
+
+    seek = query.order_by(None).filter(_condicao_keyset(ordenacao, valores, direcao))
+
+    # Busca um item a mais para saber se existe outra página no mesmo sentido
+    items = seek.order_by(
+        *_ordem(ordenacao, invertida=direcao == "p")
+    ).limit(size + 1).all()
+    tem_mais = len(items) > size
+    items = items[:size]
+
+    if direcao == "p":
+        items.reverse()
+        tem_proxima, tem_anterior = True, tem_mais
+    else:
+        tem_proxima, tem_anterior = tem_mais, True
+
+    next_cursor = None
+    prev_cursor = None
+    if items:
+        if tem_proxima:
+            next_cursor = codificar_cursor(_valores_chave(items[-1], ordenacao), "n")
+        if tem_anterior:
+            prev_cursor = codificar_cursor(_valores_chave(items[0], ordenacao), "p")
+
+    return Page(
+        items=items,
+        total=total,
+        total_exato=total_exato,
+        page=1,
+        size=size,
+        pages=pages,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor
     )
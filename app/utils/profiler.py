@@ -0,0 +1,207 @@
+"""
+Profiler de requisições (diagnóstico de desempenho)
+
+Dois modos:
+- cprofile: determinístico (cProfile), arquivo .pstats (pstats/snakeviz)
+- amostragem: pilhas da thread do endpoint amostradas a cada
+  PROFILE_SAMPLE_INTERVAL_MS, arquivo .collapsed (flamegraph.pl, speedscope)
+
+Os perfis ficam em PROFILE_DIR (com um .json de metadados cada) e são
+baixados pelos endpoints /admin/profiles.
+
+Limitações em endpoints async (rodam na thread do event loop):
+- amostragem: a thread amostrada é a do event loop, então outras requisições
+  simultâneas também aparecem nas pilhas
+- cprofile: o profiler vale para a thread inteira, então as corrotinas de outras
+  requisições que rodam durante os awaits do endpoint também são medidas. Além
+  disso só um cProfile pode estar ativo por vez (no 3.11 um segundo enable()
+  substitui o primeiro; a partir do 3.12 ele falha), então os perfis cprofile
+  são serializados: com outro em andamento, a requisição segue sem profile (sem
+  X-Profile-Id). Para endpoints async sob carga prefira o modo amostragem.
+"""
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional
+
+from app.config import settings
+
+MODOS = ("cprofile", "amostragem")
+EXTENSOES = {"cprofile": ".pstats", "amostragem": ".collapsed"}
+PADRAO_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+logger = logging.getLogger(__name__)
+
+# Um cProfile ativo por vez no processo (ver limitações no docstring do módulo)
+_cprofile_lock = threading.Lock()
+
+
+class PerfilSolicitado:
+    """Profile pedido para a requisição atual (definido pelo middleware)"""
+
+    def __init__(self, modo: str, metodo: str, path: str):
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.modo = modo
+        self.metodo = metodo
+        self.path = path
+        self.rota: Optional[str] = None
+        self.salvo = False
+
+
+perfil_solicitado: ContextVar[Optional[PerfilSolicitado]] = ContextVar("perfil_solicitado", default=None)
+
+
+class AmostradorPilhas:
+    """Amostra periodicamente a pilha de uma thread (formato collapsed)"""
+
+    def __init__(self, thread_id: int, intervalo: float):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas: Counter = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="profiler-amostragem", daemon=True)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append(f"{_nome_modulo(codigo.co_filename)}:{codigo.co_name}")
+                frame = frame.f_back
+            if pilha:
+                self.pilhas[";".join(reversed(pilha))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+
+def _nome_modulo(arquivo: str) -> str:
+    """Caminho curto do arquivo (a partir do pacote), sem espaços"""
+    if "site-packages" in arquivo:
+        arquivo = arquivo.split(f"site-packages{os.sep}", 1)[-1]
+    elif f"{os.sep}app{os.sep}" in arquivo:
+        arquivo = "app" + os.sep + arquivo.rsplit(f"{os.sep}app{os.sep}", 1)[1]
+    return arquivo.replace(" ", "_")
+
+
+class Perfilador:
+    """
+    Executa uma chamada sob o profiler do modo pedido e grava o arquivo
+
+    No modo cprofile, se outro cProfile já estiver ativo a chamada roda sem
+    profile (perfil.salvo continua False).
+    """
+
+    def __init__(self, perfil: PerfilSolicitado):
+        self.perfil = perfil
+        self._profile: Optional[cProfile.Profile] = None
+        self._amostrador: Optional[AmostradorPilhas] = None
+        self._ignorado = False
+        self._inicio = 0.0
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        if self.perfil.modo == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                self._ignorado = True
+                logger.warning(
+                    f"Profile ignorado (outro cprofile em andamento): "
+                    f"{self.perfil.metodo} {self.perfil.path}"
+                )
+                return self
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._amostrador = AmostradorPilhas(
+                threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+            ).__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        if self._ignorado:
+            return
+        duracao = time.perf_counter() - self._inicio
+        if self._profile is not None:
+            self._profile.disable()
+            _cprofile_lock.release()
+        else:
+            self._amostrador.__exit__(*exc)
+        self._salvar(duracao)
+
+    def _salvar(self, duracao: float):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(settings.PROFILE_DIR, self.perfil.id)
+
+        if self._profile is not None:
+            self._profile.dump_stats(base + EXTENSOES["cprofile"])
+        else:
+            with open(base + EXTENSOES["amostragem"], "w", encoding="utf-8") as arquivo:
+                for pilha, amostras in self._amostrador.pilhas.most_common():
+                    arquivo.write(f"{pilha} {amostras}\n")
+
+        with open(base + ".json", "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "id": self.perfil.id,
+                "modo": self.perfil.modo,
+                "metodo": self.perfil.metodo,
+                "rota": self.perfil.rota,
+                "path": self.perfil.path,
+                "duracao_ms": round(duracao * 1000, 2),
+                "criado_em": datetime.utcnow().isoformat()
+            }, arquivo, ensure_ascii=False)
+
+        self.perfil.salvo = True
+        _remover_antigos()
+
+
+def _remover_antigos():
+    """Mantém apenas os PROFILE_MAX_FILES perfis mais recentes"""
+    if settings.PROFILE_MAX_FILES <= 0:
+        return
+    perfis = sorted(
+        nome[:-5] for nome in os.listdir(settings.PROFILE_DIR) if nome.endswith(".json")
+    )
+    for antigo in perfis[:-settings.PROFILE_MAX_FILES]:
+        for extensao in (".json", *EXTENSOES.values()):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, antigo + extensao))
+            except FileNotFoundError:
+                pass
+
+
+def listar_perfis() -> List[dict]:
+    """Metadados dos perfis salvos (mais recentes primeiro)"""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    perfis = []
+    for nome in sorted(os.listdir(settings.PROFILE_DIR), reverse=True):
+        if nome.endswith(".json"):
+            with open(os.path.join(settings.PROFILE_DIR, nome), encoding="utf-8") as arquivo:
+                perfis.append(json.load(arquivo))
+    return perfis
+
+
+def arquivo_perfil(profile_id: str) -> Optional[tuple]:
+    """(caminho, modo) do perfil, ou None se não existir"""
+    if not PADRAO_ID.match(profile_id):
+        return None
+    for modo, extensao in EXTENSOES.items():
+        caminho = os.path.join(settings.PROFILE_DIR, profile_id + extensao)
+        if os.path.isfile(caminho):
+            return caminho, modo
+    return None
@@ -0,0 +1,137 @@
+"""
+Projeção de colunas para as listagens
+
+As listagens retornam schemas *ListResponse com poucos campos. Consultar apenas
+as colunas desses campos (em vez da entidade inteira) evita trazer colunas TEXT
+como observacoes/detalhes e devolve linhas Row simples, sem identity map nem
+rastreamento de estado do ORM. Os schemas leem os campos das linhas por atributo
+(from_attributes), como fariam com a entidade.
+
+Sparse fieldsets: com ?fields=id,razao_social,cidade o endpoint usa um schema
+parcial (apenas esses campos), que reduz tanto o SELECT quanto o JSON.
+"""
+import inspect as inspect_python
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, create_model, field_serializer, field_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query, Session
+
+# Descrição do parâmetro fields nos endpoints (OpenAPI)
+DESCRICAO_FIELDS = "Campos da resposta separados por vírgula (ex.: id,razao_social,cidade)"
+
+
+@lru_cache(maxsize=None)
+def colunas_do_schema(model, schema: Type[BaseModel]) -> Tuple:
+    """
+    Colunas do model correspondentes aos campos do schema
+
+    Campos sem coluna e com valor padrão (ex.: cnpj_cpf, só de entrada) ficam
+    fora do SELECT e assumem o padrão, como já acontecia lendo da entidade.
+
+    Raises:
+        ValueError: se um campo obrigatório do schema não for coluna do model
+            (relacionamento, propriedade calculada...), caso em que a projeção
+            não se aplica
+    """
+    colunas = inspect(model).column_attrs
+    faltando = [
+        nome for nome, campo in schema.model_fields.items()
+        if nome not in colunas and campo.is_required()
+    ]
+    if faltando:
+        raise ValueError(
+            f"Campos de {schema.__name__} sem coluna em {model.__name__}: {', '.join(faltando)}"
+        )
+    return tuple(getattr(model, nome) for nome in schema.model_fields if nome in colunas)
+
+
+def consulta_projetada(session: Session, model, schema: Type[BaseModel], *extras) -> Query:
+    """
+    session.query(Model) restrita às colunas do schema
+
+    Filtros e ordenação continuam usando os atributos do model normalmente. As
+    colunas da ordenação da paginação precisam vir na linha (o cursor é lido
+    dela): passe-as em extras quando o schema pode não tê-las (schema parcial).
+    """
+    colunas = list(colunas_do_schema(model, schema))
+    chaves = {coluna.key for coluna in colunas}
+    colunas += [extra for extra in extras if extra.key not in chaves]
+    return session.query(*colunas)
+
+
+# ========== SPARSE FIELDSETS ==========
+
+def _funcao(decorador):
+    """Função original do validator/serializer (classmethods vêm ligados ao schema)"""
+    funcao = decorador.func
+    if inspect_python.ismethod(funcao):
+        return classmethod(funcao.__func__)
+    return funcao
+
+
+@lru_cache(maxsize=256)
+def schema_parcial(schema: Type[BaseModel], campos: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Schema com apenas os campos pedidos (mesmos tipos, Field e config)
+
+    Field validators e serializers do schema são copiados para os campos
+    presentes. Model validators não: eles consultam campos arbitrários (ex.:
+    validar_documento usa tipo_pessoa e cnpj) e são regras de entrada, não de
+    resposta.
+    """
+    decoradores = schema.__pydantic_decorators__
+    metodos = {}
+
+    for nome, decorador in decoradores.field_validators.items():
+        alvos = [campo for campo in decorador.info.fields if campo in campos]
+        if alvos:
+            metodos[nome] = field_validator(*alvos, mode=decorador.info.mode)(_funcao(decorador))
+
+    for nome, decorador in decoradores.field_serializers.items():
+        alvos = [campo for campo in decorador.info.fields if campo in campos]
+        if alvos:
+            metodos[nome] = field_serializer(
+                *alvos,
+                mode=decorador.info.mode,
+                when_used=decorador.info.when_used
+            )(_funcao(decorador))
+
+    return create_model(
+        f"{schema.__name__}Parcial",
+        __config__=schema.model_config,
+        __validators__=metodos,
+        **{campo: (schema.model_fields[campo].annotation, schema.model_fields[campo]) for campo in campos}
+    )
+
+
+def schema_com_campos(schema: Type[BaseModel], fields: Optional[str]) -> Type[BaseModel]:
+    """
+    Schema da resposta para o parâmetro fields
+
+    Sem fields retorna o próprio schema; com fields, o schema parcial (campos na
+    ordem do schema).
+
+    Raises:
+        HTTPException: 400 se algum campo não existir no schema
+    """
+    if not fields:
+        return schema
+
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    invalidos = sorted(pedidos - set(schema.model_fields))
+    if invalidos or not pedidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Campos inválidos em fields: {', '.join(invalidos) or '(vazio)'}. "
+                f"Disponíveis: {', '.join(schema.model_fields)}"
+            )
+        )
+
+    campos = tuple(campo for campo in schema.model_fields if campo in pedidos)
+    if len(campos) == len(schema.model_fields):
+        return schema
+    return schema_parcial(schema, campos)
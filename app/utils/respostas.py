@@ -0,0 +1,73 @@
+"""
+Respostas JSON
+
+- RespostaJSON: response class padrão da aplicação (orjson quando instalado,
+  senão o json da biblioteca padrão via JSONResponse)
+- resposta_pagina: serializa o envelope das listagens direto para bytes com um
+  TypeAdapter em cache por schema, sem o jsonable_encoder do FastAPI (valida os
+  objetos ORM e gera o JSON no pydantic-core; mesmo formato de antes, ex.:
+  Decimal como string e datas em ISO 8601)
+- resposta_item: o mesmo para um único objeto (detalhe com ?fields=)
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Type
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from app.utils.pagination import Page
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as RespostaJSON
+else:  # pragma: no cover
+    RespostaJSON = JSONResponse
+
+
+@lru_cache(maxsize=None)
+def adaptador_pagina(schema: Type[BaseModel]) -> TypeAdapter:
+    """
+    TypeAdapter do envelope de listagem para o schema dos itens
+
+    {"success": true, "data": {"items": [schema, ...], "pagination": {...}}}
+    """
+    dados = TypedDict(f"Dados{schema.__name__}", {
+        "items": List[schema],
+        "pagination": Dict[str, Any]
+    })
+    envelope = TypedDict(f"Pagina{schema.__name__}", {
+        "success": bool,
+        "data": dados
+    })
+    return TypeAdapter(envelope)
+
+
+def resposta_pagina(schema: Type[BaseModel], result: Page) -> Response:
+    """
+    Resposta da listagem paginada (itens ORM -> schema -> bytes)
+
+    Uso (no lugar de montar o dict com model_validate de cada item):
+        return resposta_pagina(EmpresaListResponse, result)
+    """
+    adaptador = adaptador_pagina(schema)
+    envelope = adaptador.validate_python(
+        {
+            "success": True,
+            "data": {"items": result.items, "pagination": result.metadados()}
+        },
+        from_attributes=True
+    )
+    return Response(content=adaptador.dump_json(envelope), media_type="application/json")
+
+
+def resposta_item(schema: Type[BaseModel], objeto: Any) -> Response:
+    """Resposta de detalhe (objeto ORM ou linha -> schema -> bytes)"""
+    return Response(
+        content=schema.model_validate(objeto).model_dump_json(),
+        media_type="application/json"
+    )
@@ -4,11 +4,157 @@ Utilitarios de seguranca (JWT, hash de senha, etc)
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
+import asyncio
 import bcrypt
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.concorrencia import LimitadorConcorrencia
 
+# Tokens já verificados: digest do token -> payload, válido até o "exp" do token.
+# O mesmo bearer token é apresentado em todas as requisições da sessão; o cache
+# evita repetir a verificação HMAC + parse + validação de claims a cada uma.
+tokens_cache = TTLCache(ttl=0, maxsize=settings.TOKEN_CACHE_MAX_ENTRIES)
 
-def hash_password(password: str) -> str:
+
+# ========== BCRYPT ==========
+# Hash/verificacao bcrypt custam ~250ms de CPU cada. Rodam em um pool de processos
+# de tamanho fixo, atras de um limitador de concorrencia: em picos de login as
+# requisicoes excedentes aguardam numa fila limitada (no event loop, no login
+# async) e, com a fila cheia ou apos BCRYPT_QUEUE_TIMEOUT, recebem 503 (Retry-After)
+# em vez de ocupar o threadpool.
+
+bcrypt_limitador = LimitadorConcorrencia(
+    "bcrypt",
+    limite=settings.BCRYPT_MAX_CONCURRENT,
+    espera_maxima=settings.BCRYPT_QUEUE_TIMEOUT,
+    retry_after=settings.BCRYPT_RETRY_AFTER,
+    fila_maxima=settings.BCRYPT_MAX_QUEUE
+)
+
+_bcrypt_pool: Optional[ProcessPoolExecutor] = None
+_bcrypt_pool_lock = threading.Lock()
+
+# Tempo entre o envio ao pool e o inicio da execucao no worker
+_fila_pool = {"amostras": 0, "total": 0.0, "maximo": 0.0}
+_fila_pool_lock = threading.Lock()
+
+
+def _criar_bcrypt_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=settings.BCRYPT_POOL_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def iniciar_bcrypt_pool():
+    """
+    Cria o pool de processos do bcrypt (chamado no startup da aplicacao)
+
+    Sem pool iniciado (scripts de linha de comando, BCRYPT_POOL_WORKERS=0) o
+    bcrypt executa no proprio processo.
+    """
+    global _bcrypt_pool
+    with _bcrypt_pool_lock:
+        if _bcrypt_pool is None and settings.BCRYPT_POOL_WORKERS > 0:
+            _bcrypt_pool = _criar_bcrypt_pool()
+            # Sobe os workers agora (sem aguardar): o primeiro login nao paga o
+            # custo de iniciar o processo e importar os modulos
+            for _ in range(settings.BCRYPT_POOL_WORKERS):
+                _bcrypt_pool.submit(_aquecer)
+
+
+def shutdown_bcrypt_pool():
+    """Encerra o pool de processos (chamado no shutdown da aplicacao)"""
+    global _bcrypt_pool
+    with _bcrypt_pool_lock:
+        if _bcrypt_pool is not None:
+            _bcrypt_pool.shutdown(wait=True)
+            _bcrypt_pool = None
+
+
+def _aquecer() -> bool:
+    return True
+
+
+def _executar_no_worker(funcao, args: tuple) -> tuple:
+    """Executa no processo do pool, retornando tambem o instante de inicio"""
+    return time.time(), funcao(*args)
+
+
+def _registrar_fila_pool(espera: float):
+    with _fila_pool_lock:
+        _fila_pool["amostras"] += 1
+        _fila_pool["total"] += espera
+        _fila_pool["maximo"] = max(_fila_pool["maximo"], espera)
+
+
+def estatisticas_bcrypt() -> dict:
+    """Metricas do bcrypt: limitador (espera por vaga) e fila do pool de processos"""
+    estatisticas = bcrypt_limitador.estatisticas()
+    with _fila_pool_lock:
+        amostras = _fila_pool["amostras"]
+        media = _fila_pool["total"] / amostras if amostras else 0.0
+        estatisticas.update({
+            "pool_workers": settings.BCRYPT_POOL_WORKERS if _bcrypt_pool is not None else 0,
+            "fila_pool_medio_ms": round(media * 1000, 2),
+            "fila_pool_maximo_ms": round(_fila_pool["maximo"] * 1000, 2)
+        })
+    return estatisticas
+
+
+def _recriar_bcrypt_pool(pool: ProcessPoolExecutor):
+    """Worker morto (ex.: OOM): recria o pool, se ainda nao foi recriado"""
+    global _bcrypt_pool
+    with _bcrypt_pool_lock:
+        if _bcrypt_pool is pool:
+            _bcrypt_pool = _criar_bcrypt_pool()
+
+
+def _executar_bcrypt(funcao, *args):
+    """Executa funcao(*args) no pool de processos, respeitando o limitador"""
+    with bcrypt_limitador.adquirir():
+        pool = _bcrypt_pool
+        if pool is None:
+            return funcao(*args)
+        try:
+            enviado = time.time()
+            inicio, resultado = pool.submit(_executar_no_worker, funcao, args).result()
+            _registrar_fila_pool(max(inicio - enviado, 0.0))
+            return resultado
+        except BrokenProcessPool:
+            _recriar_bcrypt_pool(pool)
+            return funcao(*args)
+
+
+async def _executar_bcrypt_async(funcao, *args):
+    """
+    Versao async de _executar_bcrypt: a espera pela vaga e pelo pool acontece no
+    event loop, sem ocupar thread do threadpool (sem pool, executa no threadpool)
+    """
+    async with bcrypt_limitador.adquirir_async():
+        pool = _bcrypt_pool
+        if pool is None:
+            return await run_in_threadpool(funcao, *args)
+        try:
+            enviado = time.time()
+            inicio, resultado = await asyncio.wrap_future(
+                pool.submit(_executar_no_worker, funcao, args)
+            )
+            _registrar_fila_pool(max(inicio - enviado, 0.0))
+            return resultado
+        except BrokenProcessPool:
+            _recriar_bcrypt_pool(pool)
+            return await run_in_threadpool(funcao, *args)
+
+
+def _gerar_hash(password: str) -> str:
     """
     Gera hash bcrypt da senha usando bcrypt diretamente
     Bcrypt tem limite de 72 bytes - trunca se necessario
@@ -24,7 +170,7 @@ def hash_password(password: str) -> str:
     return hashed.decode('utf-8')
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verificar_hash(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica se a senha corresponde ao hash usando bcrypt diretamente
     Bcrypt tem limite de 72 bytes - trunca se necessario
@@ -44,6 +190,31 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def hash_password(password: str) -> str:
+    """Gera hash bcrypt da senha (no pool de processos)"""
+    return _executar_bcrypt(_gerar_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica a senha contra o hash bcrypt (no pool de processos)
+
+    Raises:
+        HTTPException: 503 se o limite de verificacoes simultaneas foi atingido
+    """
+    return _executar_bcrypt(_verificar_hash, plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica a senha contra o hash bcrypt, aguardando no event loop (rotas async)
+
+    Raises:
+        HTTPException: 503 se a fila de verificacoes estiver cheia ou sem vaga a tempo
+    """
+    return await _executar_bcrypt_async(_verificar_hash, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Cria um access token JWT
@@ -91,15 +262,29 @@ def decode_token(token: str) -> Optional[dict]:
     Args:
         token: Token JWT a ser decodificado
 
+    Tokens validos ficam em cache (LRU) ate expirarem; tokens invalidos nao sao
+    cacheados e sempre passam pela validacao completa.
+
     Returns:
         Payload do token ou None se invalido
     """
+    chave = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = tokens_cache.get(chave)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
 
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        restante = exp - time.time()
+        if restante > 0:
+            tokens_cache.set(chave, dict(payload), ttl=restante)
+    return payload
+
 
 def generate_chave_acesso() -> str:
     """
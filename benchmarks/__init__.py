@@ -0,0 +1,6 @@
+"""
+Benchmarks de desempenho (executados manualmente, fora do pytest)
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.autenticacao
+"""
@@ -0,0 +1,65 @@
+"""
+Custo da autenticação por requisição (decode_token e get_current_user)
+
+Compara a validação completa do JWT (jose.jwt.decode) com o acerto no cache de
+tokens verificados, e mede a dependency get_current_user inteira com os caches
+de token e de usuário aquecidos (caminho de todas as requisições autenticadas
+depois da primeira).
+
+    python -m benchmarks.autenticacao [repeticoes]
+"""
+import asyncio
+import sys
+from types import SimpleNamespace
+
+# Define o ambiente antes de importar a aplicação
+from benchmarks.comum import imprimir, medir
+
+# isort: split
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from app.config import settings
+from app.utils.dependencies import get_current_user, usuarios_cache
+from app.utils.security import create_access_token, decode_token, tokens_cache
+
+
+def main(repeticoes: int = 20000):
+    token = create_access_token({"sub": "admin", "user_id": 1, "perfil": "admin"})
+
+    def _jose():
+        jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    def _miss():
+        tokens_cache.clear()
+        decode_token(token)
+
+    imprimir("jose.jwt.decode (sem cache)", medir(_jose, repeticoes))
+    imprimir("decode_token, cache miss", medir(_miss, repeticoes))
+    imprimir("decode_token, cache hit", medir(lambda: decode_token(token), repeticoes))
+
+    # get_current_user com token e usuário em cache: nenhum acesso ao banco
+    usuarios_cache.set(1, (1, "admin", "S", None))
+    requisicao = SimpleNamespace(method="GET")
+    credenciais = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    loop = asyncio.new_event_loop()
+
+    def _dependency():
+        loop.run_until_complete(get_current_user(requisicao, credenciais, db=None))
+
+    def _vazio():
+        loop.run_until_complete(asyncio.sleep(0))
+
+    custo_loop = medir(_vazio, repeticoes)
+    imprimir(
+        "get_current_user, caches aquecidos (sem o loop)",
+        medir(_dependency, repeticoes) - custo_loop
+    )
+    loop.close()
+
+    print(f"\ntokens_cache: {tokens_cache.estatisticas()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,70 @@
+"""
+Índice de autocomplete de empresas: memória e latência
+
+Gera empresas sintéticas (as mesmas de benchmarks.busca_empresas) e mede o
+carregar() do índice (tempo e memória retida, via tracemalloc), o buscar() com
+prefixos de 1 a 6 caracteres e a atualização incremental (atualizar()).
+
+    python -m benchmarks.autocomplete [--empresas 100000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+# Define o ambiente antes de importar a aplicação
+from benchmarks.busca_empresas import gerar_empresas
+from benchmarks.comum import imprimir, medir
+
+# isort: split
+
+from app.database import Base, SessionLocal, engine
+from app.models.empresa import Empresa
+from app.services.autocomplete_service import IndiceAutocomplete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--empresas", type=int, default=100000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        gerar_empresas(session, args.empresas)
+        nomes = [nome for (nome,) in session.query(Empresa.razao_social).limit(args.consultas)]
+
+    def _indice():
+        return IndiceAutocomplete("empresas", Empresa, Empresa.razao_social, Empresa.nome_fantasia)
+
+    # Tempo sem o tracemalloc (que deixa a carga bem mais lenta); a memória numa segunda carga
+    inicio = time.perf_counter()
+    _indice().carregar()
+    duracao = time.perf_counter() - inicio
+
+    indice = _indice()
+    tracemalloc.start()
+    registros = indice.carregar()
+    retida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{registros} registros, {len(indice._chaves)} chaves")
+    print(f"carregar: {duracao * 1000:.0f} ms, {retida / 2**20:.1f} MiB retidos "
+          f"(pico {pico / 2**20:.1f} MiB)\n")
+
+    aleatorio = random.Random(23)
+    prefixos = iter([nome[:aleatorio.randint(1, 6)] for nome in nomes] * 2)
+    imprimir("buscar (limite 10)", medir(lambda: indice.buscar(next(prefixos)), len(nomes) - 1))
+
+    ids = iter(range(1, len(nomes) + 1))
+    imprimir(
+        "atualizar (reindexa um registro)",
+        medir(lambda: indice.atualizar(SimpleNamespace(
+            id=next(ids), razao_social="Empresa Renomeada Ltda", nome_fantasia=None, ativo="S"
+        )), len(nomes) - 1)
+    )
+
+
+if __name__ == "__main__":
+    main()
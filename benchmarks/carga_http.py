@@ -0,0 +1,116 @@
+"""
+Teste de carga HTTP: requisições por segundo com N clientes simultâneos
+
+Cada cliente repete as requisições (em rodízio pelos caminhos informados) até o
+fim da duração; o resultado traz req/s, latências (p50/p95/p99) e respostas por
+status. Roda contra um servidor já iniciado, então serve para comparar duas
+versões da API (ex.: handlers sync x async) com o mesmo banco e os mesmos
+parâmetros:
+
+    # terminal 1: servidor (1 worker, para comparar o mesmo processo)
+    uvicorn app.main:app --port 8000 --workers 1
+
+    # terminal 2: 200 clientes por 20s nas rotas de leitura mais acessadas
+    python -m benchmarks.carga_http --url http://localhost:8000 --clientes 200 --duracao 20
+
+Usa httpx (dependência de testes do requirements.txt).
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+
+CAMINHOS_PADRAO = [
+    "/api/v1/dashboard/principal",
+    "/api/v1/dashboard/andamento?limit=50",
+    "/api/v1/empresas?page=1&per_page=20",
+    "/api/v1/ordens-servico?page=1&per_page=20",
+    "/api/v1/equipamentos-empresa?page=1&per_page=20",
+]
+
+
+def _percentil(valores: List[float], percentil: float) -> float:
+    if not valores:
+        return 0.0
+    indice = min(len(valores) - 1, int(round(percentil / 100 * (len(valores) - 1))))
+    return valores[indice]
+
+
+async def _autenticar(cliente: httpx.AsyncClient, login: str, senha: str) -> dict:
+    response = await cliente.post("/api/v1/auth/login", json={"login": login, "senha": senha})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def executar(
+    url: str,
+    clientes: int,
+    duracao: float,
+    caminhos: List[str],
+    login: str,
+    senha: str
+) -> dict:
+    """Executa a carga e retorna o resumo (req/s, latências em ms, status)"""
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        headers = await _autenticar(cliente, login, senha)
+        # Aquecimento: caches e conexões do servidor
+        for caminho in caminhos:
+            await cliente.get(caminho, headers=headers)
+
+        latencias: List[float] = []
+        status_respostas: Counter = Counter()
+        fim = time.perf_counter() + duracao
+
+        async def _cliente(numero: int):
+            i = numero
+            while time.perf_counter() < fim:
+                caminho = caminhos[i % len(caminhos)]
+                i += 1
+                inicio = time.perf_counter()
+                try:
+                    response = await cliente.get(caminho, headers=headers)
+                    status_respostas[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    status_respostas[type(e).__name__] += 1
+                    continue
+                latencias.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*[_cliente(n) for n in range(clientes)])
+        decorrido = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "clientes": clientes,
+        "requisicoes": len(latencias),
+        "req_por_segundo": round(len(latencias) / decorrido, 1),
+        "p50_ms": round(_percentil(latencias, 50) * 1000, 1),
+        "p95_ms": round(_percentil(latencias, 95) * 1000, 1),
+        "p99_ms": round(_percentil(latencias, 99) * 1000, 1),
+        "status": dict(status_respostas),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--duracao", type=float, default=20.0, help="segundos")
+    parser.add_argument("--login", default="admin")
+    parser.add_argument("--senha", default="admin123")
+    parser.add_argument("caminhos", nargs="*", default=CAMINHOS_PADRAO)
+    args = parser.parse_args()
+
+    resumo = asyncio.run(executar(
+        args.url, args.clientes, args.duracao, args.caminhos, args.login, args.senha
+    ))
+    for chave, valor in resumo.items():
+        print(f"{chave:<16} {valor}")
+
+
+if __name__ == "__main__":
+    main()
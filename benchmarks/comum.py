@@ -0,0 +1,36 @@
+"""
+Utilitários comuns dos benchmarks
+
+Importar este módulo antes da aplicação: as variáveis de ambiente obrigatórias
+recebem valores padrão (banco SQLite temporário) quando não estão definidas, para
+que os benchmarks que não dependem do banco rodem sem .env. Para medir contra o
+PostgreSQL, defina DATABASE_URL antes de executar.
+"""
+import os
+import tempfile
+import time
+from typing import Callable
+
+DIRETORIO_BENCHMARKS = tempfile.mkdtemp(prefix="gestorhs_bench_")
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(DIRETORIO_BENCHMARKS, 'bench.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "chave-dos-benchmarks")
+os.environ.setdefault("LOG_FILE", os.path.join(DIRETORIO_BENCHMARKS, "api.log"))
+os.environ.setdefault("SLOW_QUERY_LOG_FILE", os.path.join(DIRETORIO_BENCHMARKS, "slow_queries.log"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(DIRETORIO_BENCHMARKS, "profiles"))
+os.environ.setdefault("AUTOCOMPLETE_REFRESH_INTERVAL", "0")
+
+
+def medir(funcao: Callable[[], object], repeticoes: int) -> float:
+    """Tempo médio por chamada, em microssegundos"""
+    funcao()  # aquecimento
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def imprimir(descricao: str, microssegundos: float):
+    print(f"{descricao:<55} {microssegundos:>10.1f} µs")
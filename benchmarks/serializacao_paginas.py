@@ -0,0 +1,107 @@
+"""
+Serialização de uma página de listagem (100 ordens de serviço)
+
+Compara, para a mesma página de OrdemServicoListResponse lida do banco (mesma
+consulta projetada da rota GET /ordens-servico):
+- o caminho anterior: model_validate de cada item, dict do envelope,
+  jsonable_encoder e JSONResponse
+- o mesmo caminho renderizado com orjson (RespostaJSON)
+- resposta_pagina (TypeAdapter do envelope em cache, direto para bytes)
+
+Só a serialização é medida; a página é lida uma vez antes. Sem DATABASE_URL,
+cria um banco SQLite temporário com as ordens de serviço.
+
+    python -m benchmarks.serializacao_paginas [repeticoes]
+"""
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Define o ambiente antes de importar a aplicação
+from benchmarks.comum import imprimir, medir
+
+# isort: split
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.database import Base, SessionLocal, engine
+from app.models.ordem_servico import OrdemServico
+from app.schemas.ordem_servico import OrdemServicoListResponse
+from app.utils.pagination import ChaveOrdenacao, paginate
+from app.utils.projecao import consulta_projetada
+from app.utils.respostas import RespostaJSON, resposta_pagina
+
+TAMANHO_PAGINA = 100
+
+
+def _popular(session):
+    """Ordens de serviço suficientes para uma página cheia (banco vazio)"""
+    if session.query(OrdemServico.id).count() >= TAMANHO_PAGINA:
+        return
+    inicio = datetime(2024, 1, 1, 8, 30)
+    session.add_all(
+        OrdemServico(
+            empresa_id=1 + i % 20,
+            equipamento_empresa_id=1 + i % 50,
+            fase_id=1 + i % 6,
+            chave_acesso=f"BENCH{i:010d}",
+            data_solicitacao=inicio + timedelta(hours=i),
+            data_calibracao=inicio + timedelta(days=i) if i % 3 == 0 else None,
+            situacao_servico="Em andamento",
+            valor_servico=Decimal("150.00") + i,
+            valor_frete_envio=Decimal("25.50"),
+            valor_frete_retorno=Decimal("25.50"),
+            pago="S" if i % 2 else "N"
+        )
+        for i in range(TAMANHO_PAGINA)
+    )
+    session.commit()
+
+
+def main(repeticoes: int = 300):
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    _popular(session)
+
+    ordenacao = [
+        ChaveOrdenacao(OrdemServico.data_solicitacao, descendente=True),
+        ChaveOrdenacao(OrdemServico.id, descendente=True)
+    ]
+    query = consulta_projetada(
+        session, OrdemServico, OrdemServicoListResponse,
+        *(chave.coluna for chave in ordenacao)
+    )
+    result = paginate(query, 1, TAMANHO_PAGINA, ordenacao, contagem="janela")
+    print(f"{len(result.items)} itens por página, {repeticoes} repetições\n")
+
+    def _envelope():
+        return {
+            "success": True,
+            "data": {
+                "items": [OrdemServicoListResponse.model_validate(item) for item in result.items],
+                "pagination": result.metadados()
+            }
+        }
+
+    def _anterior():
+        return JSONResponse(jsonable_encoder(_envelope())).body
+
+    def _anterior_orjson():
+        return RespostaJSON(jsonable_encoder(_envelope())).body
+
+    def _resposta_pagina():
+        return resposta_pagina(OrdemServicoListResponse, result).body
+
+    assert _anterior() == _resposta_pagina(), "formatos diferentes"
+
+    imprimir("model_validate + jsonable_encoder + JSONResponse", medir(_anterior, repeticoes))
+    imprimir(
+        "model_validate + jsonable_encoder + RespostaJSON", medir(_anterior_orjson, repeticoes)
+    )
+    imprimir("resposta_pagina", medir(_resposta_pagina, repeticoes))
+    session.close()
+
+
+if __name__ == "__main__":
+    main(*(int(argumento) for argumento in sys.argv[1:2]))
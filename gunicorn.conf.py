@@ -0,0 +1,34 @@
+"""
+Configuração do gunicorn (produção)
+
+Uso:
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Com vários workers as métricas do Prometheus são gravadas em
+PROMETHEUS_MULTIPROC_DIR (um arquivo por processo) e /metrics, atendido por
+qualquer worker, agrega todos eles.
+"""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Definido antes do fork para valer em todos os workers
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/gestorhs-metrics"
+)
+
+
+def on_starting(server):
+    """Limpa as métricas da execução anterior (o diretório deve começar vazio)"""
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Remove os gauges 'live' do worker encerrado"""
+    multiprocess.mark_process_dead(worker.pid)
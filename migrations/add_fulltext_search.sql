@@ -0,0 +1,55 @@
+-- Migration: Busca textual unificada (/api/v1/search)
+-- Data: 2026-10-17
+-- Descrição: Colunas tsvector geradas (configuração portuguese, sem acentos) em
+--            empresas, equipamentos e ordens_servico, com índices GIN. São mantidas
+--            pelo próprio PostgreSQL (GENERATED ALWAYS ... STORED, PostgreSQL 12+) e
+--            não são mapeadas nos models; a busca as lê em app/services/busca_service.py.
+--            Pesos: A = identificação (nome, código, documento), B = complementos,
+--            C = textos livres.
+-- Atenção:   ainda não executada contra um PostgreSQL (os testes rodam no SQLite e
+--            cobrem só o fallback ILIKE). Valide em homologação: aplicar a migration e
+--            conferir GET /api/v1/search (ordem, limit e next_cursor) antes da produção.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() é STABLE (depende do search_path e do dicionário) e não pode ser usada
+-- em colunas geradas/índices; o wrapper fixa o dicionário e é declarado IMMUTABLE.
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent', $1) $$;
+
+ALTER TABLE empresas
+ADD COLUMN IF NOT EXISTS busca_tsv tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(razao_social, ''))), 'A') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(nome_fantasia, ''))), 'A') ||
+    setweight(to_tsvector('simple', coalesce(cnpj, '') || ' ' || coalesce(cpf, '')), 'A') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(palavras_chave, ''))), 'B')
+) STORED;
+
+ALTER TABLE equipamentos
+ADD COLUMN IF NOT EXISTS busca_tsv tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(descricao, ''))), 'A') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(codigo, ''))), 'A') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(modelo, ''))), 'B') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(tags, ''))), 'B')
+) STORED;
+
+ALTER TABLE ordens_servico
+ADD COLUMN IF NOT EXISTS busca_tsv tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(chave_acesso, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(certificado_numero, '')), 'A') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(observacoes, ''))), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_empresas_busca_tsv
+    ON empresas USING gin (busca_tsv);
+
+CREATE INDEX IF NOT EXISTS ix_equipamentos_busca_tsv
+    ON equipamentos USING gin (busca_tsv);
+
+CREATE INDEX IF NOT EXISTS ix_ordens_servico_busca_tsv
+    ON ordens_servico USING gin (busca_tsv);
+
+COMMENT ON COLUMN empresas.busca_tsv IS 'Busca textual: razão social, nome fantasia, CNPJ/CPF, palavras-chave';
+COMMENT ON COLUMN equipamentos.busca_tsv IS 'Busca textual: descrição, código, modelo, tags';
+COMMENT ON COLUMN ordens_servico.busca_tsv IS 'Busca textual: chave de acesso, número do certificado, observações';
@@ -0,0 +1,26 @@
+-- Migration: Índices para paginação por cursor (keyset)
+-- Data: 2026-10-17
+-- Descrição: As listagens paginadas por cursor ordenam por (chave de ordenação, id)
+--            com NULLS LAST. Estes índices seguem exatamente essa ordem, permitindo
+--            que cada página seja lida direto do índice, sem OFFSET nem sort.
+
+CREATE INDEX IF NOT EXISTS ix_ordens_servico_keyset
+    ON ordens_servico (data_solicitacao DESC NULLS LAST, id DESC);
+
+CREATE INDEX IF NOT EXISTS ix_empresas_keyset
+    ON empresas (razao_social, id);
+
+CREATE INDEX IF NOT EXISTS ix_equipamentos_keyset
+    ON equipamentos (descricao, id);
+
+CREATE INDEX IF NOT EXISTS ix_equipamentos_empresa_keyset
+    ON equipamentos_empresa (data_proxima_calibracao NULLS LAST, id);
+
+CREATE INDEX IF NOT EXISTS ix_usuarios_keyset
+    ON usuarios (nome, id);
+
+CREATE INDEX IF NOT EXISTS ix_categorias_keyset
+    ON categorias (nome, id);
+
+CREATE INDEX IF NOT EXISTS ix_marcas_keyset
+    ON marcas (nome, id);
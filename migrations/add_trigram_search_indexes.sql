@@ -0,0 +1,28 @@
+-- Migration: Índices trigrama para as buscas por trecho de texto
+-- Data: 2026-10-17
+-- Descrição: Os filtros "contém" das listagens (ILIKE '%termo%') não usam os
+--            índices btree e liam a tabela inteira. Índices GIN com gin_trgm_ops
+--            atendem LIKE/ILIKE com curingas dos dois lados (termos a partir de
+--            3 caracteres) e permitem ordenar por word_similarity (app/utils/busca.py).
+--            Em tabelas grandes prefira CREATE INDEX CONCURRENTLY (fora de transação).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_empresas_razao_social_trgm
+    ON empresas USING gin (razao_social gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_empresas_cidade_trgm
+    ON empresas USING gin (cidade gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_equipamentos_descricao_trgm
+    ON equipamentos USING gin (descricao gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_equipamentos_codigo_trgm
+    ON equipamentos USING gin (codigo gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_equipamentos_empresa_numero_serie_trgm
+    ON equipamentos_empresa USING gin (numero_serie gin_trgm_ops);
+
+ANALYZE empresas;
+ANALYZE equipamentos;
+ANALYZE equipamentos_empresa;
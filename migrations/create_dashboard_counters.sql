@@ -0,0 +1,17 @@
+-- Migration: Cria tabela de contadores incrementais do dashboard
+-- Data: 2026-10-17
+-- Descrição: Resumo dos cards de /dashboard/principal mantido pelas rotinas de escrita
+--            (OSService, cancelamento de OS, recusa de calibração, empresas).
+--            Após aplicar, execute a reconciliação para popular a tabela:
+--            python reconcile_dashboard.py
+
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    chave VARCHAR(50) NOT NULL,
+    data_referencia DATE NOT NULL,
+    valor INTEGER NOT NULL DEFAULT 0,
+    data_atualizacao TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+    PRIMARY KEY (chave, data_referencia)
+);
+
+COMMENT ON TABLE dashboard_counters IS 'Contadores incrementais dos cards do dashboard';
+COMMENT ON COLUMN dashboard_counters.data_referencia IS 'Dia do bucket (1900-01-01 para contadores simples)';
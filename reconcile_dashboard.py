@@ -0,0 +1,48 @@
+"""
+Script de reconciliação dos contadores do dashboard
+
+Reconstrói a tabela dashboard_counters a partir de ordens_servico,
+equipamentos_empresa e empresas e reporta divergências em relação aos
+contadores incrementais. Deve ser agendado para execução noturna, ex. (cron):
+
+    0 3 * * * cd /app && python reconcile_dashboard.py
+"""
+import sys
+
+from app.database import SessionLocal
+from app.services.contadores_service import ContadoresDashboardService
+
+
+def main():
+    """Executa a reconciliação"""
+    print("🔄 Reconciliando contadores do dashboard...")
+
+    db = SessionLocal()
+    try:
+        relatorio = ContadoresDashboardService.reconciliar(db)
+        db.commit()
+    except Exception as e:
+        print(f"❌ Erro ao reconciliar contadores: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+    if relatorio["inicializacao"]:
+        print("✅ Contadores inicializados (primeira reconciliação)")
+    elif relatorio["divergente"]:
+        print("⚠️  Divergências encontradas (corrigidas):")
+        for chave, dados in relatorio["divergencias"].items():
+            print(
+                f"   {chave}: atual={dados['atual']} esperado={dados['esperado']} "
+                f"({dados['buckets_divergentes']} buckets)"
+            )
+    else:
+        print("✅ Nenhuma divergência encontrada")
+
+    print(f"📊 {relatorio['linhas']} linhas gravadas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
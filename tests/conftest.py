@@ -0,0 +1,167 @@
+"""
+Configuração dos testes
+
+Os testes usam um banco SQLite temporário (sync via pysqlite e async via
+aiosqlite, no mesmo arquivo). As variáveis de ambiente são definidas antes de
+importar a aplicação, porque app.config lê as configurações na importação.
+"""
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+_DIRETORIO_TESTES = tempfile.mkdtemp(prefix="gestorhs_testes_")
+_BANCO_TESTES = os.path.join(_DIRETORIO_TESTES, "testes.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{_BANCO_TESTES}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("SECRET_KEY", "chave-dos-testes")
+os.environ.setdefault("LOG_FILE", os.path.join(_DIRETORIO_TESTES, "api.log"))
+os.environ.setdefault("SLOW_QUERY_LOG_FILE", os.path.join(_DIRETORIO_TESTES, "slow_queries.log"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(_DIRETORIO_TESTES, "profiles"))
+os.environ.setdefault("BCRYPT_POOL_WORKERS", "0")
+os.environ.setdefault("AUTOCOMPLETE_REFRESH_INTERVAL", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.auxiliares import Categoria, FaseOS, Marca  # noqa: E402
+from app.models.empresa import Empresa  # noqa: E402
+from app.models.equipamento import Equipamento, EquipamentoEmpresa  # noqa: E402
+from app.models.ordem_servico import OrdemServico  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Sessão sync num banco vazio (arquivo recriado a cada teste)"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        os.remove(_BANCO_TESTES)
+
+
+@pytest.fixture
+def dados(db):
+    """
+    Banco com empresas, equipamentos e ordens de serviço variados
+
+    Inclui datas nos limites dos cards do dashboard (hoje, hoje ± 30 dias),
+    equipamentos inativos/recusados e empresas perdidas.
+    """
+    aleatorio = random.Random(20)
+    hoje = date.today()
+    agora = datetime.combine(hoje, datetime.min.time()).replace(hour=6)
+
+    fases = [FaseOS(nome=nome, ordem=i) for i, nome in enumerate(
+        ["Solicitado", "Enviado", "Recebido", "Em Calibracao", "Calibrado", "Entregue"], start=1
+    )]
+    db.add_all(fases)
+    db.add(Categoria(nome="Bafômetros", data_cadastro=hoje))
+    db.add(Marca(nome="Acme", data_cadastro=hoje))
+    db.flush()
+
+    empresas = [
+        Empresa(
+            tipo_pessoa="J",
+            cnpj=f"{i:014d}",
+            razao_social=f"Empresa {i}",
+            nome_fantasia=f"Fantasia {i}",
+            ativo=aleatorio.choice("SSSN"),
+            status_contato=aleatorio.choice(["ativo", "perdido", "inativo"]),
+            data_cadastro=hoje
+        )
+        for i in range(25)
+    ]
+    equipamentos = [
+        Equipamento(
+            codigo=f"EQ{i}",
+            descricao=f"Equipamento {i}",
+            categoria_id=1,
+            marca_id=1,
+            periodo_calibracao_dias=365,
+            data_cadastro=hoje
+        )
+        for i in range(8)
+    ]
+    db.add_all(empresas + equipamentos)
+    db.flush()
+
+    deslocamentos = [-90, -31, -30, -1, 0, 1, 29, 30, 31, 90]
+    vinculos = []
+    for i in range(120):
+        if i < len(deslocamentos):
+            proxima = hoje + timedelta(days=deslocamentos[i])
+        elif aleatorio.random() < 0.9:
+            proxima = hoje + timedelta(days=aleatorio.randint(-120, 120))
+        else:
+            proxima = None
+        vinculos.append(EquipamentoEmpresa(
+            equipamento_id=aleatorio.choice(equipamentos).id,
+            empresa_id=aleatorio.choice(empresas).id,
+            numero_serie=f"SN{i:04d}",
+            data_proxima_calibracao=proxima,
+            ativo=aleatorio.choice("SSSN"),
+            calibracao_recusada=aleatorio.choice("NNNS")
+        ))
+    db.add_all(vinculos)
+    db.flush()
+
+    for i in range(200):
+        vinculo = aleatorio.choice(vinculos)
+        situacao = aleatorio.choice("EAFC")
+        data_calibracao = None
+        if situacao == "F":
+            data_calibracao = agora - timedelta(days=aleatorio.choice([0, 29, 30, 31, 60]))
+        db.add(OrdemServico(
+            empresa_id=vinculo.empresa_id,
+            equipamento_empresa_id=vinculo.id,
+            chave_acesso=f"K{i:05d}",
+            fase_id=aleatorio.choice(fases).id,
+            situacao_servico=situacao,
+            data_solicitacao=agora - timedelta(
+                days=aleatorio.randint(0, 400), hours=aleatorio.randint(0, 5)
+            ),
+            data_calibracao=data_calibracao,
+            valor_servico=Decimal("100.50"),
+            valor_frete_envio=Decimal("10"),
+            valor_frete_retorno=Decimal("0")
+        ))
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def cliente():
+    """TestClient da aplicação (sem os eventos de startup)"""
+    from app.main import app
+
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+class UsuarioTeste:
+    """Usuário admin devolvido por get_current_active_user nos testes de rotas"""
+    id = 1
+    login = "admin"
+    perfil = "admin"
+    ativo = "S"
+    permissoes = None
+
+
+@pytest.fixture
+def cliente_admin(cliente):
+    """TestClient com get_current_active_user substituído por um admin"""
+    from app.utils.dependencies import get_current_active_user
+
+    cliente.app.dependency_overrides[get_current_active_user] = lambda: UsuarioTeste()
+    return cliente
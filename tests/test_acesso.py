@@ -0,0 +1,111 @@
+"""
+Último acesso em write-behind: um UPDATE por flush com o acesso mais recente de cada usuário
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.models.usuario import Usuario
+from app.services import acesso_service
+from app.services.acesso_service import UltimoAcessoBuffer
+
+INICIO = datetime(2026, 1, 10, 8, 0)
+
+
+@pytest.fixture
+def usuarios(db):
+    db.add_all([
+        Usuario(
+            nome=f"Usuário {i}", email=f"u{i}@teste.com", login=f"u{i}",
+            senha="x", perfil="tecnico", ativo="S"
+        )
+        for i in range(3)
+    ])
+    db.commit()
+    return [usuario.id for usuario in db.query(Usuario).order_by(Usuario.id)]
+
+
+@pytest.fixture
+def updates():
+    """UPDATEs executados durante o teste"""
+    comandos = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            comandos.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _registrar)
+    yield comandos
+    event.remove(Engine, "before_cursor_execute", _registrar)
+
+
+def _ultimos_acessos(db) -> dict:
+    db.expire_all()
+    return dict(db.query(Usuario.id, Usuario.ultimo_acesso))
+
+
+def test_flush_grava_o_mais_recente_em_um_update(db, usuarios, updates):
+    buffer = UltimoAcessoBuffer(intervalo=3600)
+    primeiro, segundo, terceiro = usuarios
+    buffer.registrar(primeiro, INICIO)
+    buffer.registrar(segundo, INICIO + timedelta(minutes=1))
+    buffer.registrar(primeiro, INICIO + timedelta(minutes=5))
+    # Registro fora de ordem não sobrescreve o mais recente
+    buffer.registrar(primeiro, INICIO + timedelta(minutes=2))
+    assert len(buffer) == 2
+
+    assert buffer.flush() == 2
+
+    assert len(updates) == 1
+    assert _ultimos_acessos(db) == {
+        primeiro: INICIO + timedelta(minutes=5),
+        segundo: INICIO + timedelta(minutes=1),
+        terceiro: None,
+    }
+    assert len(buffer) == 0
+    assert buffer.flush() == 0
+    assert len(updates) == 1
+
+
+def test_falha_devolve_os_registros_ao_buffer(db, usuarios, monkeypatch):
+    buffer = UltimoAcessoBuffer(intervalo=3600)
+    buffer.registrar(usuarios[0], INICIO)
+
+    class _SessaoComFalha:
+        def execute(self, *args, **kwargs):
+            raise RuntimeError("banco indisponível")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    with monkeypatch.context() as patch:
+        patch.setattr(acesso_service, "SessionLocal", _SessaoComFalha)
+        assert buffer.flush() == 0
+    # Acesso mais recente registrado durante a falha é mantido
+    buffer.registrar(usuarios[0], INICIO + timedelta(minutes=1))
+    assert len(buffer) == 1
+
+    assert buffer.flush() == 1
+    assert _ultimos_acessos(db)[usuarios[0]] == INICIO + timedelta(minutes=1)
+
+
+def test_parar_grava_os_pendentes(db, usuarios, updates):
+    buffer = UltimoAcessoBuffer(intervalo=3600)
+    buffer.iniciar()
+    buffer.registrar(usuarios[0], INICIO)
+    buffer.registrar(usuarios[2], INICIO + timedelta(seconds=30))
+
+    # A thread só gravaria depois de 1h: o que está pendente vai no shutdown
+    buffer.parar()
+
+    assert buffer._thread is None
+    assert len(updates) == 1
+    acessos = _ultimos_acessos(db)
+    assert acessos[usuarios[0]] == INICIO
+    assert acessos[usuarios[2]] == INICIO + timedelta(seconds=30)
+    assert len(buffer) == 0
@@ -0,0 +1,150 @@
+"""
+Índice de autocomplete: busca por prefixo e alterações concorrentes com a recarga
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.empresa import Empresa
+from app.models.equipamento import Equipamento
+from app.services import autocomplete_service
+from app.services.autocomplete_service import IndiceAutocomplete, autocomplete, normalizar
+
+
+def _empresa(id_: int, razao_social: str, nome_fantasia=None, ativo="S") -> Empresa:
+    return Empresa(
+        id=id_, tipo_pessoa="J", cnpj=f"{id_:014d}", razao_social=razao_social,
+        nome_fantasia=nome_fantasia, ativo=ativo, data_cadastro=date.today()
+    )
+
+
+def _objeto(id_: int, razao_social: str, nome_fantasia=None, ativo="S") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id_, razao_social=razao_social, nome_fantasia=nome_fantasia, ativo=ativo
+    )
+
+
+def _ids(indice: IndiceAutocomplete, prefixo: str, limite: int = 10) -> list:
+    return [item["id"] for item in indice.buscar(prefixo, limite)]
+
+
+@pytest.fixture
+def indice(db):
+    db.add_all([
+        _empresa(1, "Ácme Calibrações Ltda", "Acme"),
+        _empresa(2, "Beta Instrumentos", "Beta"),
+        _empresa(3, "Acme Inativa", ativo="N"),
+    ])
+    db.commit()
+    return IndiceAutocomplete("empresas", Empresa, Empresa.razao_social, Empresa.nome_fantasia)
+
+
+class _SessaoComAlteracao:
+    """Sessão que executa `alteracao` logo depois do SELECT do carregar()"""
+
+    def __init__(self, alteracao):
+        self._session = SessionLocal()
+        self._alteracao = alteracao
+
+    def execute(self, *args, **kwargs):
+        resultado = self._session.execute(*args, **kwargs)
+        self._alteracao()
+        return resultado
+
+    def close(self):
+        self._session.close()
+
+
+def test_normalizar():
+    assert normalizar("  Ácme   CALIBRAÇÕES ") == "acme calibracoes"
+    assert normalizar(None) == ""
+
+
+def test_carregar_e_buscar(indice):
+    assert indice.carregar() == 2
+
+    assert _ids(indice, "acme") == [1]
+    assert _ids(indice, "CALIB") == []
+    assert _ids(indice, "be") == [2]
+    assert indice.buscar("acme")[0] == {
+        "id": 1, "titulo": "Ácme Calibrações Ltda", "subtitulo": "Acme"
+    }
+
+
+def test_alteracoes_durante_a_carga_sao_reaplicadas(indice, monkeypatch):
+    """atualizar/remover entre o SELECT e a troca não são desfeitos pela leitura antiga"""
+    def _alteracoes():
+        indice.atualizar(_objeto(3, "Gama Metrologia"))
+        indice.atualizar(_objeto(1, "Delta Calibrações"))
+        indice.remover(2)
+
+    monkeypatch.setattr(
+        autocomplete_service, "SessionLocal", lambda: _SessaoComAlteracao(_alteracoes)
+    )
+    assert indice.carregar() == 2
+
+    assert _ids(indice, "gama") == [3]
+    assert _ids(indice, "delta") == [1]
+    assert _ids(indice, "acme") == []
+    assert _ids(indice, "beta") == []
+    assert indice._pendentes is None
+
+
+def test_carga_com_erro_mantem_o_indice(indice, monkeypatch):
+    indice.carregar()
+
+    def _falhar():
+        raise RuntimeError("banco indisponível")
+
+    monkeypatch.setattr(
+        autocomplete_service, "SessionLocal", lambda: _SessaoComAlteracao(_falhar)
+    )
+    with pytest.raises(RuntimeError):
+        indice.carregar()
+
+    assert _ids(indice, "acme") == [1]
+    assert indice._pendentes is None
+    indice.atualizar(_objeto(3, "Gama Metrologia"))
+    assert _ids(indice, "gama") == [3]
+
+
+def test_inativos_ficam_fora_do_indice(indice):
+    assert indice.carregar() == 2
+    assert _ids(indice, "acme") == [1]
+
+    indice.atualizar(_objeto(1, "Ácme Calibrações Ltda", "Acme", ativo="N"))
+    assert _ids(indice, "acme") == []
+    indice.atualizar(_objeto(3, "Acme Inativa", ativo="S"))
+    assert _ids(indice, "acme") == [3]
+
+
+def test_desativacao_pelos_handlers(dados, cliente_admin):
+    empresas = autocomplete.empresas
+    equipamentos = autocomplete.equipamentos
+    empresas.carregar()
+    equipamentos.carregar()
+    inativa = dados.query(Empresa).filter(Empresa.ativo == "N").first()
+    ativa = dados.query(Empresa).filter(Empresa.ativo == "S").first()
+    assert inativa.id not in _ids(empresas, inativa.razao_social, limite=50)
+    assert ativa.id in _ids(empresas, ativa.razao_social, limite=50)
+
+    # Empresa: ativar/desativar e PUT com ativo
+    assert cliente_admin.patch(f"/api/v1/empresas/{inativa.id}/ativar").status_code == 200
+    assert inativa.id in _ids(empresas, inativa.razao_social, limite=50)
+    assert cliente_admin.patch(f"/api/v1/empresas/{ativa.id}/ativar").status_code == 200
+    assert ativa.id not in _ids(empresas, ativa.razao_social, limite=50)
+    response = cliente_admin.put(f"/api/v1/empresas/{inativa.id}", json={"ativo": "N"})
+    assert response.status_code == 200
+    assert inativa.id not in _ids(empresas, inativa.razao_social, limite=50)
+
+    # Equipamento: exclusão (soft delete) e reativação pelo PUT
+    equipamento = dados.query(Equipamento).first()
+    assert equipamento.id in _ids(equipamentos, equipamento.codigo, limite=50)
+    assert cliente_admin.delete(f"/api/v1/equipamentos/{equipamento.id}").status_code == 200
+    assert equipamento.id not in _ids(equipamentos, equipamento.codigo, limite=50)
+    assert equipamentos.carregar() == dados.query(Equipamento).count() - 1
+    response = cliente_admin.put(f"/api/v1/equipamentos/{equipamento.id}", json={"ativo": "S"})
+    assert response.status_code == 200
+    assert equipamento.id in _ids(equipamentos, equipamento.codigo, limite=50)
@@ -0,0 +1,131 @@
+"""
+Busca unificada (fallback ILIKE): ordem por relevância, limite por tipo e
+paginação por next_cursor
+
+O caminho tsvector (PostgreSQL com add_fulltext_search.sql) não roda no SQLite
+dos testes.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import or_
+
+from app.models.empresa import Empresa
+from app.models.equipamento import Equipamento
+from app.services.busca_service import TIPOS_BUSCA, codificar_cursor_busca
+from app.utils.busca import filtro_contem
+
+BUSCA = "/api/v1/search"
+
+
+@pytest.fixture
+def acme(dados):
+    hoje = date.today()
+    dados.add_all([
+        Empresa(
+            tipo_pessoa="J", cnpj="90000000000001", razao_social="Acme Transportes",
+            data_cadastro=hoje
+        ),
+        Empresa(
+            tipo_pessoa="J", cnpj="90000000000002", razao_social="Acme Bafometro Ltda",
+            data_cadastro=hoje
+        ),
+        Equipamento(
+            codigo="BF1", descricao="Bafometro Digital", categoria_id=1, marca_id=1,
+            periodo_calibracao_dias=365, data_cadastro=hoje
+        ),
+    ])
+    dados.commit()
+    return dados
+
+
+def _buscar(cliente, **params) -> dict:
+    response = cliente.get(BUSCA, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def _ids_esperados(db, tipo: str, termos: list) -> set:
+    """Ids que contêm algum dos termos, sem passar pelo service"""
+    busca = TIPOS_BUSCA[tipo]
+    return {
+        id_ for (id_,) in db.query(busca.model.id).filter(or_(*[
+            filtro_contem(coluna, termo) for termo in termos for coluna in busca.colunas
+        ]))
+    }
+
+
+def test_ordem_por_relevancia(acme, cliente_admin):
+    data = _buscar(cliente_admin, q="acme bafometro")
+
+    assert [(item["tipo"], item["titulo"], item["relevancia"]) for item in data["items"]] == [
+        ("empresa", "Acme Bafometro Ltda", 2.0),
+        ("empresa", "Acme Transportes", 1.0),
+        ("equipamento", "Bafometro Digital", 1.0),
+    ]
+    assert data["next_cursor"] is None
+
+
+def test_limite_e_resumo_por_tipo(dados, cliente_admin):
+    data = _buscar(cliente_admin, q="empresa", limit=5)
+
+    assert data["tipos"] == {
+        "empresa": {"itens": 5, "tem_mais": True},
+        "equipamento": {"itens": 0, "tem_mais": False},
+        "ordem_servico": {"itens": 0, "tem_mais": False},
+    }
+    assert [item["tipo"] for item in data["items"]] == ["empresa"] * 5
+    assert data["next_cursor"] is not None
+
+    data = _buscar(cliente_admin, q="empresa", tipos="equipamento")
+    assert data["tipos"] == {"equipamento": {"itens": 0, "tem_mais": False}}
+    assert data["items"] == []
+
+
+def test_next_cursor_percorre_tudo_sem_repetir(dados, cliente_admin):
+    termos = ["empresa", "1"]
+    por_tipo = {tipo: [] for tipo in TIPOS_BUSCA}
+    cursor = None
+    for _ in range(100):
+        params = {"q": "Empresa 1", "limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        data = _buscar(cliente_admin, **params)
+        for item in data["items"]:
+            por_tipo[item["tipo"]].append(item)
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert cursor is None
+
+    for tipo, itens in por_tipo.items():
+        ids = [item["id"] for item in itens]
+        assert len(ids) == len(set(ids)), tipo
+        assert set(ids) == _ids_esperados(dados, tipo, termos), tipo
+        # Dentro do tipo, entre páginas: relevância decrescente e id crescente no empate
+        posicoes = [(-item["relevancia"], item["id"]) for item in itens]
+        assert posicoes == sorted(posicoes), tipo
+    # Mais de uma página por tipo e relevâncias diferentes na mesma busca
+    assert len(por_tipo["empresa"]) > 7 and len(por_tipo["ordem_servico"]) > 7
+    assert {item["relevancia"] for item in por_tipo["empresa"]} == {1.0, 2.0}
+
+
+@pytest.mark.parametrize("cursor", [
+    "nao-e-base64!",
+    codificar_cursor_busca({"usuario": [1.0, 3]}),
+    codificar_cursor_busca({"empresa": [1.0, "3"]}),
+    codificar_cursor_busca({"empresa": ["alta", 3]}),
+])
+def test_cursor_invalido(dados, cliente_admin, cursor):
+    response = cliente_admin.get(BUSCA, params={"q": "empresa", "cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor de busca inválido"
+
+
+@pytest.mark.parametrize("tipos", ["usuario", "empresa,usuario", " , "])
+def test_tipos_invalidos(dados, cliente_admin, tipos):
+    response = cliente_admin.get(BUSCA, params={"q": "empresa", "tipos": tipos})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Tipos inválidos")
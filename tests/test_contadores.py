@@ -0,0 +1,152 @@
+"""
+Contadores do dashboard: os incrementos das rotinas de escrita batem com a
+reconstrução (reconciliar não encontra divergência)
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.dashboard import DashboardContador
+from app.models.empresa import Empresa
+from app.models.equipamento import EquipamentoEmpresa
+from app.models.ordem_servico import OrdemServico
+from app.services.contadores_service import (
+    CALIBRACOES_RECUSADAS,
+    INICIALIZADO,
+    ContadoresDashboardService,
+)
+
+OS = "/api/v1/ordens-servico"
+EMPRESAS = "/api/v1/empresas"
+EQUIPAMENTOS_EMPRESA = "/api/v1/equipamentos-empresa"
+
+
+def _reconciliar() -> dict:
+    with SessionLocal() as session:
+        relatorio = ContadoresDashboardService.reconciliar(session)
+        session.commit()
+    return relatorio
+
+
+@pytest.fixture
+def inicializado(dados):
+    relatorio = _reconciliar()
+    assert relatorio["inicializacao"]
+    return dados
+
+
+def _ids(db, model, *condicoes, quantidade=1):
+    ids = [linha.id for linha in db.query(model.id).filter(*condicoes).order_by(model.id)]
+    assert len(ids) >= quantidade
+    return ids[:quantidade]
+
+
+def test_primeira_reconciliacao_nao_e_divergencia(dados):
+    # Incrementos parciais gravados antes da primeira reconciliação
+    dados.add(DashboardContador(
+        chave=CALIBRACOES_RECUSADAS, data_referencia=date(1900, 1, 1), valor=3
+    ))
+    dados.commit()
+
+    relatorio = _reconciliar()
+    assert relatorio["inicializacao"] is True
+    assert relatorio["divergente"] is False
+
+    relatorio = _reconciliar()
+    assert relatorio["inicializacao"] is False
+    assert relatorio["divergente"] is False
+
+
+def test_reconciliacao_detecta_contador_errado(inicializado):
+    inicializado.query(DashboardContador).filter(
+        DashboardContador.chave == CALIBRACOES_RECUSADAS
+    ).update({DashboardContador.valor: DashboardContador.valor + 1})
+    inicializado.commit()
+
+    relatorio = _reconciliar()
+    assert relatorio["divergente"] is True
+    assert set(relatorio["divergencias"]) == {CALIBRACOES_RECUSADAS}
+    assert _reconciliar()["divergente"] is False
+
+
+def test_rotinas_de_escrita_mantem_os_contadores(inicializado, cliente_admin):
+    db = inicializado
+    assert db.query(DashboardContador).filter(DashboardContador.chave == INICIALIZADO).count() == 1
+
+    # OS: criação (E), envio (A), entrega (F), finalização com calibração e cancelamento
+    vinculo = db.query(EquipamentoEmpresa).filter(
+        EquipamentoEmpresa.ativo == "S", EquipamentoEmpresa.calibracao_recusada == "N"
+    ).first()
+    criadas = []
+    for _ in range(4):
+        response = cliente_admin.post(OS, json={
+            "empresa_id": vinculo.empresa_id,
+            "equipamento_empresa_id": vinculo.id,
+            "valor_servico": 120
+        })
+        assert response.status_code == 201
+        criadas.append(response.json()["id"])
+
+    for fase in (2, 3, 4):
+        assert cliente_admin.patch(f"{OS}/{criadas[0]}/fase?nova_fase_id={fase}").status_code == 200
+    assert cliente_admin.patch(f"{OS}/{criadas[1]}/fase?nova_fase_id=2").status_code == 200
+    assert cliente_admin.patch(f"{OS}/{criadas[1]}/fase?nova_fase_id=7").status_code == 200
+    assert cliente_admin.patch(f"{OS}/{criadas[2]}/fase?nova_fase_id=8").status_code == 200
+
+    finalizar = {
+        "data_calibracao": (datetime.utcnow() - timedelta(days=3)).isoformat(),
+        "certificado_numero": "C-1",
+        "teste_1": "0.1", "teste_2": "0.1", "teste_3": "0.1", "teste_media": "0.1",
+        "situacao_calibracao": "Aprovado"
+    }
+    assert cliente_admin.post(f"{OS}/{criadas[0]}/finalizar", json=finalizar).status_code == 200
+    andamento, espera = (
+        _ids(db, OrdemServico, OrdemServico.situacao_servico == situacao)[0]
+        for situacao in ("A", "E")
+    )
+    assert cliente_admin.post(f"{OS}/{espera}/finalizar", json=finalizar).status_code == 200
+    assert cliente_admin.delete(f"{OS}/{andamento}").status_code == 200
+    assert cliente_admin.delete(f"{OS}/{criadas[3]}").status_code == 200
+
+    # Equipamentos empresa: criação, desativação, recusa e reativação
+    response = cliente_admin.post(EQUIPAMENTOS_EMPRESA, json={
+        "equipamento_id": vinculo.equipamento_id,
+        "empresa_id": vinculo.empresa_id,
+        "numero_serie": "SN-NOVO"
+    })
+    assert response.status_code == 201
+    ativos = _ids(
+        db, EquipamentoEmpresa,
+        EquipamentoEmpresa.ativo == "S",
+        EquipamentoEmpresa.data_proxima_calibracao.isnot(None),
+        quantidade=3
+    )
+    inativo = _ids(db, EquipamentoEmpresa, EquipamentoEmpresa.ativo == "N")[0]
+    for item_id, ativo in [(ativos[0], "N"), (inativo, "S")]:
+        response = cliente_admin.put(f"{EQUIPAMENTOS_EMPRESA}/{item_id}", json={"ativo": ativo})
+        assert response.status_code == 200
+    response = cliente_admin.patch(f"{EQUIPAMENTOS_EMPRESA}/{ativos[1]}/recusar-calibracao")
+    assert response.status_code == 200
+
+    # Empresas: perdida, desativada, reativada, criada perdida e excluída
+    ativas = _ids(db, Empresa, Empresa.ativo == "S", quantidade=2)
+    assert cliente_admin.put(
+        f"{EMPRESAS}/{ativas[0]}", json={"status_contato": "perdido"}
+    ).status_code == 200
+    assert cliente_admin.patch(
+        f"{EMPRESAS}/{ativas[1]}/status-contato?status_contato=perdido"
+    ).status_code == 200
+    assert cliente_admin.patch(f"{EMPRESAS}/{ativas[1]}/ativar").status_code == 200
+    inativa = _ids(db, Empresa, Empresa.ativo == "N")[0]
+    assert cliente_admin.patch(f"{EMPRESAS}/{inativa}/ativar").status_code == 200
+    response = cliente_admin.post(EMPRESAS, json={
+        "tipo_pessoa": "F", "cpf": "12345678909", "razao_social": "Nova",
+        "status_contato": "perdido"
+    })
+    assert response.status_code == 201
+    assert cliente_admin.delete(f"{EMPRESAS}/{response.json()['id']}").status_code == 200
+
+    relatorio = _reconciliar()
+    assert relatorio["inicializacao"] is False
+    assert relatorio["divergencias"] == {}
@@ -0,0 +1,62 @@
+"""
+Listas de cards do dashboard: uma única consulta por endpoint (sem N+1)
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.routers.dashboard import dashboard_cache
+from app.utils.dependencies import get_current_active_user
+
+ENDPOINTS_CARDS = [
+    "/api/v1/dashboard/andamento?limit=200",
+    "/api/v1/dashboard/calibracoes-atrasadas?limit=200",
+    "/api/v1/dashboard/calibracoes-proximas?dias=120&limit=200",
+    "/api/v1/dashboard/finalizadas?dias=90&limit=200",
+]
+
+
+class _UsuarioTeste:
+    id = 1
+    perfil = "admin"
+    ativo = "S"
+    permissoes = None
+
+
+@contextmanager
+def _contar_selects():
+    """SELECTs executados no bloco (engines sync e async)"""
+    comandos = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            comandos.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _registrar)
+    try:
+        yield comandos
+    finally:
+        event.remove(Engine, "before_cursor_execute", _registrar)
+
+
+@pytest.fixture
+def cliente_autenticado(cliente, dados):
+    cliente.app.dependency_overrides[get_current_active_user] = lambda: _UsuarioTeste()
+    dashboard_cache.invalidar()
+    yield cliente
+    dashboard_cache.invalidar()
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS_CARDS)
+def test_card_executa_um_select(cliente_autenticado, endpoint):
+    with _contar_selects() as comandos:
+        response = cliente_autenticado.get(endpoint)
+
+    assert response.status_code == 200
+    cards = response.json()["data"]
+    # Vários cards com empresa/equipamento preenchidos: um N+1 apareceria na contagem
+    assert len(cards) > 5
+    assert all(card["empresa"] and card["equipamento"] for card in cards)
+    assert len(comandos) == 1, comandos
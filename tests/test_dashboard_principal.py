@@ -0,0 +1,87 @@
+"""
+Cards do /dashboard/principal: consulta agregada única x consultas por card
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import and_, event, func
+
+from app.database import engine
+from app.models.empresa import Empresa
+from app.models.equipamento import EquipamentoEmpresa
+from app.models.ordem_servico import OrdemServico
+from app.services.dashboard_service import DashboardService
+
+
+def _principal_por_card(db) -> dict:
+    """As sete consultas COUNT da versão anterior do endpoint (uma por card)"""
+    hoje = date.today()
+    trinta_dias_atras = hoje - timedelta(days=30)
+    trinta_dias_frente = hoje + timedelta(days=30)
+
+    return {
+        "ordens_andamento": db.query(OrdemServico).filter(
+            OrdemServico.situacao_servico == "A"
+        ).count(),
+        "clientes_atrasados": db.query(
+            func.count(func.distinct(EquipamentoEmpresa.empresa_id))
+        ).filter(
+            EquipamentoEmpresa.data_proxima_calibracao < hoje,
+            EquipamentoEmpresa.ativo == "S",
+            EquipamentoEmpresa.calibracao_recusada == "N"
+        ).scalar(),
+        "calibracoes_atrasadas": db.query(EquipamentoEmpresa).filter(
+            EquipamentoEmpresa.data_proxima_calibracao < hoje,
+            EquipamentoEmpresa.ativo == "S",
+            EquipamentoEmpresa.calibracao_recusada == "N"
+        ).count(),
+        "calibracoes_proximas": db.query(EquipamentoEmpresa).filter(
+            and_(
+                EquipamentoEmpresa.data_proxima_calibracao >= hoje,
+                EquipamentoEmpresa.data_proxima_calibracao <= trinta_dias_frente
+            ),
+            EquipamentoEmpresa.ativo == "S",
+            EquipamentoEmpresa.calibracao_recusada == "N"
+        ).count(),
+        "ordens_finalizadas_30dias": db.query(OrdemServico).filter(
+            OrdemServico.situacao_servico == "F",
+            OrdemServico.data_calibracao >= trinta_dias_atras
+        ).count(),
+        "calibracoes_nao_fazer": db.query(EquipamentoEmpresa).filter(
+            EquipamentoEmpresa.calibracao_recusada == "S",
+            EquipamentoEmpresa.ativo == "S"
+        ).count(),
+        "clientes_perdidos": db.query(Empresa).filter(
+            Empresa.status_contato == "perdido",
+            Empresa.ativo == "S"
+        ).count(),
+    }
+
+
+def test_calcular_principal_igual_as_consultas_por_card(dados):
+    esperado = _principal_por_card(dados)
+
+    assert DashboardService.calcular_principal(dados) == esperado
+    # Os dados do teste cobrem todos os cards
+    assert all(esperado.values())
+
+
+def test_calcular_principal_banco_vazio(db):
+    cards = DashboardService.calcular_principal(db)
+
+    assert cards == _principal_por_card(db)
+    assert set(cards.values()) == {0}
+
+
+def test_calcular_principal_executa_uma_consulta(dados):
+    comandos = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _registrar)
+    try:
+        DashboardService.calcular_principal(dados)
+    finally:
+        event.remove(engine, "before_cursor_execute", _registrar)
+
+    assert len(comandos) == 1
@@ -0,0 +1,39 @@
+"""
+Sessão async (get_async_db) no aiosqlite e conversão da DATABASE_URL
+"""
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import converter_url_async, get_async_db
+from app.models.empresa import Empresa
+
+
+@pytest.mark.parametrize("url,esperada", [
+    ("sqlite:///./teste.db", "sqlite+aiosqlite:///./teste.db"),
+    ("postgresql://u:s@h:5432/db", "postgresql+asyncpg://u:s@h:5432/db"),
+    ("postgresql+psycopg2://u:s@h/db", "postgresql+asyncpg://u:s@h/db"),
+    ("postgresql://u:s@h/db?sslmode=require", "postgresql+asyncpg://u:s@h/db?ssl=require"),
+])
+def test_converter_url_async(url, esperada):
+    assert converter_url_async(url) == esperada
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_no_aiosqlite(dados):
+    esperado = dados.query(Empresa).count()
+    dependency = get_async_db()
+    db = await dependency.__anext__()
+    try:
+        assert isinstance(db, AsyncSession)
+        assert db.get_bind().dialect.driver == "aiosqlite"
+        assert (await db.execute(text("SELECT 1"))).scalar() == 1
+        assert (await db.execute(select(func.count(Empresa.id)))).scalar() == esperado
+        # Código da Session sync reaproveitado com run_sync
+        assert await db.run_sync(lambda session: session.query(Empresa).count()) == esperado
+    finally:
+        with pytest.raises(StopAsyncIteration):
+            await dependency.__anext__()
+
+    # A dependency fecha a sessão ao final da requisição
+    assert not db.in_transaction()
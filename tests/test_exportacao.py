@@ -0,0 +1,104 @@
+"""
+Exportação CSV: rota própria (não capturada por /{id}), mesmos filtros e campos
+da listagem, datas em ISO e textos que parecem fórmula neutralizados
+"""
+import csv
+import io
+from datetime import date, datetime
+
+import pytest
+
+from app.models.equipamento import EquipamentoEmpresa
+from app.models.ordem_servico import OrdemServico
+
+OS = "/api/v1/ordens-servico"
+EQUIPAMENTOS_EMPRESA = "/api/v1/equipamentos-empresa"
+
+
+def _csv(cliente, url: str, **params) -> list:
+    response = cliente.get(url, params=params)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def _ids_da_listagem(cliente, url: str, **params) -> list:
+    response = cliente.get(url, params={**params, "size": 100})
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert len(data["items"]) < 100
+    return [item["id"] for item in data["items"]]
+
+
+@pytest.mark.parametrize("url,filtros", [
+    (OS, {"situacao_servico": "F"}),
+    (OS, {"situacao_servico": "A", "pago": "N"}),
+    (EQUIPAMENTOS_EMPRESA, {"status": "A", "vencimento_ate": date.today().isoformat()}),
+    (EQUIPAMENTOS_EMPRESA, {"numero_serie": "SN001"}),
+])
+def test_mesmos_filtros_e_ids_da_listagem(dados, cliente_admin, url, filtros):
+    linhas = _csv(cliente_admin, f"{url}/export.csv", **filtros)
+    listagem = _ids_da_listagem(cliente_admin, url, **filtros)
+
+    ids = [int(linha["id"]) for linha in linhas]
+    assert ids
+    assert sorted(ids) == sorted(listagem)
+    assert len(ids) < len(_csv(cliente_admin, f"{url}/export.csv"))
+
+
+@pytest.mark.parametrize("url", [OS, EQUIPAMENTOS_EMPRESA])
+def test_export_nao_e_capturada_por_id(dados, cliente_admin, url):
+    # /{id} responderia 422 (id não inteiro); a exportação valida fields com 400
+    assert _csv(cliente_admin, f"{url}/export.csv")
+    response = cliente_admin.get(f"{url}/export.csv", params={"fields": "id,inexistente"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Campos inválidos")
+
+
+def test_fields_reduz_o_cabecalho(dados, cliente_admin):
+    response = cliente_admin.get(
+        f"{OS}/export.csv", params={"fields": "chave_acesso,id", "situacao_servico": "C"}
+    )
+    assert response.status_code == 200
+    cabecalho, *linhas = list(csv.reader(io.StringIO(response.text)))
+
+    # Ordem das colunas do schema, não a do parâmetro
+    assert cabecalho == ["id", "chave_acesso"]
+    assert linhas and all(len(linha) == 2 for linha in linhas)
+
+    linhas = _csv(cliente_admin, f"{EQUIPAMENTOS_EMPRESA}/export.csv", fields="numero_serie")
+    assert {tuple(linha) for linha in linhas} == {("numero_serie",)}
+
+
+def test_datas_em_iso(dados, cliente_admin):
+    solicitacoes = dict(dados.query(OrdemServico.id, OrdemServico.data_solicitacao))
+    for linha in _csv(cliente_admin, f"{OS}/export.csv", fields="id,data_solicitacao"):
+        data_solicitacao = solicitacoes[int(linha["id"])]
+        assert datetime.fromisoformat(linha["data_solicitacao"]) == data_solicitacao
+        assert linha["data_solicitacao"] == data_solicitacao.isoformat()
+
+    vencimentos = dict(dados.query(
+        EquipamentoEmpresa.id, EquipamentoEmpresa.data_proxima_calibracao
+    ))
+    linhas = _csv(
+        cliente_admin, f"{EQUIPAMENTOS_EMPRESA}/export.csv", fields="id,data_proxima_calibracao"
+    )
+    for linha in linhas:
+        vencimento = vencimentos[int(linha["id"])]
+        assert linha["data_proxima_calibracao"] == (vencimento.isoformat() if vencimento else "")
+
+
+def test_textos_que_parecem_formula(dados, cliente_admin):
+    textos = ["=HYPERLINK(\"http://exemplo.invalid\")", "+1+1", "-2+3", "@SUM(A1)", "\t=1", "\r=1"]
+    equipamentos = dados.query(EquipamentoEmpresa).order_by(EquipamentoEmpresa.id).all()
+    for equipamento, texto in zip(equipamentos, textos + ["SN-A-1"]):
+        equipamento.numero_serie = texto
+    dados.commit()
+
+    linhas = _csv(cliente_admin, f"{EQUIPAMENTOS_EMPRESA}/export.csv", fields="id,numero_serie")
+    numeros = {int(linha["id"]): linha["numero_serie"] for linha in linhas}
+
+    assert [numeros[equipamento.id] for equipamento in equipamentos[:len(textos)]] == [
+        f"'{texto}" for texto in textos
+    ]
+    assert numeros[equipamentos[len(textos)].id] == "SN-A-1"
@@ -0,0 +1,99 @@
+"""
+Login sob carga: limitador do bcrypt com fila limitada (503 imediato com a fila cheia)
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.usuario import Usuario
+from app.utils.concorrencia import LimitadorConcorrencia
+from app.utils.security import bcrypt_limitador, hash_password
+
+
+@pytest.fixture
+def usuario(db):
+    db.add(Usuario(
+        nome="Admin",
+        email="admin@teste.com",
+        login="admin",
+        senha=hash_password("admin123"),
+        perfil="admin",
+        ativo="S"
+    ))
+    db.commit()
+
+
+@pytest.mark.asyncio
+async def test_limitador_rejeita_na_hora_com_fila_cheia():
+    limitador = LimitadorConcorrencia("teste", limite=1, espera_maxima=5, retry_after=7, fila_maxima=1)
+    liberar = asyncio.Event()
+
+    async def _ocupar():
+        async with limitador.adquirir_async():
+            await liberar.wait()
+
+    ocupante = asyncio.create_task(_ocupar())
+    na_fila = asyncio.create_task(_ocupar())
+    await asyncio.sleep(0.01)
+    assert limitador.estatisticas()["em_uso"] == 1
+    assert limitador.estatisticas()["aguardando"] == 1
+
+    inicio = time.perf_counter()
+    with pytest.raises(HTTPException) as erro:
+        async with limitador.adquirir_async():
+            pass
+    assert time.perf_counter() - inicio < 0.1
+    assert erro.value.status_code == 503
+    assert erro.value.headers["Retry-After"] == "7"
+
+    # A vaga liberada passa para quem estava na fila
+    liberar.set()
+    await asyncio.gather(ocupante, na_fila)
+    estatisticas = limitador.estatisticas()
+    assert (estatisticas["aceitas"], estatisticas["rejeitadas"]) == (2, 1)
+    assert (estatisticas["em_uso"], estatisticas["aguardando"]) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_limitador_rejeita_apos_espera_maxima():
+    limitador = LimitadorConcorrencia("teste", limite=1, espera_maxima=0.05, fila_maxima=4)
+
+    with limitador.adquirir():
+        with pytest.raises(HTTPException) as erro:
+            async with limitador.adquirir_async():
+                pass
+
+    assert erro.value.status_code == 503
+    assert limitador.estatisticas()["aguardando"] == 0
+    async with limitador.adquirir_async():
+        assert limitador.estatisticas()["em_uso"] == 1
+
+
+def test_login(cliente, usuario):
+    response = cliente.post("/api/v1/auth/login", json={"login": "admin", "senha": "admin123"})
+
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+    response = cliente.post("/api/v1/auth/login", json={"login": "admin", "senha": "errada"})
+    assert response.status_code == 401
+
+
+def test_login_com_bcrypt_saturado_retorna_503_rapido(cliente, usuario, monkeypatch):
+    monkeypatch.setattr(bcrypt_limitador, "limite", 1)
+    monkeypatch.setattr(bcrypt_limitador, "fila_maxima", 0)
+
+    # Todas as vagas ocupadas e nenhuma posição livre na fila
+    with bcrypt_limitador.adquirir():
+        inicio = time.perf_counter()
+        response = cliente.post(
+            "/api/v1/auth/login", json={"login": "admin", "senha": "admin123"}
+        )
+        duracao = time.perf_counter() - inicio
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(bcrypt_limitador.retry_after)
+    # Sem esperar BCRYPT_QUEUE_TIMEOUT
+    assert duracao < 0.5
@@ -0,0 +1,67 @@
+"""
+Profiler de requisições: perfis cprofile simultâneos são serializados
+"""
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.utils.profiler import Perfilador, PerfilSolicitado, arquivo_perfil
+
+
+def _trabalho():
+    return sum(i * i for i in range(1000))
+
+
+def test_cprofile_simultaneo_e_ignorado():
+    primeiro = PerfilSolicitado("cprofile", "GET", "/primeiro")
+    segundo = PerfilSolicitado("cprofile", "GET", "/segundo")
+
+    with Perfilador(primeiro):
+        with Perfilador(segundo):
+            _trabalho()
+        _trabalho()
+
+    assert primeiro.salvo
+    assert arquivo_perfil(primeiro.id) == (
+        os.path.join(settings.PROFILE_DIR, primeiro.id + ".pstats"), "cprofile"
+    )
+    assert not segundo.salvo
+    assert arquivo_perfil(segundo.id) is None
+
+    # Com o primeiro encerrado, o lock fica livre de novo
+    terceiro = PerfilSolicitado("cprofile", "GET", "/terceiro")
+    with Perfilador(terceiro):
+        _trabalho()
+    assert terceiro.salvo
+
+
+def test_amostragem_nao_disputa_o_cprofile():
+    cprofile = PerfilSolicitado("cprofile", "GET", "/cprofile")
+    amostragem = PerfilSolicitado("amostragem", "GET", "/amostragem")
+
+    with Perfilador(cprofile):
+        with Perfilador(amostragem):
+            _trabalho()
+
+    assert cprofile.salvo and amostragem.salvo
+
+
+@pytest.mark.asyncio
+async def test_endpoints_async_concorrentes():
+    """Duas corrotinas perfiladas ao mesmo tempo na thread do event loop"""
+    perfis = [PerfilSolicitado("cprofile", "GET", f"/async/{i}") for i in range(2)]
+    dentro = asyncio.Event()
+
+    async def _endpoint(perfil, esperar):
+        with Perfilador(perfil):
+            dentro.set()
+            await esperar()
+
+    await asyncio.gather(
+        _endpoint(perfis[0], lambda: asyncio.sleep(0.05)),
+        _endpoint(perfis[1], dentro.wait),
+    )
+
+    assert [perfil.salvo for perfil in perfis] == [True, False]
@@ -0,0 +1,148 @@
+"""
+Relatórios XLSX: textos do banco gravados como texto (sem fórmulas) e sem
+caracteres de controle inválidos; conexões livres enquanto esperam o limitador
+"""
+import os
+import zipfile
+from contextlib import contextmanager
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import event
+
+from app.database import engine, get_async_engine
+from app.models.equipamento import EquipamentoEmpresa
+from app.models.usuario import Usuario
+from app.services.relatorios_service import (
+    FORMATO_MOEDA,
+    ColunaRelatorio,
+    gerar_xlsx,
+    relatorios_limitador,
+)
+from app.utils.dependencies import get_current_active_user, usuarios_cache
+from app.utils.security import create_access_token
+
+FORMULAS = ["=HYPERLINK(\"http://exemplo.invalid\",\"clique\")", "+1+1", "-2+3", "@SUM(A1)"]
+
+
+class _UsuarioTeste:
+    id = 1
+    perfil = "admin"
+    ativo = "S"
+    permissoes = None
+
+
+@pytest.fixture
+def planilha():
+    colunas = [
+        ColunaRelatorio("Texto"),
+        ColunaRelatorio("Valor", formato=FORMATO_MOEDA, totalizar=True)
+    ]
+    linhas = [(texto, Decimal("10.50")) for texto in FORMULAS]
+    linhas.append(("abc\x0bdef\x00", Decimal("1.00")))
+    linhas.append(("Empresa - Filial", None))
+    caminho = gerar_xlsx("Teste", colunas, linhas)
+    yield caminho
+    os.remove(caminho)
+
+
+def test_textos_que_parecem_formula_ficam_como_texto(planilha):
+    ws = load_workbook(planilha).active
+    celulas = [ws.cell(row=i, column=1) for i in range(2, 2 + len(FORMULAS))]
+
+    assert [celula.value for celula in celulas] == FORMULAS
+    assert {celula.data_type for celula in celulas} == {"s"}
+    assert ws["A7"].value == "Empresa - Filial"
+
+
+def test_total_continua_formula(planilha):
+    ws = load_workbook(planilha).active
+
+    assert ws["A8"].value == "Total"
+    assert ws["B8"].data_type == "f"
+    assert ws["B8"].value == "=SUM(B2:B7)"
+    with zipfile.ZipFile(planilha) as arquivo:
+        xml = arquivo.read("xl/worksheets/sheet1.xml").decode()
+    # Única fórmula da planilha
+    assert xml.count("<f>") == 1
+
+
+def test_caracteres_de_controle_removidos(planilha):
+    ws = load_workbook(planilha).active
+    assert ws["A6"].value == "abcdef"
+
+
+def test_relatorio_com_textos_do_banco(cliente, dados):
+    equipamento = dados.query(EquipamentoEmpresa).first()
+    equipamento.numero_serie = "=1+1"
+    equipamento.numero_patrimonio = "PAT\x0b001"
+    dados.commit()
+    cliente.app.dependency_overrides[get_current_active_user] = lambda: _UsuarioTeste()
+
+    response = cliente.get(f"/api/v1/relatorios/inventario/{equipamento.empresa_id}.xlsx")
+
+    assert response.status_code == 200
+    ws = load_workbook(BytesIO(response.content)).active
+    linhas = [linha for linha in ws.iter_rows(min_row=2) if linha[3].value == "=1+1"]
+    assert len(linhas) == 1
+    assert linhas[0][3].data_type == "s"
+    assert linhas[0][4].value == "PAT001"
+
+
+def test_espera_pelo_limitador_sem_conexao_ocupada(cliente, dados, monkeypatch):
+    usuario = Usuario(
+        nome="Relatórios", email="relatorios@teste.com", login="relatorios",
+        senha="x", perfil="admin", ativo="S"
+    )
+    dados.add(usuario)
+    dados.commit()
+    empresa_id = dados.query(EquipamentoEmpresa.empresa_id).first().empresa_id
+    token = create_access_token({"user_id": usuario.id})
+    dados.close()
+    # Cache miss: a autenticação consulta o banco pela sessão async
+    usuarios_cache.clear()
+
+    # Conexões em uso (checkout sem checkin) nos engines sync e async
+    em_uso = {"conexoes": 0}
+
+    def _checkout(*args):
+        em_uso["conexoes"] += 1
+
+    def _checkin(*args):
+        em_uso["conexoes"] -= 1
+
+    engines = [engine, get_async_engine().sync_engine]
+    for alvo in engines:
+        event.listen(alvo, "checkout", _checkout)
+        event.listen(alvo, "checkin", _checkin)
+
+    ocupadas = []
+    adquirir = relatorios_limitador.adquirir
+
+    @contextmanager
+    def _adquirir():
+        ocupadas.append(em_uso["conexoes"])
+        with adquirir():
+            yield
+
+    monkeypatch.setattr(relatorios_limitador, "adquirir", _adquirir)
+    urls = [
+        f"/api/v1/relatorios/inventario/{empresa_id}.xlsx",
+        "/api/v1/relatorios/inventario/999999.xlsx",
+        "/api/v1/relatorios/calibracoes-atrasadas.xlsx",
+        "/api/v1/relatorios/faturamento/2026/1.xlsx",
+    ]
+    try:
+        respostas = [
+            cliente.get(url, headers={"Authorization": f"Bearer {token}"}).status_code
+            for url in urls
+        ]
+    finally:
+        for alvo in engines:
+            event.remove(alvo, "checkout", _checkout)
+            event.remove(alvo, "checkin", _checkin)
+
+    assert respostas == [200, 404, 200, 200]
+    assert ocupadas == [0] * len(urls)
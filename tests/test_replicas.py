@@ -0,0 +1,152 @@
+"""
+Roteamento de leituras para réplicas (primário e réplica em dois arquivos SQLite)
+
+Cada banco tem a mesma empresa (id 1) com razão social diferente: o texto lido
+mostra de qual banco veio a consulta.
+"""
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, SessionLocal, engine, get_async_engine
+from app.models.empresa import Empresa
+from app.replicas import (
+    Replica,
+    RoutingAsyncSession,
+    RoutingSession,
+    roteador,
+    usar_primario,
+    vincular_requisicao,
+)
+from app.utils.dependencies import usuarios_cache
+from app.utils.security import create_access_token
+
+USER_ID = 4242
+
+
+def _empresa(razao_social: str) -> Empresa:
+    return Empresa(
+        id=1, tipo_pessoa="J", cnpj="11222333000181", razao_social=razao_social,
+        data_cadastro=date.today()
+    )
+
+
+def _requisicao(metodo: str) -> SimpleNamespace:
+    return SimpleNamespace(method=metodo, state=SimpleNamespace())
+
+
+@pytest.fixture
+def replica(db, tmp_path, monkeypatch):
+    """Réplica ativa no roteador; primário e réplica com conteúdos diferentes"""
+    url = f"sqlite:///{os.path.join(tmp_path, 'replica.db')}"
+    engine_replica = create_engine(url)
+    Base.metadata.create_all(bind=engine_replica)
+    with sessionmaker(bind=engine_replica)() as session:
+        session.add(_empresa("na réplica"))
+        session.commit()
+    engine_replica.dispose()
+    db.add(_empresa("no primário"))
+    db.commit()
+
+    instancia = Replica(url)
+    monkeypatch.setattr(roteador, "replicas", [instancia])
+    monkeypatch.setattr(roteador, "_escritas", {})
+    roteador.decisoes.clear()
+    yield instancia
+    instancia.saudavel = True
+    if instancia._engine_sync is not None:
+        instancia._engine_sync.dispose()
+
+
+def _razao_social(session) -> str:
+    return session.execute(select(Empresa.razao_social).where(Empresa.id == 1)).scalar()
+
+
+def test_get_le_da_replica(replica):
+    session = RoutingSession(bind=engine)
+    vincular_requisicao(session, _requisicao("GET"))
+
+    assert _razao_social(session) == "na réplica"
+    assert roteador.decisoes["replica"] == 1
+    assert replica.leituras == 1
+    session.close()
+
+
+def test_escrita_e_leitura_apos_escrita_ficam_no_primario(replica):
+    escrita = RoutingSession(bind=engine)
+    vincular_requisicao(escrita, _requisicao("POST"))
+    assert _razao_social(escrita) == "no primário"
+
+    requisicao = _requisicao("GET")
+    apos_escrita = RoutingSession(bind=engine)
+    vincular_requisicao(apos_escrita, requisicao)
+    # get_current_user decide depois de get_db criar a sessão
+    requisicao.state.usar_primario = True
+    assert _razao_social(apos_escrita) == "no primário"
+
+    assert roteador.decisoes["primario_leitura_apos_escrita"] == 1
+    escrita.close()
+    apos_escrita.close()
+
+
+def test_sessao_fora_de_requisicao_e_flush_no_primario(replica):
+    background = RoutingSession(bind=engine)
+    assert _razao_social(background) == "no primário"
+    background.close()
+
+    session = RoutingSession(bind=engine)
+    vincular_requisicao(session, _requisicao("GET"))
+    session.add(Empresa(
+        tipo_pessoa="F", cpf="12345678909", razao_social="nova", data_cadastro=date.today()
+    ))
+    session.commit()
+    session.close()
+
+    with SessionLocal() as primario:
+        assert primario.query(Empresa).filter(Empresa.razao_social == "nova").count() == 1
+    assert roteador.decisoes["primario_fora_de_requisicao"] >= 1
+
+
+def test_replica_fora_do_rodizio_le_do_primario(replica):
+    replica.saudavel = False
+    session = RoutingSession(bind=engine)
+    vincular_requisicao(session, _requisicao("GET"))
+
+    assert _razao_social(session) == "no primário"
+    assert roteador.decisoes["primario_sem_replica"] == 1
+    session.close()
+
+
+@pytest.mark.asyncio
+async def test_sessao_async(replica):
+    session = AsyncSession(bind=get_async_engine(), sync_session_class=RoutingAsyncSession)
+    assert await session.run_sync(_razao_social) == "na réplica"
+    await session.close()
+
+    session = AsyncSession(bind=get_async_engine(), sync_session_class=RoutingAsyncSession)
+    usar_primario(session.sync_session)
+    assert await session.run_sync(_razao_social) == "no primário"
+    await session.close()
+    await replica.dispose()
+
+
+def test_rota_sync_get_le_da_replica(cliente, replica, monkeypatch):
+    """get_db das rotas sync: réplica no GET, primário após escrita do usuário"""
+    monkeypatch.setattr(SessionLocal, "class_", RoutingSession)
+    usuarios_cache.set(USER_ID, (USER_ID, "admin", "S", None))
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': USER_ID})}"}
+
+    response = cliente.get("/api/v1/empresas/1", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["razao_social"] == "na réplica"
+
+    roteador.registrar_escrita(USER_ID)
+    response = cliente.get("/api/v1/empresas/1", headers=headers)
+    assert response.json()["razao_social"] == "no primário"
+
+    usuarios_cache.delete(USER_ID)
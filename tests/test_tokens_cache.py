@@ -0,0 +1,27 @@
+"""
+Cache de tokens JWT verificados (decode_token)
+"""
+from app.utils.security import create_access_token, decode_token, tokens_cache
+
+
+def test_decode_token_usa_cache_e_expoe_contadores(cliente, db):
+    tokens_cache.clear()
+    inicial = tokens_cache.estatisticas()
+    token = create_access_token({"sub": "admin", "user_id": 1})
+
+    primeiro = decode_token(token)
+    segundo = decode_token(token)
+
+    assert primeiro == segundo
+    assert primeiro["user_id"] == 1
+    estatisticas = cliente.get("/health/detailed").json()["health"]["tokens_cache"]
+    assert estatisticas["misses"] == inicial["misses"] + 1
+    assert estatisticas["hits"] == inicial["hits"] + 1
+    assert estatisticas["entradas"] == 1
+
+
+def test_decode_token_invalido_nao_e_cacheado():
+    tokens_cache.clear()
+
+    assert decode_token("token.invalido.x") is None
+    assert len(tokens_cache) == 0